@@ -6,6 +6,7 @@ import json
 import time
 import logging
 import threading
+from contextlib import nullcontext
 from datetime import datetime
 from flask import Flask, render_template, request, jsonify, send_from_directory
 
@@ -26,6 +27,48 @@ current_task = {
 }
 task_lock = threading.Lock()
 gemini_pro_manager = None  # Global Gemini Pro Manager instance
+session_pool = None  # Hazır tarayıcı oturumları (start_session_pool)
+
+
+def start_session_pool():
+    """Hesap tarayıcılarını arka planda aç ve Gemini'de hazır beklet"""
+    global gemini_pro_manager, session_pool
+    if not config.SESSION_POOL["enabled"] or session_pool:
+        return
+    try:
+        from gemini_pro_manager import GeminiProManager
+        from session_pool import SessionPool
+
+        if not gemini_pro_manager:
+            gemini_pro_manager = GeminiProManager(progress_callback=update_progress)
+        session_pool = SessionPool(gemini_pro_manager).start()
+        logger.info("Oturum havuzu başlatıldı")
+    except Exception as e:
+        logger.error(f"Oturum havuzu başlatılamadı: {e}")
+
+
+def stop_session_pool():
+    global session_pool
+    if session_pool:
+        session_pool.stop()
+        session_pool = None
+
+
+def account_lease():
+    """
+    Hesap tarayıcılarını süren her iş bu lease içinde çalışır
+
+    Havuz durdurulmuşsa (Stop / Close) burada yeniden başlatılır. Lease alındıktan
+    sonra havuz thread'i hesaplara dokunmaz; iş ile sağlık kontrolü aynı profilde
+    start_browser yarışına girmez. Havuz kapalıysa (SESSION_POOL) boş context döner.
+
+    Yields:
+        Havuzun Gemini'de hazır tuttuğu hesaplar (havuz yoksa None)
+    """
+    if session_pool and session_pool.manager is not gemini_pro_manager:
+        stop_session_pool()
+    start_session_pool()
+    return session_pool.lease() if session_pool else nullcontext()
 
 
 def update_progress(message: str, percentage: int):
@@ -154,7 +197,9 @@ def get_progress():
             "progress": current_task["progress"],
             "message": current_task["message"],
             "results": current_task["results"],
-            "error": current_task["error"]
+            "error": current_task["error"],
+            "eta": current_task.get("eta"),
+            "videos": current_task.get("videos")
         })
 
 
@@ -768,6 +813,8 @@ def gemini_pro_status():
             gemini_pro_manager = GeminiProManager()
 
         capacity = gemini_pro_manager.get_daily_capacity()
+        if session_pool:
+            capacity["session_pool"] = session_pool.status()
         return jsonify(capacity)
 
     except Exception as e:
@@ -917,7 +964,8 @@ def gemini_pro_setup():
             # Progress callback'i güncelle
             gemini_pro_manager.progress_callback = update_progress
 
-        result = gemini_pro_manager.setup_accounts()
+        with account_lease():
+            result = gemini_pro_manager.setup_accounts()
         return jsonify(result)
 
     except Exception as e:
@@ -935,7 +983,8 @@ def gemini_pro_verify():
         return jsonify({"error": "Önce setup yapın"}), 400
 
     try:
-        result = gemini_pro_manager.verify_all_accounts()
+        with account_lease():
+            result = gemini_pro_manager.verify_all_accounts()
         return jsonify(result)
 
     except Exception as e:
@@ -947,6 +996,8 @@ def gemini_pro_close():
     """Tüm Gemini Pro tarayıcılarını kapat"""
     global gemini_pro_manager
 
+    # Havuz kapatılan tarayıcıları yeniden açmasın
+    stop_session_pool()
     if gemini_pro_manager:
         gemini_pro_manager.close_all()
         gemini_pro_manager = None
@@ -964,7 +1015,8 @@ def gemini_pro_stop():
             current_task["running"] = False
             current_task["error"] = "Kullanıcı tarafından durduruldu"
 
-    # Tarayıcıları kapat
+    # Tarayıcıları kapat (havuz sonraki sağlık kontrolünde yeniden açmasın)
+    stop_session_pool()
     if gemini_pro_manager:
         gemini_pro_manager.close_all()
 
@@ -1031,77 +1083,79 @@ def gemini_pro_daily_shorts():
             else:
                 gemini_pro_manager.progress_callback = update_progress
 
-            # OTOMATİK KURULUM: Tarayıcılar açık değilse aç
-            update_progress("Hesaplar kontrol ediliyor...", 5)
-
-            if selected_account != "auto":
-                # Sadece seçilen hesabın tarayıcısını aç
-                account_id = int(selected_account)
-                acc = gemini_pro_manager.get_account_by_id(account_id)
-                if acc and not acc.is_browser_alive():
-                    logger.info(f"Hesap {account_id} tarayıcısı açılıyor...")
-                    update_progress(f"Hesap {account_id} açılıyor...", 10)
-                    acc.start_browser()
-                    acc.driver.get("https://gemini.google.com")
-                    time.sleep(3)
-            else:
-                # Otomatik mod - tüm hesapları kontrol et
-                needs_setup = False
-                for acc in gemini_pro_manager.accounts:
-                    if not acc.is_browser_alive():
-                        needs_setup = True
-                        break
-
-                if needs_setup:
-                    logger.info("Tarayıcılar kapalı - otomatik kurulum yapılıyor...")
-                    update_progress("Tarayıcılar açılıyor...", 10)
-                    gemini_pro_manager.setup_accounts()
-                    time.sleep(3)
-
-            # OTOMATİK DOĞRULAMA: Giriş durumunu kontrol et
-            update_progress("Giriş durumu kontrol ediliyor...", 15)
-
-            if selected_account != "auto":
-                # Sadece seçilen hesabı doğrula
-                account_id = int(selected_account)
-                acc = gemini_pro_manager.get_account_by_id(account_id)
-                if acc and acc.driver:
-                    try:
-                        current_url = acc.driver.current_url
-                        is_logged_in = "gemini.google.com" in current_url and "accounts.google" not in current_url
-                        if not is_logged_in:
-                            update_progress(f"⚠️ Hesap {account_id}'e giriş yapın, 30 saniye bekleniyor...", 20)
-                            time.sleep(30)
+            # Havuz açıksa ısınan tarayıcıları bekle; iş süresince sağlık kontrolü durur
+            with account_lease() as leased:
+                # Havuzun hazır tuttuğu hesaplar Gemini'de ve girişli: kurulum/doğrulama atlanır
+                ready = leased or []
+
+                # OTOMATİK KURULUM: Tarayıcılar açık değilse aç
+                update_progress("Hesaplar kontrol ediliyor...", 5)
+
+                if selected_account != "auto":
+                    # Sadece seçilen hesabın tarayıcısını aç
+                    account_id = int(selected_account)
+                    acc = gemini_pro_manager.get_account_by_id(account_id)
+                    if acc and acc not in ready and not acc.is_browser_alive():
+                        logger.info(f"Hesap {account_id} tarayıcısı açılıyor...")
+                        update_progress(f"Hesap {account_id} açılıyor...", 10)
+                        acc.start_browser()
+                        acc.driver.get(config.GEMINI_BASE_URL)
+                        time.sleep(3)
+                else:
+                    # Otomatik mod - kotası kalan ve havuzda hazır olmayan hesaplar
+                    pending = [acc for acc in gemini_pro_manager.get_accounts_with_quota() if acc not in ready]
+                    closed = [acc for acc in pending if not acc.is_browser_alive()]
+
+                    if closed:
+                        logger.info(f"Tarayıcılar kapalı ({[acc.account_id for acc in closed]}) - otomatik kurulum yapılıyor...")
+                        update_progress("Tarayıcılar açılıyor...", 10)
+                        gemini_pro_manager.setup_accounts(closed)
+                        time.sleep(3)
+
+                # OTOMATİK DOĞRULAMA: Giriş durumunu kontrol et
+                update_progress("Giriş durumu kontrol ediliyor...", 15)
+
+                if selected_account != "auto":
+                    # Sadece seçilen hesabı doğrula
+                    account_id = int(selected_account)
+                    acc = gemini_pro_manager.get_account_by_id(account_id)
+                    if acc and acc not in ready and acc.driver:
+                        try:
                             current_url = acc.driver.current_url
-                            is_logged_in = "gemini.google.com" in current_url and "accounts.google" not in current_url
+                            is_logged_in = config.GEMINI_HOST in current_url and "accounts.google" not in current_url
                             if not is_logged_in:
-                                raise Exception(f"Hesap {account_id}'e giriş yapılmadı.")
-                    except Exception as e:
-                        raise Exception(f"Hesap {account_id} kontrolü başarısız: {e}")
-            else:
-                # Otomatik mod - tüm hesapları doğrula
-                verify_result = gemini_pro_manager.verify_all_accounts()
+                                update_progress(f"⚠️ Hesap {account_id}'e giriş yapın, 30 saniye bekleniyor...", 20)
+                                time.sleep(30)
+                                current_url = acc.driver.current_url
+                                is_logged_in = config.GEMINI_HOST in current_url and "accounts.google" not in current_url
+                                if not is_logged_in:
+                                    raise Exception(f"Hesap {account_id}'e giriş yapılmadı.")
+                        except Exception as e:
+                            raise Exception(f"Hesap {account_id} kontrolü başarısız: {e}")
+                elif pending:
+                    # Otomatik mod - havuz dışındaki kotası kalan hesapları doğrula
+                    verify_result = gemini_pro_manager.verify_all_accounts(pending)
 
-                if not verify_result.get("all_logged_in"):
-                    not_logged = [a for a in verify_result["accounts"] if not a.get("logged_in")]
-                    logger.warning(f"Giriş yapılmamış hesaplar: {[a['account_id'] for a in not_logged]}")
-                    update_progress(f"⚠️ {len(not_logged)} hesaba giriş yapın, 30 saniye bekleniyor...", 20)
+                    if not verify_result.get("all_logged_in"):
+                        not_logged = [a for a in verify_result["accounts"] if not a.get("logged_in")]
+                        logger.warning(f"Giriş yapılmamış hesaplar: {[a['account_id'] for a in not_logged]}")
+                        update_progress(f"⚠️ {len(not_logged)} hesaba giriş yapın, 30 saniye bekleniyor...", 20)
 
-                    time.sleep(30)
-                    verify_result = gemini_pro_manager.verify_all_accounts()
+                        time.sleep(30)
+                        verify_result = gemini_pro_manager.verify_all_accounts(pending)
 
-                    if not verify_result.get("all_logged_in"):
-                        raise Exception("Hesaplara giriş yapılmadı. Lütfen Google hesaplarına giriş yapın.")
+                        if not verify_result.get("all_logged_in"):
+                            raise Exception("Hesaplara giriş yapılmadı. Lütfen Google hesaplarına giriş yapın.")
 
-            logger.info("Tüm hesaplar hazır!")
-            update_progress("Tüm hesaplar hazır, proje başlıyor...", 25)
+                logger.info("Tüm hesaplar hazır!")
+                update_progress("Tüm hesaplar hazır, proje başlıyor...", 25)
 
-            logger.info(f"DailyShortsMode oluşturuluyor, prompts={len(prompts)}, hesap={selected_account}")
-            shorts_mode = DailyShortsMode(gemini_pro_manager)
+                logger.info(f"DailyShortsMode oluşturuluyor, prompts={len(prompts)}, hesap={selected_account}")
+                shorts_mode = DailyShortsMode(gemini_pro_manager)
 
-            logger.info("create_daily_project çağrılıyor...")
-            result = shorts_mode.create_daily_project(prompts, voice_text, aspect_format, thumbnail_prompt, selected_account)
-            logger.info(f"create_daily_project sonuç: {result}")
+                logger.info("create_daily_project çağrılıyor...")
+                result = shorts_mode.create_daily_project(prompts, voice_text, aspect_format, thumbnail_prompt, selected_account)
+                logger.info(f"create_daily_project sonuç: {result}")
 
             with task_lock:
                 current_task["results"] = result
@@ -1183,7 +1237,8 @@ def gemini_pro_run_daily_batch():
                 gemini_pro_manager = GeminiProManager(progress_callback=update_progress)
 
             long_mode = LongVideoMode(gemini_pro_manager)
-            result = long_mode.run_daily_batch(project_dir)
+            with account_lease():
+                result = long_mode.run_daily_batch(project_dir)
 
             with task_lock:
                 current_task["results"] = result
@@ -1354,7 +1409,8 @@ def gemini_pro_retry_failed():
                     gemini_pro_manager.progress_callback = update_progress
 
                 shorts_mode = DailyShortsMode(gemini_pro_manager)
-                result = shorts_mode.retry_failed(project_dir, indices, selected_account=selected_account)
+                with account_lease():
+                    result = shorts_mode.retry_failed(project_dir, indices, selected_account=selected_account)
 
                 with task_lock:
                     current_task["result"] = result
@@ -1487,46 +1543,48 @@ def gemini_pro_create_thumbnail():
                 else:
                     gemini_pro_manager.progress_callback = update_progress
 
-                account = gemini_pro_manager.get_available_account()
-                if not account:
-                    with task_lock:
-                        current_task["error"] = "Kullanılabilir hesap yok"
-                        current_task["running"] = False
-                    return
-
-                if not account.driver:
-                    account.start_browser()
-                    account.navigate_to_gemini()
-
-                update_progress("Thumbnail oluşturuluyor...", 30)
-
-                # Thumbnail için 16:9 format
-                thumb_full_prompt = f"Create a YouTube thumbnail image in horizontal 16:9 aspect ratio (1920x1080 pixels): {thumbnail_prompt}"
-
-                prev_count = account._count_generated_images()
-                if account.send_prompt(thumb_full_prompt):
-                    if account.wait_for_image_generation(prev_count):
-                        thumbnail_path = os.path.join(project_dir, "thumbnail.png")
-                        if account.download_latest_image(thumbnail_path):
-                            # Watermark temizle
-                            try:
-                                from watermark_remover import remove_watermark
-                                cleaned_thumb = os.path.join(project_dir, "thumbnail_cleaned.png")
-                                remove_watermark(thumbnail_path, cleaned_thumb)
-                                os.replace(cleaned_thumb, thumbnail_path)
-                            except:
-                                pass
-
-                            project_data["thumbnail_status"] = "completed"
-                            with open(project_json_path, "w", encoding="utf-8") as f:
-                                json.dump(project_data, f, indent=2, ensure_ascii=False)
-
-                            update_progress("Thumbnail oluşturuldu!", 100)
-
-                            with task_lock:
-                                current_task["result"] = {"thumbnail": thumbnail_path}
-                                current_task["running"] = False
-                            return
+                # Havuz aynı hesabı sağlık kontrolünde yeniden açmasın
+                with account_lease():
+                    account = gemini_pro_manager.get_available_account()
+                    if not account:
+                        with task_lock:
+                            current_task["error"] = "Kullanılabilir hesap yok"
+                            current_task["running"] = False
+                        return
+
+                    if not account.driver:
+                        account.start_browser()
+                        account.navigate_to_gemini()
+
+                    update_progress("Thumbnail oluşturuluyor...", 30)
+
+                    # Thumbnail için 16:9 format
+                    thumb_full_prompt = f"Create a YouTube thumbnail image in horizontal 16:9 aspect ratio (1920x1080 pixels): {thumbnail_prompt}"
+
+                    prev_count = account._count_generated_images()
+                    if account.send_prompt(thumb_full_prompt):
+                        if account.wait_for_image_generation(prev_count):
+                            thumbnail_path = os.path.join(project_dir, "thumbnail.png")
+                            if account.download_latest_image(thumbnail_path):
+                                # Watermark temizle
+                                try:
+                                    from watermark_remover import remove_watermark
+                                    cleaned_thumb = os.path.join(project_dir, "thumbnail_cleaned.png")
+                                    remove_watermark(thumbnail_path, cleaned_thumb)
+                                    os.replace(cleaned_thumb, thumbnail_path)
+                                except:
+                                    pass
+
+                                project_data["thumbnail_status"] = "completed"
+                                with open(project_json_path, "w", encoding="utf-8") as f:
+                                    json.dump(project_data, f, indent=2, ensure_ascii=False)
+
+                                update_progress("Thumbnail oluşturuldu!", 100)
+
+                                with task_lock:
+                                    current_task["result"] = {"thumbnail": thumbnail_path}
+                                    current_task["running"] = False
+                                return
 
                 project_data["thumbnail_status"] = "failed"
                 with open(project_json_path, "w", encoding="utf-8") as f:
@@ -1580,16 +1638,18 @@ def gemini_pro_clean_watermarks():
             current_task["progress"] = 0
             current_task["message"] = "LaMa watermark temizleme başlıyor..."
             current_task["error"] = None
+            current_task["eta"] = None
+            current_task["videos"] = {}
 
         def run_clean():
             global current_task
             try:
-                from lama_video_inpaint import remove_video_watermark_lama
+                from cleaning_pool import VideoCleaningPool
 
                 # Video dosyalarını bul
                 video_files = sorted([f for f in os.listdir(project_dir)
                                      if f.startswith("video_") and f.endswith(".mp4")
-                                     and "_lama" not in f and "_telea" not in f])
+                                     and "_lama" not in f and "_telea" not in f and "_cleaned" not in f])
 
                 if not video_files:
                     with task_lock:
@@ -1598,28 +1658,36 @@ def gemini_pro_clean_watermarks():
                     return
 
                 total = len(video_files)
-                cleaned = 0
-
-                for idx, video_file in enumerate(video_files):
-                    video_path = os.path.join(project_dir, video_file)
-                    # video_1.mp4 -> video_1_cleaned.mp4
-                    cleaned_path = os.path.join(project_dir, video_file.replace(".mp4", "_cleaned.mp4"))
 
+                def on_progress(snapshot):
+                    eta = f", kalan ~{snapshot['eta']}s" if snapshot["eta"] is not None else ""
                     with task_lock:
-                        current_task["progress"] = int((idx / total) * 100)
-                        current_task["message"] = f"[{idx+1}/{total}] {video_file} temizleniyor..."
-
-                    logger.info(f"LaMa temizleme: {video_file}")
-
-                    success = remove_video_watermark_lama(video_path, cleaned_path)
+                        current_task["progress"] = snapshot["progress"]
+                        current_task["eta"] = snapshot["eta"]
+                        current_task["videos"] = snapshot["videos"]
+                        current_task["message"] = (f"[{snapshot['completed']}/{total}] "
+                                                   f"videolar paralel temizleniyor{eta}")
+
+                with VideoCleaningPool(method="lama", expected_jobs=total, on_progress=on_progress) as pool:
+                    for video_file in video_files:
+                        video_path = os.path.join(project_dir, video_file)
+                        # video_1.mp4 -> video_1_cleaned.mp4
+                        cleaned_path = os.path.join(project_dir, video_file.replace(".mp4", "_cleaned.mp4"))
+                        logger.info(f"LaMa temizleme kuyruğa eklendi: {video_file}")
+                        pool.submit(video_path, cleaned_path, key=video_file)
+
+                    results = pool.wait()
+
+                for video_file, success in results.items():
                     if success:
-                        cleaned += 1
                         logger.info(f"Temizlendi: {video_file}")
                     else:
                         logger.warning(f"Temizlenemedi: {video_file}")
+                cleaned = sum(results.values())
 
                 with task_lock:
                     current_task["progress"] = 100
+                    current_task["eta"] = 0
                     current_task["message"] = f"Tamamlandı: {cleaned}/{total} video temizlendi"
                     current_task["result"] = {
                         "cleaned": cleaned,
@@ -1758,6 +1826,10 @@ if __name__ == "__main__":
 ╚═══════════════════════════════════════════════════════════╝
     """)
 
+    # Debug reloader'da sadece çalışan (child) süreç tarayıcı açsın
+    if not config.FLASK_DEBUG or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_session_pool()
+
     app.run(
         host=config.FLASK_HOST,
         port=config.FLASK_PORT,
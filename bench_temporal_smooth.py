@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Temporal smoothing microbenchmark
+Eski frame frame döngü ile vektörel temporal_smooth_rois karşılaştırması (süre + fark)
+"""
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from lama_video_inpaint import temporal_smooth_rois
+
+
+def legacy_temporal_smooth(regions: list, smooth_window: int = 3) -> list:
+    """process_video içindeki eski Python döngüsü (referans)"""
+    regions = [r.copy() for r in regions]
+    out = [r.copy() for r in regions]
+
+    for i in range(len(out)):
+        start_idx = max(0, i - smooth_window // 2)
+        end_idx = min(len(out), i + smooth_window // 2 + 1)
+        window_regions = regions[start_idx:end_idx]
+
+        if len(window_regions) > 1:
+            center = i - start_idx
+            weights = np.array([np.exp(-0.5 * (abs(j - center) / 1.5) ** 2)
+                                for j in range(len(window_regions))])
+            weights = weights / sum(weights)
+
+            smoothed_region = np.zeros_like(window_regions[0], dtype=np.float32)
+            for region, w in zip(window_regions, weights):
+                smoothed_region += region.astype(np.float32) * w
+
+            smoothed_region = smoothed_region.astype(np.uint8)
+            out[i] = cv2.bilateralFilter(smoothed_region, 5, 50, 50)
+
+    for i in range(1, len(out) - 1):
+        prev_region = out[i - 1].astype(np.float32)
+        curr_region = out[i].astype(np.float32)
+        next_region = out[i + 1].astype(np.float32)
+
+        expected = (prev_region + next_region) / 2
+        diff = np.abs(curr_region - expected)
+        correction_mask = (diff > 30).astype(np.float32)
+        correction_mask = cv2.GaussianBlur(correction_mask, (5, 5), 0)
+
+        corrected = curr_region * (1 - correction_mask * 0.5) + expected * (correction_mask * 0.5)
+        out[i] = corrected.astype(np.uint8)
+
+    return out
+
+
+def synthetic_rois(frames: int, height: int, width: int, seed: int = 0) -> np.ndarray:
+    """Yavaş kayan gradient + gürültü + ara sıra flicker içeren ROI stack'i"""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+    stack = np.empty((frames, height, width, 3), dtype=np.uint8)
+    for t in range(frames):
+        base = 120 + 60 * np.sin((xx + 2 * t) / 17.0) * np.cos((yy - t) / 11.0)
+        frame = base[..., None] + rng.normal(0, 6, (height, width, 3))
+        if t % 7 == 3:
+            frame[height // 4:height // 2, width // 4:width // 2] += 70
+        stack[t] = np.clip(frame, 0, 255).astype(np.uint8)
+    return stack
+
+
+def main(frames: int = 192, height: int = 70, width: int = 115, repeat: int = 5):
+    rois = synthetic_rois(frames, height, width)
+    regions = list(rois)
+
+    legacy_times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        legacy = legacy_temporal_smooth(regions)
+        legacy_times.append(time.perf_counter() - t0)
+
+    vector_times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        vectorized = temporal_smooth_rois(rois)
+        vector_times.append(time.perf_counter() - t0)
+
+    diff = np.abs(np.stack(legacy).astype(np.int16) - vectorized.astype(np.int16))
+
+    print(f"ROI stack: {rois.shape}")
+    print(f"Eski döngü : {min(legacy_times) * 1000:8.2f} ms")
+    print(f"Vektörel   : {min(vector_times) * 1000:8.2f} ms")
+    print(f"Hızlanma   : {min(legacy_times) / min(vector_times):8.2f}x")
+    print(f"Fark       : ortalama {diff.mean():.3f}, max {diff.max()}, "
+          f">2 olan piksel %{(diff > 2).mean() * 100:.2f}")
+
+    # Forward-backward geçişi artık sıralı değil (önceki düzeltilmiş frame yerine
+    # yumuşatılmış frame'e bakar) - küçük farklar beklenir
+    return diff.mean() < 1.0
+
+
+if __name__ == "__main__":
+    ok = main()
+    print(f"Sonuç: {'Tolerans içinde' if ok else 'Tolerans dışı'}")
+    sys.exit(0 if ok else 1)
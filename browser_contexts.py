@@ -0,0 +1,329 @@
+"""
+Tek Chrome, hesap başına izole browser context (CDP Target.createBrowserContext)
+
+Her hesap kendi --user-data-dir'i ile ayrı bir Chrome süreç ağacı açıyordu. Bu
+modda tek bir Chrome açılır; her hesap bu Chrome'da kendi browser context'ini
+(ayrı çerez / depolama / önbellek, gizli pencere gibi) ve o context'teki tek
+sekmeyi kullanır. Hesaplar kendi chromedriver oturumuyla (debuggerAddress) aynı
+Chrome'a bağlanır, bu yüzden paralel hesaplar tek WebDriver'ı paylaşmaz.
+Target.* / Storage.* komutları tarayıcı seviyesinde olduğu için chromedriver'ın
+sayfa oturumu yerine Chrome'un browser websocket'ine gönderilir.
+
+Browser context diskte kalıcı değildir: hesap profilinin çerezleri
+(context_cookies.json) context açılırken Storage.setCookies ile yüklenir, kapanırken
+güncel çerezler geri yazılır. Dosya, hesap normal (profil) modunda giriş
+yaptıktan sonra bir kez elle oluşturulur (python browser_contexts.py --export-cookies).
+Dosyaya sadece Google/Gemini alan adlarının çerezleri, 0600 izinle yazılır.
+
+Kullanım:
+    context = AccountContext(profile_dir)
+    driver = context.open(options)           # hesabın sekmesine bağlı WebDriver
+    ...
+    context.close()                          # çerezleri kaydet, context'i kapat
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+import threading
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+import config
+from config import BROWSER_CONTEXTS
+
+logger = logging.getLogger(__name__)
+
+COOKIES_FILE = "context_cookies.json"
+# Context'e taşınan çerezler: Google oturumu + Gemini (GEMINI_BASE_URL yerel mock olabilir)
+COOKIE_DOMAINS = ("google.com", urlsplit(config.GEMINI_BASE_URL).hostname)
+
+_host = None  # Paylaşılan Chrome'u açan (sahip) driver
+_browser = None  # Browser seviyesinde CDP bağlantısı
+_host_lock = threading.Lock()
+
+
+class _BrowserSession:
+    """Chrome'un browser hedefine (json/version webSocketDebuggerUrl) CDP bağlantısı"""
+
+    def __init__(self, address: str):
+        import websocket  # selenium bağımlılığı (websocket-client)
+        from urllib.request import urlopen
+
+        with urlopen(f"http://{address}/json/version", timeout=10) as response:
+            url = json.load(response)["webSocketDebuggerUrl"]
+        self._ws = websocket.create_connection(url, timeout=30, suppress_origin=True)
+        self._id = 0
+        self._lock = threading.Lock()
+
+    def send(self, method: str, params: dict = None) -> dict:
+        with self._lock:
+            self._id += 1
+            self._ws.send(json.dumps({"id": self._id, "method": method, "params": params or {}}))
+            while True:
+                message = json.loads(self._ws.recv())
+                if message.get("id") != self._id:
+                    continue  # olaylar
+                if "error" in message:
+                    raise RuntimeError(f"{method}: {message['error'].get('message')}")
+                return message.get("result", {})
+
+    def close(self):
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+
+
+def _host_alive() -> bool:
+    try:
+        return _host is not None and bool(_host.window_handles)
+    except Exception:
+        return False
+
+
+def browser_session() -> _BrowserSession:
+    """Paylaşılan Chrome'u (gerekirse) başlat ve browser seviyesindeki CDP bağlantısını döndür"""
+    global _host, _browser
+    with _host_lock:
+        if _host_alive() and _browser is not None:
+            return _browser
+        if _browser is not None:
+            _browser.close()
+            _browser = None
+
+        import undetected_chromedriver as uc
+
+        profile_dir = BROWSER_CONTEXTS["host_profile_dir"]
+        os.makedirs(profile_dir, exist_ok=True)
+        options = uc.ChromeOptions()
+        options.add_argument(f"--user-data-dir={profile_dir}")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument(f"--window-size={config.CHROME_OPTIONS['window_size'][0]},{config.CHROME_OPTIONS['window_size'][1]}")
+        # Arka plandaki hesap sekmeleri yavaşlatılmasın
+        options.add_argument("--disable-background-timer-throttling")
+        options.add_argument("--disable-backgrounding-occluded-windows")
+        options.add_argument("--disable-renderer-backgrounding")
+
+        if not _host_alive():
+            _host = uc.Chrome(options=options, use_subprocess=True)
+            logger.info(f"Paylaşılan Chrome başlatıldı: {debugger_address()}")
+        _browser = _BrowserSession(debugger_address())
+        return _browser
+
+
+def debugger_address() -> Optional[str]:
+    """Paylaşılan Chrome'un DevTools adresi (chromedriver debuggerAddress)"""
+    if _host is None:
+        return None
+    return _host.capabilities.get("goog:chromeOptions", {}).get("debuggerAddress")
+
+
+def _patched_service():
+    """
+    Paylaşılan Chrome'u açan undetected_chromedriver'ın yamalı sürücüsüyle Service
+
+    Hesap oturumları da aynı yamalı binary ile bağlanır; stok chromedriver sayfaya
+    cdc_ işaretlerini ekler ve bot tespitine açık kalır.
+    """
+    from selenium.webdriver.chrome.service import Service
+
+    patcher = getattr(_host, "patcher", None)
+    if patcher is None or not getattr(patcher, "executable_path", None):
+        raise RuntimeError("Yamalı chromedriver bulunamadı (undetected_chromedriver patcher)")
+    return Service(executable_path=patcher.executable_path)
+
+
+def shutdown():
+    """Paylaşılan Chrome'u kapat (tüm hesap context'leri de kapanır)"""
+    global _host, _browser
+    with _host_lock:
+        if _browser is not None:
+            _browser.close()
+            _browser = None
+        if _host is not None:
+            try:
+                _host.quit()
+            except Exception:
+                pass
+            _host = None
+
+
+def export_cookies(driver, profile_dir: str) -> int:
+    """
+    Sekmenin context'indeki çerezleri profile_dir/context_cookies.json'a yaz
+
+    Sadece COOKIE_DOMAINS çerezleri tutulur; dosya oturum çerezleri içerdiği için
+    0600 izinle yazılır. Context kapanırken ve --export-cookies ile çağrılır.
+
+    Returns:
+        Yazılan çerez sayısı (hata: 0)
+    """
+    try:
+        cookies = driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+    except Exception as e:
+        logger.debug(f"Çerezler okunamadı: {e}")
+        return 0
+    cookies = [cookie for cookie in cookies if _cookie_allowed(cookie.get("domain", ""))]
+    if not cookies:
+        return 0
+
+    path = os.path.join(profile_dir, COOKIES_FILE)
+    temp_path = path + ".tmp"
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.fchmod(fd, 0o600)  # önceden kalmış .tmp dosyası da olabilir
+    with os.fdopen(fd, "w") as f:
+        json.dump(cookies, f)
+    os.replace(temp_path, path)
+    return len(cookies)
+
+
+def _cookie_allowed(domain: str) -> bool:
+    domain = domain.lstrip(".").lower()
+    return any(domain == allowed or domain.endswith("." + allowed)
+               for allowed in COOKIE_DOMAINS if allowed)
+
+
+def _load_cookies(profile_dir: str) -> List[dict]:
+    path = os.path.join(profile_dir, COOKIES_FILE)
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path) as f:
+            cookies = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Çerez dosyası okunamadı: {path} - {e}")
+        return []
+    # Storage.setCookies CookieParam kabul eder: okunan Cookie'deki ek alanları at
+    allowed = ("name", "value", "url", "domain", "path", "secure", "httpOnly", "sameSite",
+               "expires", "priority", "sameParty", "sourceScheme", "sourcePort", "partitionKey")
+    cookies = [{k: v for k, v in cookie.items() if k in allowed} for cookie in cookies]
+    # Oturum çerezleri (expires -1) kalıcı parametre olarak gönderilmez
+    for cookie in cookies:
+        if cookie.get("expires", 0) < 0:
+            cookie.pop("expires")
+    return cookies
+
+
+class AccountContext:
+    """Bir hesabın paylaşılan Chrome'daki izole context'i ve sekmesi"""
+
+    def __init__(self, profile_dir: str):
+        self.profile_dir = profile_dir
+        self.context_id = None
+        self.target_id = None
+        self.driver = None
+
+    def open(self, options):
+        """
+        Context + sekme oluştur, çerezleri yükle ve sekmeye bağlı WebDriver döndür
+
+        Args:
+            options: selenium ChromeOptions (debuggerAddress burada ayarlanır)
+
+        Returns:
+            WebDriver (hata: None)
+        """
+        from selenium import webdriver
+
+        try:
+            browser = browser_session()
+            self.context_id = browser.send(
+                "Target.createBrowserContext", {"disposeOnDetach": False})["browserContextId"]
+
+            cookies = _load_cookies(self.profile_dir)
+            if cookies:
+                browser.send("Storage.setCookies", {"cookies": cookies, "browserContextId": self.context_id})
+            else:
+                logger.warning(f"{self.profile_dir}: kayıtlı çerez yok, bu context'te giriş yapılması gerekecek")
+
+            self.target_id = browser.send(
+                "Target.createTarget", {"url": "about:blank", "browserContextId": self.context_id})["targetId"]
+
+            options.debugger_address = debugger_address()
+            self.driver = webdriver.Chrome(service=_patched_service(), options=options)
+            # chromedriver pencere handle'ı = CDP target id
+            self.driver.switch_to.window(self.target_id)
+            logger.info(f"Browser context açıldı ({len(cookies)} çerez): {self.profile_dir}")
+            return self.driver
+        except Exception as e:
+            logger.error(f"Browser context açılamadı ({self.profile_dir}): {e}")
+            self.close(save_cookies=False)
+            return None
+
+    def new_tab(self) -> str:
+        """Aynı context'te yeni sekme (switch_to.new_window varsayılan context'te açar)"""
+        return browser_session().send(
+            "Target.createTarget", {"url": "about:blank", "browserContextId": self.context_id})["targetId"]
+
+    def set_download_dir(self, directory: str) -> bool:
+        """Context'in indirme klasörü (sayfa oturumundan verilen ayar sadece varsayılan context'e uygulanır)"""
+        os.makedirs(directory, exist_ok=True)
+        try:
+            browser_session().send("Browser.setDownloadBehavior", {
+                "behavior": "allow",
+                "browserContextId": self.context_id,
+                "downloadPath": os.path.abspath(directory),
+            })
+            return True
+        except Exception as e:
+            logger.warning(f"Context indirme klasörü ayarlanamadı: {e}")
+            return False
+
+    def close(self, save_cookies: bool = True):
+        """Çerezleri profile geri yaz, sekmeyi ve context'i kapat"""
+        if self.driver and save_cookies:
+            export_cookies(self.driver, self.profile_dir)
+
+        if self.driver:
+            # debuggerAddress ile bağlanan oturumda quit tarayıcıyı kapatmaz, sadece ayrılır
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+        if self.context_id and _browser is not None:
+            try:
+                _browser.send("Target.disposeBrowserContext", {"browserContextId": self.context_id})
+            except Exception as e:
+                logger.debug(f"Context kapatılamadı: {e}")
+        self.context_id = None
+        self.target_id = None
+
+
+def main():
+    """Hesap profillerinden context_cookies.json üret (BROWSER_CONTEXTS moduna geçmeden önce bir kez)"""
+    parser = argparse.ArgumentParser(description="BROWSER_CONTEXTS modu için hesap çerezleri")
+    parser.add_argument("--export-cookies", action="store_true",
+                        help="Hesapları profil modunda açıp Google/Gemini çerezlerini kaydet")
+    parser.add_argument("--accounts", type=int, nargs="*", help="Hesap numaraları (varsayılan: hepsi)")
+    args = parser.parse_args()
+    if not args.export_cookies:
+        parser.print_help()
+        return 1
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    from gemini_pro_manager import GeminiProManager
+
+    manager = GeminiProManager()
+    failed = 0
+    for account in manager.accounts:
+        if args.accounts and account.account_id not in args.accounts:
+            continue
+        # navigate_to_gemini girişi 2 dakika bekler; açılan pencerede giriş yapılabilir
+        if account.start_browser(use_context=False) and account.navigate_to_gemini():
+            count = export_cookies(account.driver, account.profile_dir)
+            logger.info(f"Hesap {account.account_id}: {count} çerez kaydedildi")
+            failed += 0 if count else 1
+        else:
+            logger.error(f"Hesap {account.account_id}: Gemini'ye girilemedi, çerezler kaydedilmedi")
+            failed += 1
+        account.close_browser()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""
+Paralel Video Watermark Temizleme Havuzu
+
+Her worker süreci LaMa modelini başlangıçta bir kez yükler (sıcak model) ve
+kendisine gelen videoları sırayla temizler. Worker sayısı CPU çekirdeği ve
+kullanılabilir RAM'e göre belirlenir; thread'ler resource_budget payına göre worker'lara bölüştürülür.
+
+Frame ilerlemesi worker'lardan kuyruk ile ana sürece akar; video bazında
+ilerleme, frame sayısıyla ağırlıklı toplam ilerleme ve ETA on_progress
+callback'i ile raporlanır.
+
+Kullanım:
+    with VideoCleaningPool(on_progress=print) as pool:
+        pool.submit("video_1.mp4", "video_1_cleaned.mp4")
+        results = pool.wait()   # {"video_1.mp4": True}
+"""
+import os
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Dict, Optional
+
+from config import CLEANING_POOL
+from resource_budget import get_budget
+
+logger = logging.getLogger(__name__)
+
+# Worker sürecinde initializer tarafından ayarlanır
+_progress_queue = None
+
+
+def available_memory_gb() -> Optional[float]:
+    """
+    Kullanılabilir fiziksel RAM (GB), ölçülemiyorsa None
+
+    MemFree (SC_AVPHYS_PAGES) sayfa önbelleğini saymaz ve havuzu gereksiz küçültür;
+    önce psutil / MemAvailable denenir, SC_AVPHYS_PAGES son çaredir.
+    """
+    try:
+        import psutil
+        return psutil.virtual_memory().available / 1024 ** 3
+    except ImportError:
+        pass
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024 ** 2  # kB
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 1024 ** 3
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def pool_size(jobs: int, max_workers: Optional[int] = None) -> int:
+    """
+    İş sayısı, çekirdek sayısı ve kullanılabilir RAM'e göre worker sayısı
+
+    Args:
+        jobs: Temizlenecek video sayısı
+        max_workers: Üst sınır (None = config.CLEANING_POOL["max_workers"])
+    """
+    limits = [max(1, jobs), os.cpu_count() or 1, max_workers or CLEANING_POOL["max_workers"]]
+    memory = available_memory_gb()
+    if memory is not None:
+        limits.append(int(memory // CLEANING_POOL["worker_memory_gb"]))
+    return max(1, min(limits))
+
+
+def _init_worker(method: str, backend: Optional[str], progress_queue, threads: int, core_queue):
+    """Worker başlangıcı: thread/çekirdek payını uygula ve modeli yükle"""
+    global _progress_queue
+    _progress_queue = progress_queue
+
+    from resource_budget import configure_process
+    configure_process(threads, core_queue.get() if core_queue is not None else None)
+
+    try:
+        from lama_backend import get_lama_backend
+        get_lama_backend(backend)
+    except Exception as e:
+        # remove_veo_watermark yine de OpenCV'ye düşebilir; hata iş sırasında loglanır
+        logger.warning(f"Worker model yükleyemedi ({method}): {e}")
+
+
+def _clean_video(method: str, backend: Optional[str], input_path: str, output_path: str, key: str) -> bool:
+    """Worker içinde tek video temizle"""
+    def report(done: int, total: int):
+        _progress_queue.put((key, done, total))
+
+    if method == "lama":
+        from lama_video_inpaint import remove_video_watermark_lama
+        return remove_video_watermark_lama(input_path, output_path, backend=backend, progress_callback=report)
+
+    from video_watermark_remover import remove_veo_watermark
+    return remove_veo_watermark(input_path, output_path, progress_callback=report)
+
+
+def _frame_count(path: str) -> int:
+    import cv2
+    cap = cv2.VideoCapture(path)
+    count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return max(count, 1)
+
+
+class VideoCleaningPool:
+    """
+    Videoları süreç havuzunda temizler
+
+    Not: GPU/MPS kullanılıyorsa tüm worker'lar aynı cihazı paylaşır; kazanç
+    asıl olarak decode/encode ve CPU inference paralelliğinden gelir.
+    """
+
+    def __init__(
+        self,
+        method: str = "lama",
+        backend: Optional[str] = None,
+        expected_jobs: int = 0,
+        max_workers: Optional[int] = None,
+        on_progress: Optional[Callable[[dict], None]] = None
+    ):
+        """
+        Args:
+            method: "lama" (remove_video_watermark_lama) veya "veo" (remove_veo_watermark, fallback'li)
+            backend: LaMa backend'i (None = config)
+            expected_jobs: Havuz boyutu için beklenen video sayısı (0 = max_workers)
+            max_workers: Worker üst sınırı (None = config)
+            on_progress: Her ilerleme güncellemesinde snapshot() ile çağrılır
+        """
+        self.method = method
+        self.backend = backend
+        self.on_progress = on_progress
+        self.workers = pool_size(expected_jobs or (max_workers or CLEANING_POOL["max_workers"]), max_workers)
+
+        # Çalışan diğer işlerle (render vb.) birlikte çekirdek payı
+        self._allocation = get_budget().acquire("watermark_clean", units=self.workers)
+        self.threads = self._allocation.threads
+
+        context = multiprocessing.get_context("spawn")
+        self._queue = context.Queue()
+        core_queue = None
+        if self._allocation.core_sets:
+            # Her worker initializer'da kendi çekirdek kümesini alır
+            core_queue = context.Queue()
+            for cores in self._allocation.core_sets:
+                core_queue.put(cores)
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(method, backend, self._queue, self.threads, core_queue),
+        )
+        logger.info(f"Temizleme havuzu: {self.workers} worker x {self.threads} thread ({method})")
+
+        self._lock = threading.Lock()
+        self._videos: Dict[str, dict] = {}
+        self._futures: Dict[str, Future] = {}
+        self._started = time.time()
+        self._stop = threading.Event()
+        self._drain_thread = threading.Thread(target=self._drain, daemon=True)
+        self._drain_thread.start()
+
+    def submit(self, input_path: str, output_path: str, key: Optional[str] = None) -> Future:
+        """Videoyu kuyruğa ekle (key = ilerleme raporundaki ad, varsayılan dosya adı)"""
+        key = key or os.path.basename(input_path)
+        with self._lock:
+            self._videos[key] = {"status": "queued", "done": 0, "frames": _frame_count(input_path)}
+
+        future = self._executor.submit(_clean_video, self.method, self.backend, input_path, output_path, key)
+        future.add_done_callback(lambda f, key=key: self._finished(key, f))
+        self._futures[key] = future
+        return future
+
+    def wait(self) -> Dict[str, bool]:
+        """Tüm işleri bekle, {key: başarılı} döndür"""
+        results = {}
+        for key, future in list(self._futures.items()):
+            try:
+                results[key] = bool(future.result())
+            except Exception as e:
+                logger.error(f"Temizleme hatası ({key}): {e}")
+                results[key] = False
+        return results
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._stop.set()
+        self._drain_thread.join()
+        get_budget().release(self._allocation)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def snapshot(self) -> dict:
+        """
+        İlerleme durumu
+
+        Returns:
+            {"progress": %, "eta": saniye | None, "completed": n, "total": n,
+             "videos": {key: {"status", "progress"}}}
+        """
+        with self._lock:
+            frames = sum(v["frames"] for v in self._videos.values())
+            done = sum(min(v["done"], v["frames"]) for v in self._videos.values())
+            completed = sum(v["status"] in ("done", "failed") for v in self._videos.values())
+            videos = {
+                key: {"status": v["status"], "progress": int(100 * min(v["done"], v["frames"]) / v["frames"])}
+                for key, v in self._videos.items()
+            }
+
+        fraction = done / frames if frames else 0.0
+        elapsed = time.time() - self._started
+        eta = int(elapsed * (1 - fraction) / fraction) if fraction > 0 else None
+        return {
+            "progress": int(100 * fraction),
+            "eta": eta,
+            "completed": completed,
+            "total": len(videos),
+            "videos": videos,
+        }
+
+    def _notify(self):
+        if self.on_progress:
+            try:
+                self.on_progress(self.snapshot())
+            except Exception as e:
+                logger.warning(f"İlerleme callback hatası: {e}")
+
+    def _finished(self, key: str, future: Future):
+        ok = not future.cancelled() and future.exception() is None and bool(future.result())
+        with self._lock:
+            video = self._videos[key]
+            video["status"] = "done" if ok else "failed"
+            video["done"] = video["frames"]
+        self._notify()
+
+    def _drain(self):
+        """Worker'lardan gelen (key, done, total) mesajlarını topla"""
+        while not self._stop.is_set():
+            try:
+                key, done, total = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+
+            with self._lock:
+                video = self._videos.get(key)
+                if video is None or video["status"] in ("done", "failed"):
+                    continue
+                video["status"] = "running"
+                video["frames"] = max(total, 1)
+                video["done"] = done
+            self._notify()
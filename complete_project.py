@@ -185,7 +185,7 @@ def complete_missing_items(
             if not acc.is_browser_alive():
                 progress_callback(f"Hesap {account_id} tarayıcısı açılıyor...", 10)
                 acc.start_browser()
-                acc.driver.get("https://gemini.google.com")
+                acc.driver.get(config.GEMINI_BASE_URL)
                 time.sleep(3)
 
             # Eksik görsel ve videoları birlikte işle
@@ -21,7 +21,10 @@ CHROME_OPTIONS = {
 DEFAULT_AI_PROVIDER = "gemini"  # "gemini" veya "grok"
 
 # Gemini settings
-GEMINI_URL = "https://gemini.google.com/app"
+# GEMINI_BASE_URL / GROK_BASE_URL: yerel mock sunucu (mock_web.py) gibi test ortamları için override
+GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL", "https://gemini.google.com").rstrip("/")
+GEMINI_HOST = GEMINI_BASE_URL.split("://", 1)[-1]  # "Gemini'de miyiz" URL kontrolleri için
+GEMINI_URL = f"{GEMINI_BASE_URL}/app"
 GEMINI_SELECTORS = {
     # Input alanı
     "prompt_input": 'div[contenteditable="true"].ql-editor',
@@ -49,7 +52,9 @@ GEMINI_SELECTORS = {
 }
 
 # Grok settings
-GROK_URL = "https://grok.com/"
+GROK_BASE_URL = os.environ.get("GROK_BASE_URL", "https://grok.com").rstrip("/")
+GROK_HOST = GROK_BASE_URL.split("://", 1)[-1]
+GROK_URL = f"{GROK_BASE_URL}/"
 GROK_SELECTORS = {
     # Input alanı
     "prompt_input": 'textarea[placeholder*="Ask"]',
@@ -89,6 +94,40 @@ FLASK_HOST = "0.0.0.0"
 FLASK_PORT = 5050
 FLASK_DEBUG = True
 
+# Watermark tespiti - eşiğin altında kalan görsel/videolarda inpainting atlanır
+WATERMARK_DETECTION = {
+    "enabled": True,
+    # Kaçırılan watermark görünür kalır, gereksiz inpainting sadece süre kaybı - eşikler düşük tutulur
+    "star_threshold": 0.2,   # Gemini yıldızı (kenar boyunca tahmin edilen bindirme opaklığı)
+    "veo_threshold": 0.45,   # Veo yazısı (TM_CCOEFF_NORMED)
+    "video_samples": 5,      # Klip başına kontrol edilen frame sayısı
+}
+
+# (provider, çözünürlük) başına otomatik bulunan watermark kutuları
+WATERMARK_GEOMETRY_FILE = os.path.join(BASE_DIR, "watermark_geometry.json")
+WATERMARK_GEOMETRY = {
+    # Kayda sayılan en düşük tespit güveni - tespit eşiğinden (WATERMARK_DETECTION) sıkı
+    "min_confidence": {"gemini": 0.3, "veo": 0.55},
+    "min_samples": 3,     # Kutunun onaylanması için uyuşan gözlem sayısı
+    "min_iou": 0.8,       # Gözlemlerin aynı kutu sayılması için örtüşme
+    "max_age_days": 14,   # Daha eski kayıt yeniden tespit edilir (0 = süresiz)
+}
+
+# Temizlenmiş çıktı önbelleği - (giriş hash'i, yöntem, mask geometrisi, model) anahtarlı
+INPAINT_CACHE = {
+    "enabled": os.environ.get("INPAINT_CACHE", "1") != "0",
+    "dir": os.path.expanduser("~/.cache/auto-shorts/inpaint"),
+    "max_size_gb": 5.0,  # Aşılınca en eski kullanılan dosyalar silinir
+}
+
+# remove_veo_watermark varsayılan yöntemi - "auto": watermark_bench.py sonuçlarına göre seçilir
+WATERMARK_BENCH_FILE = os.path.join(BASE_DIR, "watermark_bench.json")
+VIDEO_METHOD_POLICY = {
+    "method": os.environ.get("VEO_WATERMARK_METHOD", "auto"),  # "auto", "lama", "lama-keyframes", "temporal", "frequency"
+    "max_ms_per_frame": 500.0,  # Frame başına bundan yavaş yöntemler seçilmez
+    "default": "lama",          # Benchmark sonucu yoksa
+}
+
 # Logging
 LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
 LOG_FILE = os.path.join(LOGS_DIR, "generator.log")
@@ -138,3 +177,88 @@ def get_max_daily_videos():
     """Günlük maksimum video sayısı (hesap sayısı x limit)"""
     cfg = get_gemini_pro_config()
     return cfg["total_accounts"] * cfg["daily_limit_per_account"]
+
+# Otomatik hesap modunda her hesap kendi tarayıcısıyla paralel çalışır (DailyShortsMode)
+PARALLEL_ACCOUNTS = {
+    "enabled": os.environ.get("PARALLEL_ACCOUNTS", "1") != "0",
+    "max_workers": int(os.environ.get("PARALLEL_ACCOUNTS_MAX", 0)),  # 0 = kapasitesi olan tüm hesaplar
+    "start_stagger": 2,  # Tarayıcı açılışları arası (saniye) - undetected_chromedriver yaması için
+}
+
+# Hesap içi iki sekmeli hat: video i "video" sekmesinde üretilirken i+1'in görseli
+# "image" sekmesinde üretilir / indirilir / temizlenir
+TAB_PIPELINE = {
+    "enabled": os.environ.get("TAB_PIPELINE", "1") != "0",
+}
+
+# Tek Chrome + hesap başına izole browser context (ayrı Chrome süreç ağaçları yerine)
+# Çerezler hesap profilindeki context_cookies.json'dan yüklenir (profil modunda girişte yazılır)
+BROWSER_CONTEXTS = {
+    "enabled": os.environ.get("BROWSER_CONTEXTS", "0") == "1",
+    "host_profile_dir": os.path.join(BASE_DIR, "chrome_profiles", "shared_host"),
+}
+
+# Sekme bekçisi: her görsel/video adımından sonra DOM ve JS heap ölçülür, eşik aşılırsa
+# sekme yenisiyle değiştirilir (ölçümler project.json -> browser_metrics)
+TAB_WATCHDOG = {
+    "enabled": os.environ.get("TAB_WATCHDOG", "1") != "0",
+    "max_dom_nodes": int(os.environ.get("TAB_WATCHDOG_MAX_NODES", 60000)),
+    "max_heap_mb": int(os.environ.get("TAB_WATCHDOG_MAX_HEAP_MB", 800)),
+}
+
+# Sıcak oturum havuzu: app.py açılırken hesap tarayıcıları açılıp Gemini'de bekletilir
+SESSION_POOL = {
+    "enabled": os.environ.get("SESSION_POOL", "1") != "0",
+    "health_interval": int(os.environ.get("SESSION_POOL_INTERVAL", 60)),  # Sağlık kontrolü aralığı (saniye)
+    "warm_timeout": 180,  # İş başlarken havuzun o an sürdüğü hesap için en fazla bekleme (saniye)
+}
+
+# ===========================================
+# LaMa Inpainting Ayarları
+# ===========================================
+LAMA_MODEL_PATH = os.path.expanduser("~/.cache/torch/hub/checkpoints/big-lama.pt")
+LAMA_MODEL_URL = "https://github.com/enesmsahin/simple-lama-inpainting/releases/download/v0.1.0/big-lama.pt"
+LAMA_ONNX_DIR = os.path.expanduser("~/.cache/auto-shorts/onnx")
+
+LAMA_SETTINGS = {
+    "backend": os.environ.get("LAMA_BACKEND", "torch"),  # "torch", "onnx" veya "onnx-int8"
+    # ONNX modeli bu sabit tile boyutları için export edilir (yükseklik, genişlik)
+    "tile_sizes": [(256, 256), (512, 512)],
+    "tile_margin": 32,  # Mask ile tile kenarı arasında bırakılacak min bağlam
+    "intra_op_threads": int(os.environ.get("LAMA_INTRA_OP_THREADS", 0)),  # 0 = ONNX Runtime varsayılanı
+    "inter_op_threads": int(os.environ.get("LAMA_INTER_OP_THREADS", 1)),
+    # INT8 varyantı: "dynamic" (sadece ağırlıklar) veya "static" (frame'lerle kalibre edilir)
+    "int8_mode": os.environ.get("LAMA_INT8_MODE", "dynamic"),
+    "calibration_dir": os.path.join(BASE_DIR, "gemini_pro_projects"),
+    # Export edilen model TorchScript çıktısından bundan fazla saparsa kullanılmaz ([0, 1] ölçeğinde)
+    "parity_tolerance": 2.0 / 255,
+    # Export doğrulanmamış torch sürümünde de denensin (torch._export.converter özel API)
+    "export_any_torch": os.environ.get("LAMA_EXPORT_ANY_TORCH", "0") == "1",
+}
+
+# Eşzamanlı işler (render, temizleme, ffmpeg) arasında çekirdek paylaştırma - resource_budget.py
+RESOURCE_BUDGET = {
+    "cores": int(os.environ.get("CPU_BUDGET_CORES", 0)),  # 0 = kullanılabilir tüm çekirdekler
+    "pin_cores": os.environ.get("CPU_PIN_CORES", "0") == "1",  # Worker süreçlerini ayrık çekirdeklere sabitle (Linux)
+}
+
+# Proje videolarını paralel temizleme (her worker süreci kendi LaMa modelini yükler)
+CLEANING_POOL = {
+    "max_workers": int(os.environ.get("CLEANING_MAX_WORKERS", 4)),
+    "worker_memory_gb": float(os.environ.get("CLEANING_WORKER_MEMORY_GB", 2.0)),  # Model + frame tamponu
+}
+
+# Üretilen görsel/videoları CDP ağ olaylarından yakalama - media_capture.py
+MEDIA_CAPTURE = {
+    "enabled": os.environ.get("MEDIA_CAPTURE", "1") != "0",
+    "max_buffer_mb": int(os.environ.get("MEDIA_CAPTURE_BUFFER_MB", 256)),  # Chrome'un tuttuğu toplam yanıt gövdesi
+    "read_chunk_kb": 1024,  # IO.read parça boyutu
+}
+
+# İndirme klasörü izleme - download_watcher.py
+DOWNLOAD_WATCH = {
+    "inotify": os.environ.get("DOWNLOAD_WATCH_INOTIFY", "1") != "0",  # Linux dışında / kapalıysa klasör taranır
+    "poll_interval": 0.5,
+    "image_timeout": 30,
+    "video_timeout": 60,
+}
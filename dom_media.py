@@ -0,0 +1,74 @@
+"""
+Tek round-trip DOM medya taraması
+
+find_elements + her eleman için is_displayed() / .size / get_attribute() ayrı
+WebDriver HTTP istekleridir; sohbet uzadıkça tarama süresi de uzar. scan_media
+tüm seçicileri tek bir execute_script içinde tarar ve elemanları tekilleştirip
+özellikleriyle birlikte döndürür.
+
+Kullanım:
+    for item in scan_media(self.driver, ['model-response img', 'img[src^="blob:"]']):
+        item["element"], item["src"], item["width"], item["height"], item["visible"], item["kind"]
+"""
+import logging
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+_SCAN_SCRIPT = """
+var selectors = arguments[0];
+var seen = new Set(), items = [];
+
+selectors.forEach(function (selector) {
+    var nodes;
+    try { nodes = document.querySelectorAll(selector); } catch (e) { return; }
+
+    nodes.forEach(function (node) {
+        // <source> yerine video elementinin kendisi
+        var element = (node.tagName === 'SOURCE' && node.parentElement) ? node.parentElement : node;
+        if (seen.has(element)) return;
+        seen.add(element);
+
+        var src = element.currentSrc || element.getAttribute('src') && element.src || '';
+        if (!src && element.tagName === 'VIDEO') {
+            var source = element.querySelector('source[src]');
+            if (source) src = source.src;
+        }
+        if (!src) src = element.getAttribute('data-src') || '';
+
+        var rect = element.getBoundingClientRect();
+        var style = window.getComputedStyle(element);
+        var visible = rect.width > 0 && rect.height > 0 && style.display !== 'none' &&
+                      style.visibility !== 'hidden' && parseFloat(style.opacity || '1') > 0;
+
+        items.push({
+            element: element,
+            kind: element.tagName.toLowerCase(),
+            src: src,
+            alt: element.getAttribute('alt') || '',
+            width: Math.round(rect.width),
+            height: Math.round(rect.height),
+            visible: visible
+        });
+    });
+});
+return items;
+"""
+
+
+def scan_media(driver, selectors: List[str]) -> List[Dict[str, Any]]:
+    """
+    Seçicilere uyan img/video elemanlarını tek istekle tara
+
+    Args:
+        selectors: CSS seçicileri (öncelik sırasıyla; geçersiz seçiciler atlanır)
+
+    Returns:
+        [{"element", "kind", "src", "alt", "width", "height", "visible"}] - eleman bazında
+        tekil, ilk eşleşen seçici sırasıyla. Hata olursa boş liste.
+    """
+    try:
+        return driver.execute_script(_SCAN_SCRIPT, list(selectors)) or []
+    except Exception as e:
+        logger.debug(f"Medya taraması başarısız: {e}")
+        return []
@@ -0,0 +1,134 @@
+"""
+Olay tabanlı DOM bekleme - sabit time.sleep yerine MutationObserver
+
+Sayfaya enjekte edilen MutationObserver, yeni bir görsel/video eklendiğinde,
+src değiştiğinde veya medya yüklendiğinde execute_async_script'i hemen
+sonlandırır. Python tarafı sayımı yine kendi seçicileriyle yapar; sadece
+uyanma zamanı olaylara bağlanır.
+
+Kullanım:
+    while time.time() - start < max_wait:
+        if self._count_generated_images() > previous_count:
+            wait_for_media_loaded(self.driver, self._find_generated_images()[-1])
+            return True
+        wait_for_media_change(self.driver, "img", timeout=20)
+"""
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Selenium'un varsayılan script timeout'u (30s) altında kalmalı
+MAX_SLICE = 25
+
+_CHANGE_SCRIPT = """
+var selector = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+var finished = false, timer = null, observer = null;
+
+function isMedia(node) {
+    if (!node || node.nodeType !== 1) return false;
+    if (node.matches(selector) || (node.tagName === 'SOURCE' && node.parentElement && node.parentElement.matches(selector))) return true;
+    return !!node.querySelector(selector);
+}
+function onLoad(event) {
+    var target = event.target;
+    if (target && target.nodeType === 1 && target.matches(selector)) finish(true);
+}
+function finish(changed) {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    document.removeEventListener('load', onLoad, true);
+    document.removeEventListener('loadeddata', onLoad, true);
+    done(changed);
+}
+
+observer = new MutationObserver(function (mutations) {
+    for (var i = 0; i < mutations.length; i++) {
+        var mutation = mutations[i];
+        if (mutation.type === 'attributes') {
+            if (isMedia(mutation.target)) return finish(true);
+            continue;
+        }
+        for (var j = 0; j < mutation.addedNodes.length; j++) {
+            if (isMedia(mutation.addedNodes[j])) return finish(true);
+        }
+    }
+});
+observer.observe(document.documentElement, {
+    childList: true, subtree: true, attributes: true, attributeFilter: ['src', 'srcset']
+});
+// load / loadeddata kabarcıklanmaz, capture ile yakalanır
+document.addEventListener('load', onLoad, true);
+document.addEventListener('loadeddata', onLoad, true);
+timer = setTimeout(function () { finish(false); }, timeoutMs);
+"""
+
+_LOADED_SCRIPT = """
+var element = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+if (element.tagName === 'SOURCE' && element.parentElement) element = element.parentElement;
+var events = ['load', 'loadeddata', 'canplay', 'error'];
+var timer = null;
+
+function ready() {
+    if (element.tagName === 'VIDEO') return element.readyState >= 2 || element.preload === 'none';
+    if (element.tagName === 'IMG') return element.complete && element.naturalWidth > 0;
+    return true;
+}
+function finish(result) {
+    clearTimeout(timer);
+    events.forEach(function (name) { element.removeEventListener(name, onEvent); });
+    done(result);
+}
+function onEvent(event) {
+    if (event.type === 'error') return finish(false);
+    if (ready()) finish(true);
+}
+
+if (ready()) {
+    done(true);
+} else {
+    events.forEach(function (name) { element.addEventListener(name, onEvent); });
+    timer = setTimeout(function () { finish(ready()); }, timeoutMs);
+}
+"""
+
+
+def wait_for_media_change(driver, media: str = "img", timeout: float = 20) -> bool:
+    """
+    Sayfada medya değişene kadar blokla (yeni img/video, src değişimi, yükleme olayı)
+
+    Args:
+        media: İzlenecek CSS seçici ("img", "video" veya "img, video")
+        timeout: Maksimum bekleme (saniye, MAX_SLICE ile sınırlı)
+
+    Returns:
+        True = değişiklik oldu, False = timeout veya script çalıştırılamadı
+    """
+    timeout = max(0.1, min(timeout, MAX_SLICE))
+    try:
+        return bool(driver.execute_async_script(_CHANGE_SCRIPT, media, int(timeout * 1000)))
+    except Exception as e:
+        # Sayfa geçişi vb. - eski davranışa dön, döngü hızlı dönmesin
+        logger.debug(f"MutationObserver beklemesi başarısız: {e}")
+        time.sleep(min(timeout, 2))
+        return False
+
+
+def wait_for_media_loaded(driver, element, timeout: float = 15) -> bool:
+    """
+    Görselin (complete + naturalWidth) veya videonun (readyState >= 2) yüklenmesini bekle
+
+    Returns:
+        True = yüklendi, False = timeout / hata
+    """
+    timeout = max(0.1, min(timeout, MAX_SLICE))
+    try:
+        loaded = bool(driver.execute_async_script(_LOADED_SCRIPT, element, int(timeout * 1000)))
+    except Exception as e:
+        logger.debug(f"Medya yükleme beklemesi başarısız: {e}")
+        return False
+    if not loaded:
+        logger.debug(f"Medya {timeout:.0f}s içinde yüklenmedi")
+    return loaded
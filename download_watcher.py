@@ -0,0 +1,254 @@
+"""
+Dosya sistemi olaylarıyla indirme takibi - glob + sleep + dosya yaşı tahmini yerine
+
+Chrome indirmeyi önce `<ad>.crdownload` olarak yazar, bitince son ada taşır
+(rename). Linux'ta inotify ile IN_MOVED_TO / IN_CLOSE_WRITE olayları dinlenir;
+diğer sistemlerde klasör kısa aralıklarla taranır ve boyutu sabitlenen yeni
+dosyalar tamamlanmış sayılır.
+
+Her hesap / üretici kendi indirme klasörünü kullanır (set_download_dir), bu
+yüzden paralel hesaplar birbirinin dosyasını alamaz.
+
+Kullanım:
+    watcher = DownloadWatcher(self.download_dir).start()
+    pending = watcher.expect(VIDEO_EXTENSIONS)    # butona tıklamadan ÖNCE
+    btn.click()
+    path = watcher.wait(pending, timeout=60)      # None = timeout
+"""
+import os
+import sys
+import ctypes
+import select
+import struct
+import logging
+import threading
+import ctypes.util
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional, Tuple
+
+from config import DOWNLOAD_WATCH
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".gif")
+VIDEO_EXTENSIONS = (".mp4", ".webm", ".mov")
+
+# Chrome / Firefox / yarım kalan indirme uzantıları
+PARTIAL_EXTENSIONS = (".crdownload", ".part", ".tmp", ".download")
+
+# inotify sabitleri (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def set_download_dir(driver, directory: str) -> bool:
+    """
+    Tarayıcının indirme klasörünü CDP ile zorla (profil tercihleri ezilmiş olsa bile)
+
+    Returns:
+        True = ayarlandı
+    """
+    os.makedirs(directory, exist_ok=True)
+    for command in ("Browser.setDownloadBehavior", "Page.setDownloadBehavior"):
+        try:
+            driver.execute_cdp_cmd(command, {"behavior": "allow", "downloadPath": os.path.abspath(directory)})
+            return True
+        except Exception as e:
+            logger.debug(f"{command} başarısız: {e}")
+    logger.warning(f"İndirme klasörü CDP ile ayarlanamadı: {directory}")
+    return False
+
+
+def _load_inotify():
+    """libc inotify fonksiyonları (Linux değilse None)"""
+    if not DOWNLOAD_WATCH["inotify"] or not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class DownloadWatcher:
+    """Tek bir indirme klasörünü izler, beklenen indirmeleri Future ile çözer"""
+
+    def __init__(self, directory: str):
+        self.directory = os.path.abspath(directory)
+        self._pending: List[Tuple[Tuple[str, ...], Future]] = []
+        self._partial = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._fd = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def start(self) -> "DownloadWatcher":
+        if self._thread and self._thread.is_alive():
+            return self
+
+        self._stop.clear()
+        libc = _load_inotify()
+        if libc is not None:
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            mask = IN_CREATE | IN_MOVED_FROM | IN_MOVED_TO | IN_CLOSE_WRITE | IN_DELETE
+            if fd >= 0 and libc.inotify_add_watch(fd, self.directory.encode(), mask) >= 0:
+                self._fd = fd
+            elif fd >= 0:
+                os.close(fd)
+
+        target = self._run_inotify if self._fd is not None else self._run_polling
+        self._thread = threading.Thread(target=target, daemon=True, name=f"download-watch:{self.directory}")
+        self._thread.start()
+        logger.debug(f"İndirme izleyici ({'inotify' if self._fd is not None else 'polling'}): {self.directory}")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        with self._lock:
+            for _, future in self._pending:
+                future.cancel()
+            self._pending.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def expect(self, extensions: Tuple[str, ...] = IMAGE_EXTENSIONS) -> Future:
+        """
+        Sonraki tamamlanan indirme için Future kaydet
+
+        İndirmeyi tetiklemeden önce çağrılmalı; önceden klasörde olan dosyalar
+        eşleşmez. Birden fazla bekleyen varsa indirmeler kayıt sırasıyla dağıtılır.
+
+        Args:
+            extensions: Kabul edilen son uzantılar (küçük harf, noktalı)
+        """
+        future = Future()
+        with self._lock:
+            self._pending.append((tuple(extensions), future))
+        return future
+
+    def wait(self, future: Future, timeout: float) -> Optional[str]:
+        """Future'ı bekle; timeout'ta kaydı iptal et ve None döndür"""
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            self.discard(future)
+            if self._partial:
+                logger.warning(f"İndirme {timeout:.0f}s içinde bitmedi (devam eden: {sorted(self._partial)})")
+            return None
+
+    def discard(self, future: Future):
+        """İndirme tetiklenmediyse kaydı geri al (sonraki indirmeyi yutmasın)"""
+        with self._lock:
+            self._pending = [(ext, f) for ext, f in self._pending if f is not future]
+        future.cancel()
+
+    def in_progress(self) -> List[str]:
+        """Devam eden (.crdownload) indirmeler"""
+        with self._lock:
+            return sorted(self._partial)
+
+    def _completed(self, name: str):
+        """Son adıyla yazılmış dosya: uzantısı uyan ilk bekleyene ver"""
+        path = os.path.join(self.directory, name)
+        try:
+            if os.path.getsize(path) == 0:
+                return
+        except OSError:
+            return
+
+        with self._lock:
+            for index, (extensions, future) in enumerate(self._pending):
+                if name.lower().endswith(extensions) and not future.done():
+                    del self._pending[index]
+                    break
+            else:
+                return
+        logger.info(f"İndirme tamamlandı: {path}")
+        future.set_result(path)
+
+    def _run_inotify(self):
+        buffer = b""
+        while not self._stop.is_set():
+            try:
+                ready, _, _ = select.select([self._fd], [], [], 0.5)
+                if not ready:
+                    continue
+                buffer += os.read(self._fd, 64 * 1024)
+            except (OSError, ValueError):
+                break
+
+            while len(buffer) >= _EVENT_HEADER.size:
+                _, mask, _, length = _EVENT_HEADER.unpack_from(buffer)
+                end = _EVENT_HEADER.size + length
+                if len(buffer) < end:
+                    break
+                name = buffer[_EVENT_HEADER.size:end].rstrip(b"\0").decode(errors="replace")
+                buffer = buffer[end:]
+                if name:
+                    self._on_event(name, mask)
+
+    def _on_event(self, name: str, mask: int):
+        if name.lower().endswith(PARTIAL_EXTENSIONS):
+            with self._lock:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._partial.add(name)
+                elif mask & (IN_MOVED_FROM | IN_DELETE):
+                    self._partial.discard(name)
+            return
+        # .crdownload -> son ad (rename) veya doğrudan yazılıp kapatılan dosya
+        if mask & (IN_MOVED_TO | IN_CLOSE_WRITE):
+            self._completed(name)
+
+    def _run_polling(self):
+        """inotify yoksa: yeni ve boyutu iki tarama boyunca değişmeyen dosyalar tamamlanmış sayılır"""
+        known = self._scan()
+        growing: Dict[str, int] = {}
+        while not self._stop.wait(DOWNLOAD_WATCH["poll_interval"]):
+            current = self._scan()
+            with self._lock:
+                self._partial = {name for name in current if name.lower().endswith(PARTIAL_EXTENSIONS)}
+
+            for name, size in current.items():
+                if name in known or name.lower().endswith(PARTIAL_EXTENSIONS):
+                    continue
+                if growing.get(name) == size and size > 0:
+                    growing.pop(name)
+                    known[name] = size
+                    self._completed(name)
+                else:
+                    growing[name] = size
+            # Silinen / taşınan dosyalar tekrar gelirse yeni sayılsın
+            known = {name: size for name, size in known.items() if name in current}
+
+    def _scan(self) -> Dict[str, int]:
+        files = {}
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            files[entry.name] = entry.stat().st_size
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return files
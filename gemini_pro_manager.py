@@ -6,11 +6,12 @@ Hesap sayısı ve limitler config'den dinamik okunur
 import os
 import json
 import time
-import glob
+import queue
 import shutil
 import logging
+import threading
 from datetime import datetime, date
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Tuple
 
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
@@ -20,6 +21,13 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
 import config
+from dom_media import scan_media
+from dom_wait import wait_for_media_change, wait_for_media_loaded
+from media_capture import MediaCapture, enable_performance_logging
+from download_watcher import DownloadWatcher, IMAGE_EXTENSIONS, VIDEO_EXTENSIONS, set_download_dir
+from browser_contexts import AccountContext
+from tab_watchdog import check_tab
+import browser_contexts
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +43,7 @@ DAILY_VIDEO_LIMIT = config.get_daily_limit()
 TOTAL_ACCOUNTS = config.get_total_accounts()
 
 # Gemini Pro URL
-GEMINI_URL = "https://gemini.google.com"
+GEMINI_URL = config.GEMINI_BASE_URL
 
 # Timeouts
 TIMEOUTS = {
@@ -46,6 +54,9 @@ TIMEOUTS = {
     'download_wait': 10,
 }
 
+# osascript clipboard + Cmd+V arası başka thread clipboard'a yazmasın
+_clipboard_lock = threading.Lock()
+
 
 class GeminiProAccount:
     """Tek bir Gemini Pro hesabını temsil eder"""
@@ -55,9 +66,15 @@ class GeminiProAccount:
         self.profile_dir = profile_dir
         self.driver = None
         self.wait = None
+        self.capture = None
+        self.context: Optional[AccountContext] = None  # BROWSER_CONTEXTS modunda paylaşılan Chrome'daki yeri
+        self.tabs: Dict[str, str] = {}  # rol -> pencere handle (open_tabs)
+        self._current_tab = None
         self.daily_usage = 0
         self.last_usage_date = None
         self.download_dir = os.path.join(profile_dir, "Downloads")
+        # Hesaba özel indirme klasörü - paralel hesaplar birbirinin dosyasını almaz
+        self.downloads = DownloadWatcher(self.download_dir)
         self.progress_callback = progress_callback or (lambda msg, pct: logger.info(f"[{pct}%] {msg}"))
 
         os.makedirs(self.download_dir, exist_ok=True)
@@ -93,6 +110,13 @@ class GeminiProAccount:
 
     def close_browser(self):
         """Tarayıcıyı güvenli şekilde kapat"""
+        if self.context:
+            # Paylaşılan Chrome açık kalır, sadece hesabın context'i kapanır
+            self.context.close()
+            self.context = None
+            self.driver = None
+            self.wait = None
+            self.capture = None
         if self.driver:
             try:
                 self.driver.quit()
@@ -100,9 +124,18 @@ class GeminiProAccount:
                 pass
             self.driver = None
             self.wait = None
+            self.capture = None
+        self.tabs = {}
+        self._current_tab = None
+        self.downloads.stop()
+
+    def start_browser(self, use_context: Optional[bool] = None) -> bool:
+        """
+        Tarayıcıyı başlat
 
-    def start_browser(self) -> bool:
-        """Tarayıcıyı başlat"""
+        Args:
+            use_context: Paylaşılan Chrome'da browser context kullan (None: BROWSER_CONTEXTS ayarı)
+        """
         try:
             # Eğer tarayıcı zaten açık ve çalışıyorsa, yeniden başlatma
             if self.is_browser_alive():
@@ -119,11 +152,20 @@ class GeminiProAccount:
 
             os.makedirs(self.profile_dir, exist_ok=True)
 
+            if use_context is None:
+                use_context = config.BROWSER_CONTEXTS["enabled"]
+            if use_context:
+                return self._start_context_browser()
+
             options = uc.ChromeOptions()
             options.add_argument(f"--user-data-dir={self.profile_dir}")
             options.add_argument("--no-sandbox")
             options.add_argument("--disable-dev-shm-usage")
             options.add_argument("--window-size=1200,900")
+            # Arka plandaki sekme (open_tabs) yavaşlatılmasın - üretim beklerken diğer sekme çalışır
+            options.add_argument("--disable-background-timer-throttling")
+            options.add_argument("--disable-backgrounding-occluded-windows")
+            options.add_argument("--disable-renderer-backgrounding")
 
             # Download settings
             prefs = {
@@ -132,10 +174,19 @@ class GeminiProAccount:
                 "download.directory_upgrade": True,
             }
             options.add_experimental_option("prefs", prefs)
+            enable_performance_logging(options)
 
             self.driver = uc.Chrome(options=options, use_subprocess=True)
             self.wait = WebDriverWait(self.driver, TIMEOUTS['element_wait'])
 
+            # Üretilen medyayı ağ yanıtlarından yakala (Downloads klasörü yerine)
+            self.capture = MediaCapture(self.driver)
+            self.capture.start()
+
+            # Buton ile indirme gerekirse: hesap klasörü + dosya sistemi olayları
+            set_download_dir(self.driver, self.download_dir)
+            self.downloads.start()
+
             self._update_progress("Tarayıcı başlatıldı", 10)
             return True
 
@@ -145,6 +196,29 @@ class GeminiProAccount:
             self._cleanup_profile_locks()
             return False
 
+    def _start_context_browser(self) -> bool:
+        """Paylaşılan Chrome'da hesaba izole browser context aç (BROWSER_CONTEXTS modu)"""
+        from selenium import webdriver
+
+        options = webdriver.ChromeOptions()
+        enable_performance_logging(options)
+
+        self.context = AccountContext(self.profile_dir)
+        self.driver = self.context.open(options)
+        if not self.driver:
+            self.context = None
+            return False
+        self.wait = WebDriverWait(self.driver, TIMEOUTS['element_wait'])
+
+        self.capture = MediaCapture(self.driver)
+        self.capture.start()
+
+        self.context.set_download_dir(self.download_dir)
+        self.downloads.start()
+
+        self._update_progress("Tarayıcı başlatıldı (browser context)", 10)
+        return True
+
     def navigate_to_gemini(self) -> bool:
         """Gemini sayfasına git ve login kontrolü yap"""
         try:
@@ -158,7 +232,7 @@ class GeminiProAccount:
                 # Kullanıcının giriş yapmasını bekle (max 2 dakika)
                 for _ in range(24):
                     time.sleep(5)
-                    if "gemini.google.com" in self.driver.current_url:
+                    if config.GEMINI_HOST in self.driver.current_url:
                         break
                 else:
                     logger.warning(f"Hesap {self.account_id}: Login timeout")
@@ -277,6 +351,8 @@ class GeminiProAccount:
                 return False
 
             self._update_progress(f"Prompt gönderiliyor: {prompt[:50]}...", 30)
+            if self.capture:
+                self.capture.mark()
             time.sleep(3)
 
             # Input bul ve tıkla
@@ -446,16 +522,17 @@ class GeminiProAccount:
                 logger.info("Yöntem 1: Clipboard yapıştırma deneniyor...")
                 import subprocess
 
-                # Görseli clipboard'a kopyala
-                copy_result = subprocess.run([
-                    'osascript', '-e',
-                    f'set the clipboard to (read (POSIX file "{absolute_path}") as TIFF picture)'
-                ], capture_output=True, timeout=10)
+                # Clipboard sistem geneli: paralel hesaplar / sekmeler kopyala-yapıştır arasına girmesin
+                with _clipboard_lock:
+                    # Görseli clipboard'a kopyala
+                    copy_result = subprocess.run([
+                        'osascript', '-e',
+                        f'set the clipboard to (read (POSIX file "{absolute_path}") as TIFF picture)'
+                    ], capture_output=True, timeout=10)
 
-                if copy_result.returncode == 0:
-                    # Input alanına tıkla ve yapıştır
-                    input_area = self._find_input_element()
+                    input_area = self._find_input_element() if copy_result.returncode == 0 else None
                     if input_area:
+                        # Input alanına tıkla ve yapıştır
                         input_area.click()
                         time.sleep(0.5)
 
@@ -719,36 +796,24 @@ class GeminiProAccount:
             'img[data-image-url]',
         ]
 
-        for selector in selectors:
-            try:
-                found = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                for img in found:
-                    try:
-                        if not img.is_displayed():
-                            continue
-
-                        # Boyut kontrolü - çok küçük görselleri atla (icon vb.)
-                        width = img.size.get('width', 0)
-                        height = img.size.get('height', 0)
-                        if width < 100 or height < 100:
-                            continue
-
-                        src = img.get_attribute('src') or img.get_attribute('data-src') or ''
+        # Tüm seçiciler tek execute_script ile taranır (eleman başına WebDriver isteği yok)
+        for item in scan_media(self.driver, selectors):
+            # Boyut kontrolü - çok küçük görselleri atla (icon vb.)
+            if not item["visible"] or item["width"] < 100 or item["height"] < 100:
+                continue
 
-                        # Avatar ve icon'ları atla
-                        if any(x in src.lower() for x in ['avatar', 'icon', 'logo', 'profile']):
-                            continue
+            src = item["src"]
 
-                        # Daha önce eklenmediyse ekle
-                        if src and src not in seen_srcs:
-                            seen_srcs.add(src)
-                            images.append(img)
-                            logger.debug(f"Görsel bulundu: {src[:80]}... ({width}x{height})")
-                    except:
-                        continue
-            except:
+            # Avatar ve icon'ları atla
+            if any(x in src.lower() for x in ['avatar', 'icon', 'logo', 'profile']):
                 continue
 
+            # Daha önce eklenmediyse ekle
+            if src and src not in seen_srcs:
+                seen_srcs.add(src)
+                images.append(item["element"])
+                logger.debug(f"Görsel bulundu: {src[:80]}... ({item['width']}x{item['height']})")
+
         logger.info(f"Toplam {len(images)} görsel bulundu")
         return images
 
@@ -772,7 +837,10 @@ class GeminiProAccount:
 
                 if current_count > previous_count:
                     self._update_progress(f"Görsel oluşturuldu! ({elapsed}s)", 50)
-                    time.sleep(3)  # Görselin tam yüklenmesini bekle
+                    # Görselin tam yüklenmesini bekle
+                    images = self._find_generated_images()
+                    if images:
+                        wait_for_media_loaded(self.driver, images[-1], timeout=10)
                     return True
 
                 # Loading kontrolü
@@ -784,7 +852,8 @@ class GeminiProAccount:
                 except:
                     pass
 
-                time.sleep(3)
+                # Yeni görsel / yükleme olayına kadar blokla
+                wait_for_media_change(self.driver, "img", timeout=min(20, max_wait - elapsed))
 
             logger.warning("Görsel oluşturma timeout")
             return False
@@ -808,13 +877,11 @@ class GeminiProAccount:
             img_src = latest_image.get_attribute('src') or ""
             logger.info(f"Görsel src: {img_src[:100]}...")
 
-            # İndirme öncesi dosyaları kaydet - Chrome profil Downloads klasörünü kullan
-            downloads_dir = self.download_dir
-            logger.info(f"Downloads klasörü: {downloads_dir}")
-            files_before = set()
-            for ext in ["*.png", "*.jpg", "*.jpeg", "*.webp"]:
-                files_before.update(glob.glob(os.path.join(downloads_dir, ext)))
-            logger.info(f"Önceki dosya sayısı: {len(files_before)}")
+            # ===== YÖNTEM 0: CDP ağ yakalama - sayfanın yüklediği baytlar doğrudan save_path'e =====
+            if self.capture and self.capture.save(img_src, save_path, kind="image"):
+                logger.info(f"Görsel ağ yanıtından kaydedildi: {save_path}")
+                self._update_progress(f"Görsel kaydedildi: {os.path.basename(save_path)}", 60)
+                return save_path
 
             # ===== YÖNTEM 1: Canvas ile blob/data URL'den tam çözünürlük görsel çıkar =====
             try:
@@ -861,6 +928,8 @@ class GeminiProAccount:
 
             # ===== YÖNTEM 2: Gemini'nin indirme butonunu bul ve tıkla =====
             download_clicked = False
+            # Tıklamadan önce kaydol - hesap klasörüne düşen ilk görsel bu indirmedir
+            pending = self.downloads.expect(IMAGE_EXTENSIONS)
             try:
                 logger.info("Yöntem 2: İndirme butonu aranıyor...")
                 from selenium.webdriver.common.action_chains import ActionChains
@@ -904,7 +973,6 @@ class GeminiProAccount:
                                 btn.click()
                                 download_clicked = True
                                 logger.info(f"✅ İndirme butonu tıklandı: {selector}")
-                                time.sleep(3)
                                 break
                         if download_clicked:
                             break
@@ -920,52 +988,19 @@ class GeminiProAccount:
             except Exception as e:
                 logger.warning(f"İndirme butonu yöntemi başarısız: {e}")
 
-            # ===== YÖNTEM 3: Downloads klasöründe yeni dosya bekle (buton tıklandıysa) =====
+            # ===== YÖNTEM 3: İndirmenin tamamlanmasını bekle (buton tıklandıysa) =====
             if download_clicked:
-                logger.info("Yöntem 3: Downloads klasörü kontrol ediliyor...")
-                max_wait = 30  # 30 saniye bekle
-
-                for attempt in range(max_wait // 2):
-                    # .crdownload dosyalarını kontrol et (indirme devam ediyor)
-                    crdownloads = glob.glob(os.path.join(downloads_dir, "*.crdownload"))
-                    if crdownloads:
-                        logger.info(f"İndirme devam ediyor ({len(crdownloads)} .crdownload dosyası)...")
-                        time.sleep(2)
-                        continue
-
-                    # Yeni dosya kontrolü
-                    files_after = set()
-                    for ext in ["*.png", "*.jpg", "*.jpeg", "*.webp"]:
-                        files_after.update(glob.glob(os.path.join(downloads_dir, ext)))
-
-                    new_files = files_after - files_before
-                    if new_files:
-                        newest = max(new_files, key=os.path.getmtime)
-                        if os.path.getsize(newest) > 10000:
-                            shutil.move(newest, save_path)
-                            logger.info(f"✅ Downloads'dan taşındı: {save_path}")
-                            self._update_progress(f"Görsel kaydedildi: {os.path.basename(save_path)}", 60)
-                            return save_path
-                        logger.info(f"Yeni dosya bulundu ama çok küçük: {os.path.getsize(newest)} bytes, bekleniyor...")
-
-                    # Dosya yaşına göre kontrol (fallback)
-                    all_files = []
-                    for ext in ["*.png", "*.jpg", "*.jpeg", "*.webp"]:
-                        all_files.extend(glob.glob(os.path.join(downloads_dir, ext)))
-
-                    if all_files:
-                        latest = max(all_files, key=os.path.getctime)
-                        file_age = time.time() - os.path.getctime(latest)
-                        if file_age < 30:  # Son 30 saniyede indirilen
-                            if os.path.getsize(latest) > 10000:
-                                shutil.move(latest, save_path)
-                                logger.info(f"✅ Yaşa göre bulundu ve taşındı: {save_path} ({file_age:.1f}s önce)")
-                                self._update_progress(f"Görsel kaydedildi: {os.path.basename(save_path)}", 60)
-                                return save_path
-
-                    if attempt % 3 == 0:
-                        logger.info(f"Dosya bekleniyor... ({attempt + 1}/{max_wait // 2})")
-                    time.sleep(2)
+                logger.info(f"Yöntem 3: İndirme bekleniyor ({self.download_dir})...")
+                downloaded = self.downloads.wait(pending, timeout=config.DOWNLOAD_WATCH["image_timeout"])
+                if downloaded and os.path.getsize(downloaded) > 10000:
+                    shutil.move(downloaded, save_path)
+                    logger.info(f"✅ İndirme klasöründen taşındı: {save_path}")
+                    self._update_progress(f"Görsel kaydedildi: {os.path.basename(save_path)}", 60)
+                    return save_path
+                if downloaded:
+                    logger.info(f"İndirilen dosya çok küçük: {os.path.getsize(downloaded)} bytes")
+            else:
+                self.downloads.discard(pending)
 
             # ===== YÖNTEM 4: JavaScript fetch ile görsel al =====
             if img_src.startswith('http'):
@@ -1056,29 +1091,6 @@ class GeminiProAccount:
                 except Exception as e:
                     logger.warning(f"Fetch API yöntemi başarısız: {e}")
 
-            # ===== YÖNTEM 6: Son kontrol - Dosya yaşına göre bul =====
-            if not os.path.exists(save_path):
-                logger.info("Yöntem 6: Son kontrol - dosya yaşına göre aranıyor...")
-
-                # Tüm görsel dosyalarını listele
-                all_files = []
-                for ext in ["*.png", "*.jpg", "*.jpeg", "*.webp"]:
-                    all_files.extend(glob.glob(os.path.join(downloads_dir, ext)))
-
-                if all_files:
-                    # En son oluşturulan dosyayı bul
-                    latest = max(all_files, key=os.path.getctime)
-                    file_age = time.time() - os.path.getctime(latest)
-
-                    logger.info(f"En yeni dosya: {os.path.basename(latest)} ({file_age:.1f}s önce)")
-
-                    # Son 60 saniyede indirildiyse kullan
-                    if file_age < 60 and os.path.getsize(latest) > 10000:
-                        shutil.move(latest, save_path)
-                        logger.info(f"✅ Yaşa göre bulundu ve taşındı: {save_path}")
-                        self._update_progress(f"Görsel kaydedildi: {os.path.basename(save_path)}", 60)
-                        return save_path
-
             # Dosya başarıyla oluşturulduysa dön
             if os.path.exists(save_path) and os.path.getsize(save_path) > 10000:
                 return save_path
@@ -1113,55 +1125,26 @@ class GeminiProAccount:
             'div[data-video-id] video',
         ]
 
-        for selector in selectors:
-            try:
-                found = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                for vid in found:
-                    try:
-                        # Video elementi veya source'tan src al
-                        src = vid.get_attribute('src')
-                        if not src:
-                            # source elementinden al
-                            sources = vid.find_elements(By.TAG_NAME, 'source')
-                            for source in sources:
-                                src = source.get_attribute('src')
-                                if src:
-                                    break
-
-                        if src and ('blob:' in src or 'http' in src):
-                            if vid not in videos:
-                                videos.append(vid)
-                                logger.info(f"Video bulundu: {src[:100]}...")
-                    except:
-                        continue
-            except:
-                continue
+        # Tüm seçiciler tek execute_script ile (source elemanları video'ya çevrilir)
+        items = [item for item in scan_media(self.driver, selectors) if item["kind"] == "video"]
 
-        # Alternatif: Tüm videoları bul
+        for item in items:
+            src = item["src"]
+            if src and ('blob:' in src or 'http' in src):
+                videos.append(item["element"])
+                logger.info(f"Video bulundu: {src[:100]}...")
+
+        # Alternatif: src'si olan veya görünen tüm videolar
         if not videos:
-            try:
-                all_videos = self.driver.find_elements(By.TAG_NAME, 'video')
-                logger.info(f"Sayfada toplam {len(all_videos)} video elementi var")
-                for vid in all_videos:
-                    try:
-                        src = vid.get_attribute('src') or ''
-                        # currentSrc'yi de kontrol et
-                        if not src:
-                            src = vid.get_attribute('currentSrc') or ''
-                        outer_html = vid.get_attribute('outerHTML')[:200] if vid.get_attribute('outerHTML') else ''
-                        logger.info(f"Video elementi: src={src[:50] if src else 'YOK'}, html={outer_html}")
-                        if src:
-                            videos.append(vid)
-                            logger.info(f"Alternatif video bulundu: {src[:100]}...")
-                        elif vid.is_displayed():
-                            # src olmasa bile görünen video ekle
-                            videos.append(vid)
-                            logger.info("Video elementi eklendi (src yok ama görünür)")
-                    except Exception as e:
-                        logger.debug(f"Video elementi hatası: {e}")
-                        continue
-            except Exception as e:
-                logger.error(f"Video arama hatası: {e}")
+            logger.info(f"Sayfada toplam {len(items)} video elementi var")
+            for item in items:
+                if item["src"]:
+                    videos.append(item["element"])
+                    logger.info(f"Alternatif video bulundu: {item['src'][:100]}...")
+                elif item["visible"]:
+                    # src olmasa bile görünen video ekle
+                    videos.append(item["element"])
+                    logger.info("Video elementi eklendi (src yok ama görünür)")
 
         logger.info(f"Toplam {len(videos)} video bulundu")
         return videos
@@ -1186,7 +1169,10 @@ class GeminiProAccount:
 
                 if current_count > previous_count:
                     self._update_progress(f"Video oluşturuldu! ({elapsed}s)", 80)
-                    time.sleep(5)  # Videonun tam yüklenmesini bekle
+                    # Videonun tam yüklenmesini bekle
+                    videos = self._find_generated_videos()
+                    if videos:
+                        wait_for_media_loaded(self.driver, videos[-1], timeout=15)
                     return True
 
                 # Loading kontrolü
@@ -1198,7 +1184,8 @@ class GeminiProAccount:
                 except:
                     pass
 
-                time.sleep(5)
+                # Yeni video / yükleme olayına kadar blokla
+                wait_for_media_change(self.driver, "video", timeout=min(20, max_wait - elapsed))
 
             logger.warning("Video oluşturma timeout")
             return False
@@ -1236,10 +1223,15 @@ class GeminiProAccount:
 
             logger.info(f"Video src: {video_src[:100] if video_src else 'None'}...")
 
-            # İndirme öncesi dosyaları kaydet
-            downloads_dir = os.path.expanduser("~/Downloads")
-            files_before = set(glob.glob(os.path.join(downloads_dir, "*.mp4")))
-            files_before.update(glob.glob(os.path.join(downloads_dir, "*.webm")))
+            # YÖNTEM 0: CDP ağ yakalama - buton tıklama ve Downloads beklemesi olmadan
+            if self.capture and self.capture.save(video_src, save_path, kind="video", min_size=50000):
+                logger.info(f"Video ağ yanıtından kaydedildi: {save_path}")
+                self._update_progress(f"Video kaydedildi: {os.path.basename(save_path)}", 90)
+                return save_path
+
+            # Tetiklemeden önce kaydol - hesap klasörüne düşen ilk video bu indirmedir
+            pending = self.downloads.expect(VIDEO_EXTENSIONS)
+            download_triggered = False
 
             # YÖNTEM 1: İndirme butonunu bul ve tıkla
             download_clicked = False
@@ -1265,7 +1257,7 @@ class GeminiProAccount:
                                 btn.click()
                                 download_clicked = True
                                 logger.info(f"Video indirme butonu tıklandı: {selector}")
-                                time.sleep(5)
+                                download_triggered = True
                                 break
                         if download_clicked:
                             break
@@ -1292,7 +1284,7 @@ class GeminiProAccount:
                     """, video_src, filename)
 
                     logger.info("JavaScript a.click() ile indirme tetiklendi")
-                    time.sleep(8)  # İndirme için bekle
+                    download_triggered = True
 
                 except Exception as e:
                     logger.warning(f"JS indirme başarısız: {e}")
@@ -1312,18 +1304,16 @@ class GeminiProAccount:
                 except:
                     pass
 
-            # İndirilen dosyayı bul
-            time.sleep(5)
-            files_after = set(glob.glob(os.path.join(downloads_dir, "*.mp4")))
-            files_after.update(glob.glob(os.path.join(downloads_dir, "*.webm")))
-
-            new_files = files_after - files_before
-            if new_files:
-                newest = max(new_files, key=os.path.getmtime)
-                shutil.move(newest, save_path)
-                logger.info(f"Video indirildi ve taşındı: {save_path}")
-                self._update_progress(f"Video kaydedildi: {os.path.basename(save_path)}", 90)
-                return save_path
+            # İndirmenin tamamlanmasını bekle (.crdownload -> .mp4 olayı)
+            if download_triggered:
+                downloaded = self.downloads.wait(pending, timeout=config.DOWNLOAD_WATCH["video_timeout"])
+                if downloaded:
+                    shutil.move(downloaded, save_path)
+                    logger.info(f"Video indirildi ve taşındı: {save_path}")
+                    self._update_progress(f"Video kaydedildi: {os.path.basename(save_path)}", 90)
+                    return save_path
+            else:
+                self.downloads.discard(pending)
 
             # YÖNTEM 4: Doğrudan URL'den indir (http/https için) - Selenium çerezleri ile
             if video_src and video_src.startswith('http'):
@@ -1376,17 +1366,96 @@ class GeminiProAccount:
             traceback.print_exc()
             return None
 
-    def _find_latest_download(self, pattern: str) -> Optional[str]:
-        """En son indirilen dosyayı bul"""
+    def open_tabs(self, roles: List[str]) -> bool:
+        """
+        Aynı oturumda her rol için ayrı Gemini sekmesi aç (zaten açıksa dokunma)
+
+        İlk rol mevcut sekmeyi kullanır. Sekmeler aynı çerezleri paylaşır; biri
+        video üretirken diğerinde görsel üretilebilir.
+
+        Args:
+            roles: Sekme rolleri, örn. ["image", "video"]
+
+        Returns:
+            True = tüm sekmeler hazır
+        """
         try:
-            files = glob.glob(os.path.join(self.download_dir, pattern))
-            if files:
-                latest = max(files, key=os.path.getctime)
-                if time.time() - os.path.getctime(latest) < 60:
-                    return latest
-        except:
-            pass
-        return None
+            handles = set(self.driver.window_handles)
+            if self.tabs and all(self.tabs.get(role) in handles for role in roles):
+                return True
+
+            self.tabs = {roles[0]: self.driver.current_window_handle}
+            self._current_tab = roles[0]
+            for role in roles[1:]:
+                self.tabs[role] = self._new_gemini_tab()
+                self._current_tab = role
+            logger.info(f"Hesap {self.account_id}: {len(roles)} sekme açıldı ({', '.join(roles)})")
+            return True
+        except Exception as e:
+            logger.error(f"Hesap {self.account_id} sekme açma hatası: {e}")
+            self.tabs = {}
+            self._current_tab = None
+            return False
+
+    def _new_gemini_tab(self) -> str:
+        """Aynı oturumda (context modunda aynı context'te) yeni sekme aç, Gemini'ye git ve geç"""
+        if self.context:
+            self.driver.switch_to.window(self.context.new_tab())
+        else:
+            self.driver.switch_to.new_window("tab")
+        handle = self.driver.current_window_handle
+        # Network domain sekme başına açılır
+        if self.capture:
+            self.capture.start()
+        if not self.navigate_to_gemini():
+            raise RuntimeError("Yeni sekmede Gemini açılamadı")
+        return handle
+
+    def recycle_tab(self) -> bool:
+        """
+        Aktif sekmeyi yenisiyle değiştir (şişmiş DOM / JS heap'i bırakmak için)
+
+        new_chat aynı belgede kalır ve bazen sadece yeniden yüklemeye düşer; yeni
+        sekme açılıp eskisi kapatılınca renderer belleği de serbest kalır.
+
+        Returns:
+            True = yeni sekme hazır (rolü varsa self.tabs güncellenir)
+        """
+        try:
+            old_handle = self.driver.current_window_handle
+            new_handle = self._new_gemini_tab()
+            self.driver.switch_to.window(old_handle)
+            self.driver.close()
+            self.driver.switch_to.window(new_handle)
+            if self._current_tab:
+                self.tabs[self._current_tab] = new_handle
+            logger.info(f"Hesap {self.account_id}: sekme yenilendi")
+            return True
+        except Exception as e:
+            logger.error(f"Hesap {self.account_id} sekme yenileme hatası: {e}")
+            return False
+
+    def watch_tab(self) -> Dict[str, Any]:
+        """
+        Aktif sekmeyi ölç, TAB_WATCHDOG eşiği aşıldıysa sekmeyi yenile
+
+        Returns:
+            Ölçüm + {"recycled": bool, "reason": ...}
+        """
+        metrics, reason = check_tab(self.driver)
+        metrics["recycled"] = False
+        if reason:
+            logger.info(f"Hesap {self.account_id}: sekme eşiği aşıldı ({reason}), yenileniyor")
+            metrics["reason"] = reason
+            metrics["recycled"] = self.recycle_tab()
+        return metrics
+
+    def switch_tab(self, role: str):
+        """open_tabs ile açılmış sekmeye geç (sekme yoksa mevcut sekmede kal)"""
+        if not self.tabs or self._current_tab == role:
+            return
+        self.driver.switch_to.window(self.tabs[role])
+        self._current_tab = role
 
     def new_chat(self):
         """Yeni sohbet başlat"""
@@ -1421,12 +1490,20 @@ class GeminiProAccount:
 
     def close(self):
         """Tarayıcıyı kapat"""
+        if self.context:
+            self.context.close()
+            self.context = None
+            self.driver = None
         if self.driver:
             try:
                 self.driver.quit()
             except:
                 pass
             self.driver = None
+            self.capture = None
+        self.tabs = {}
+        self._current_tab = None
+        self.downloads.stop()
 
 
 class GeminiProManager:
@@ -1436,6 +1513,7 @@ class GeminiProManager:
         self.progress_callback = progress_callback or (lambda msg, pct: logger.info(f"[{pct}%] {msg}"))
         self.accounts: List[GeminiProAccount] = []
         self.usage_file = os.path.join(config.BASE_DIR, "gemini_pro_usage.json")
+        self._usage_lock = threading.Lock()  # Paralel hesap thread'leri aynı dosyayı yazar
         self.projects_dir = os.path.join(config.BASE_DIR, "gemini_pro_projects")
         os.makedirs(self.projects_dir, exist_ok=True)
 
@@ -1494,6 +1572,10 @@ class GeminiProManager:
 
     def _save_usage(self, account_id: int = None):
         """Kullanım verilerini kaydet (sadece belirtilen hesap veya tümü)"""
+        with self._usage_lock:
+            self._write_usage(account_id)
+
+    def _write_usage(self, account_id: int = None):
         try:
             # Mevcut veriyi oku
             data = {}
@@ -1551,6 +1633,15 @@ class GeminiProManager:
 
         return None
 
+    def get_accounts_with_quota(self) -> List[GeminiProAccount]:
+        """Günlük limiti dolmamış hesaplar"""
+        accounts = []
+        for account in self.accounts:
+            account = self.get_account_by_id(account.account_id)
+            if account and account.daily_usage < config.get_daily_limit():
+                accounts.append(account)
+        return accounts
+
     def get_daily_capacity(self) -> Dict[str, Any]:
         """Günlük kapasiteyi göster (24 saat bazlı)"""
         # Önce usage'ı yeniden yükle (24 saat kontrolü için)
@@ -1603,11 +1694,16 @@ class GeminiProManager:
             "accounts": account_status
         }
 
-    def setup_accounts(self) -> Dict[str, Any]:
-        """Hesapları kurulum için aç"""
+    def setup_accounts(self, accounts: Optional[List[GeminiProAccount]] = None) -> Dict[str, Any]:
+        """
+        Hesapları kurulum için aç
+
+        Args:
+            accounts: Açılacak hesaplar (varsayılan: hepsi)
+        """
         results = {"success": True, "accounts": []}
 
-        for account in self.accounts:
+        for account in self.accounts if accounts is None else accounts:
             self._update_progress(f"Hesap {account.account_id} açılıyor...", (account.account_id * 30))
 
             if not account.start_browser():
@@ -1630,11 +1726,16 @@ class GeminiProManager:
         self._update_progress("Tüm hesaplar açıldı. Giriş yapın.", 100)
         return results
 
-    def verify_all_accounts(self) -> Dict[str, Any]:
-        """Tüm hesapların giriş durumunu kontrol et"""
+    def verify_all_accounts(self, accounts: Optional[List[GeminiProAccount]] = None) -> Dict[str, Any]:
+        """
+        Hesapların giriş durumunu kontrol et
+
+        Args:
+            accounts: Kontrol edilecek hesaplar (varsayılan: hepsi)
+        """
         results = {"all_logged_in": True, "accounts": []}
 
-        for account in self.accounts:
+        for account in self.accounts if accounts is None else accounts:
             if not account.driver:
                 results["accounts"].append({
                     "account_id": account.account_id,
@@ -1646,7 +1747,7 @@ class GeminiProManager:
 
             try:
                 current_url = account.driver.current_url
-                is_logged_in = "gemini.google.com" in current_url and "accounts.google" not in current_url
+                is_logged_in = config.GEMINI_HOST in current_url and "accounts.google" not in current_url
 
                 results["accounts"].append({
                     "account_id": account.account_id,
@@ -1671,6 +1772,8 @@ class GeminiProManager:
         """Tüm tarayıcıları kapat"""
         for account in self.accounts:
             account.close()
+        if config.BROWSER_CONTEXTS["enabled"]:
+            browser_contexts.shutdown()
 
 
 class DailyShortsMode:
@@ -1678,13 +1781,17 @@ class DailyShortsMode:
 
     def __init__(self, manager: GeminiProManager):
         self.manager = manager
+        self._project_lock = threading.RLock()  # Paralel hesaplar aynı project.json'u günceller
 
     def _save_project_json(self, project_dir: str, project_data: Dict[str, Any]):
-        """Project.json dosyasını kaydet"""
-        project_data["updated_at"] = datetime.now().isoformat()
-        project_json_path = os.path.join(project_dir, "project.json")
-        with open(project_json_path, "w", encoding="utf-8") as f:
-            json.dump(project_data, f, indent=2, ensure_ascii=False)
+        """Project.json dosyasını kaydet (yarım yazılmış dosya okunmasın diye tmp + replace)"""
+        with self._project_lock:
+            project_data["updated_at"] = datetime.now().isoformat()
+            project_json_path = os.path.join(project_dir, "project.json")
+            temp_path = project_json_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(project_data, f, indent=2, ensure_ascii=False)
+            os.replace(temp_path, project_json_path)
 
     def _load_project_json(self, project_dir: str) -> Optional[Dict[str, Any]]:
         """Project.json dosyasını yükle"""
@@ -1696,8 +1803,435 @@ class DailyShortsMode:
 
     def _update_status(self, project_dir: str, project_data: Dict[str, Any], index: int, status: str):
         """Belirli bir prompt'un durumunu güncelle"""
-        project_data["status"][str(index)] = status
-        self._save_project_json(project_dir, project_data)
+        with self._project_lock:
+            project_data["status"][str(index)] = status
+            self._save_project_json(project_dir, project_data)
+
+    def _video_has_watermark(self, video_path: str, index: int) -> bool:
+        """Klip başına bir kez Veo watermark tespiti - bulunamazsa temizleme atlanır"""
+        if not config.WATERMARK_DETECTION["enabled"]:
+            return True
+        try:
+            from watermark_remover import detect_video_watermark
+            detection = detect_video_watermark(video_path, "veo")
+        except Exception as e:
+            logger.warning(f"[{index}] Watermark tespiti yapılamadı: {e}")
+            return True
+
+        if detection["found"]:
+            logger.info(f"[{index}] Veo watermark bulundu (güven {detection['confidence']:.2f}): {detection['bbox']}")
+        else:
+            logger.info(f"[{index}] Veo watermark bulunamadı (güven {detection['confidence']:.2f}), temizleme atlandı")
+        return detection["found"]
+
+    def _watch_tab(self, account: GeminiProAccount, i: int, stage: str):
+        """Adım sonrası sekme ölçümü (gerekirse sekme yenilenir) - project.json'a browser_metrics olarak yazılır"""
+        if not config.TAB_WATCHDOG["enabled"]:
+            return
+        metrics = account.watch_tab()
+        metrics["account_id"] = account.account_id
+        with self._project_lock:
+            self.project_data.setdefault("browser_metrics", {}).setdefault(str(i), {})[stage] = metrics
+            self._save_project_json(self.project_dir, self.project_data)
+
+    def _new_result(self, i: int) -> Dict[str, Any]:
+        return {
+            "index": i,
+            "success": False,
+            "image_path": None,
+            "cleaned_image_path": None,
+            "video_path": None,
+            "cleaned_video_path": None,
+            "error": None
+        }
+
+    def _ensure_browser(self, account: GeminiProAccount, i: int) -> Optional[str]:
+        """Hesap tarayıcısı açık değilse aç ve Gemini'ye git (hata mesajı veya None)"""
+        if account.is_browser_alive():
+            return None
+
+        logger.info(f"[{i}] Tarayıcı kapalı veya çökmüş, yeniden başlatılıyor...")
+        # Önceki oturumu temizle
+        account.close_browser()
+        time.sleep(2)  # Biraz bekle
+
+        if not account.start_browser():
+            return "Tarayıcı başlatılamadı"
+        if not account.navigate_to_gemini():
+            return "Gemini'ye gidilemedi"
+
+        # Sayfa yüklenmesi için bekle
+        time.sleep(3)
+        return None
+
+    def _handle_prompt_error(self, account: GeminiProAccount, i: int, video_result: Dict[str, Any], e: Exception):
+        logger.error(f"[{i}] Hata: {e}")
+        import traceback
+        traceback.print_exc()
+        video_result["error"] = str(e)
+        self._update_status(self.project_dir, self.project_data, i, "failed")
+
+        # Tarayıcı hatası ise, sonraki iterasyonda yeniden başlatılsın
+        error_str = str(e).lower()
+        if any(x in error_str for x in ['session', 'disconnected', 'browser', 'closed', 'invalid']):
+            logger.warning(f"[{i}] Tarayıcı hatası tespit edildi, kapatılıyor...")
+            account.close_browser()
+            time.sleep(3)
+
+    def _start_image(self, account: GeminiProAccount, i: int, prompt_data: Dict[str, str],
+                     video_result: Dict[str, Any]) -> Optional[int]:
+        """Görsel prompt'unu gönder; önceki görsel sayısı veya hata durumunda None"""
+        self.manager._update_progress(f"[{i}] Görsel oluşturuluyor ({self.aspect_format})...", 15 + (i * 8))
+
+        image_prompt = prompt_data.get("image_prompt", "")
+        # Seçilen formatta görsel oluştur
+        full_image_prompt = f"Create a high quality image in {self.format_desc}: {image_prompt}"
+
+        # Önceki görsel sayısını al
+        prev_image_count = account._count_generated_images()
+
+        # Prompt gönder
+        if not account.send_prompt(full_image_prompt):
+            video_result["error"] = "Görsel prompt gönderilemedi"
+            # Tarayıcı problemi olabilir, kapat ki sonraki iterasyonda yeniden başlasın
+            if not account.is_browser_alive():
+                account.close_browser()
+            return None
+        return prev_image_count
+
+    def _finish_image(self, account: GeminiProAccount, i: int, prev_image_count: int,
+                      video_result: Dict[str, Any]) -> Optional[str]:
+        """Görseli bekle, indir ve watermark'ını temizle; temiz görsel yolu veya None"""
+        # Görsel oluşturulmasını bekle
+        if not account.wait_for_image_generation(prev_image_count):
+            video_result["error"] = "Görsel oluşturulamadı - timeout"
+            return None
+
+        # Görseli indir
+        image_path = os.path.join(self.project_dir, f"image_{i}.png")
+        downloaded_image = account.download_latest_image(image_path)
+
+        if not downloaded_image:
+            video_result["error"] = "Görsel indirilemedi"
+            return None
+
+        video_result["image_path"] = downloaded_image
+        logger.info(f"[{i}] Görsel indirildi: {downloaded_image}")
+
+        # Durumu güncelle: görsel tamamlandı
+        self._update_status(self.project_dir, self.project_data, i, "image_done")
+
+        # ===== 2. WATERMARK TEMİZLE =====
+        self.manager._update_progress(f"[{i}] Watermark temizleniyor...", 25 + (i * 8))
+
+        cleaned_image_path = os.path.join(self.project_dir, f"image_{i}_cleaned.png")
+
+        if self._remove_watermark:
+            try:
+                self._remove_watermark(downloaded_image, cleaned_image_path)
+                logger.info(f"[{i}] Watermark temizlendi")
+            except Exception as e:
+                logger.warning(f"[{i}] Watermark temizleme hatası: {e}")
+                shutil.copy(downloaded_image, cleaned_image_path)
+        else:
+            shutil.copy(downloaded_image, cleaned_image_path)
+        video_result["cleaned_image_path"] = cleaned_image_path
+        self._watch_tab(account, i, "image")
+        return cleaned_image_path
+
+    def _start_video(self, account: GeminiProAccount, i: int, prompt_data: Dict[str, str],
+                     cleaned_image_path: str, video_result: Dict[str, Any]) -> Optional[int]:
+        """Temiz görseli yükle ve video prompt'unu gönder; önceki video sayısı veya None"""
+        self.manager._update_progress(f"[{i}] Temiz görsel yükleniyor...", 33 + (i * 8))
+
+        video_prompt = prompt_data.get("video_prompt", "")
+        # Video prompt'u hazırla - Gemini'ye video oluşturma talimatı
+        full_video_prompt = f"Turn this image into a video. Animate this image as a 5-8 second cinematic video. {self.video_format_desc}. {video_prompt}"
+
+        prev_video_count = account._count_generated_videos()
+
+        # Temizlenmiş görseli upload et ve video prompt'u gönder
+        if not account.upload_and_prompt(cleaned_image_path, full_video_prompt):
+            video_result["error"] = "Görsel yüklenemedi veya video prompt gönderilemedi"
+            # Tarayıcı problemi olabilir
+            if not account.is_browser_alive():
+                account.close_browser()
+            return None
+
+        self.manager._update_progress(f"[{i}] Video oluşturuluyor ({self.aspect_format})...", 35 + (i * 8))
+        return prev_video_count
+
+    def _finish_video(self, account: GeminiProAccount, i: int, prev_video_count: int, video_result: Dict[str, Any]):
+        """Videoyu bekle, indir, temizleme kuyruğuna ekle ve kullanımı işle"""
+        # Video oluşturulmasını bekle
+        if not account.wait_for_video_generation(prev_video_count):
+            video_result["error"] = "Video oluşturulamadı - timeout"
+            return
+
+        # Videoyu indir
+        video_path = os.path.join(self.project_dir, f"video_{i}.mp4")
+        downloaded_video = account.download_latest_video(video_path)
+
+        if not downloaded_video:
+            video_result["error"] = "Video indirilemedi"
+            self._update_status(self.project_dir, self.project_data, i, "video_failed")
+            return
+
+        video_result["video_path"] = downloaded_video
+        logger.info(f"[{i}] Video indirildi: {downloaded_video}")
+
+        # ===== 5. VIDEO WATERMARK TEMİZLE (Veo logosu) =====
+        cleaned_video_path = os.path.join(self.project_dir, f"video_{i}_cleaned.mp4")
+
+        if not self._remove_veo_watermark:
+            logger.debug(f"[{i}] Video watermark remover yüklü değil")
+        elif self._video_has_watermark(downloaded_video, i):
+            # Sonraki video üretilirken arka planda temizlenir
+            try:
+                self._queue_cleaning(i, downloaded_video, cleaned_video_path, video_result)
+                logger.info(f"[{i}] Video watermark temizleme kuyruğa eklendi")
+            except Exception as e:
+                logger.warning(f"[{i}] Video watermark temizleme hatası: {e}")
+
+        video_result["success"] = True
+
+        # Durumu güncelle: tamamlandı
+        self._update_status(self.project_dir, self.project_data, i, "completed")
+
+        # Hesap kullanımını güncelle
+        account.daily_usage += 1
+        self.manager._save_usage()
+
+        logger.info(f"[{i}] Video tamamlandı: {downloaded_video}")
+        self._watch_tab(account, i, "video")
+
+    def _process_prompt(self, account: GeminiProAccount, i: int, prompt_data: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Tek prompt, tek sekmede sırayla: görsel -> watermark temizle -> video -> indir
+
+        Returns:
+            video_result sözlüğü
+        """
+        logger.info(f"[{i}] Hesap {account.account_id} kullanılıyor (kullanım: {account.daily_usage}/3)")
+
+        error = self._ensure_browser(account, i)
+        if error:
+            return {"index": i, "success": False, "error": error}
+
+        video_result = self._new_result(i)
+        try:
+            # ===== 1. GÖRSEL OLUŞTUR =====
+            prev_image_count = self._start_image(account, i, prompt_data, video_result)
+            if prev_image_count is None:
+                return video_result
+
+            cleaned_image_path = self._finish_image(account, i, prev_image_count, video_result)
+            if not cleaned_image_path:
+                return video_result
+
+            # ===== 3. YENİ SOHBET + TEMİZ GÖRSELİ UPLOAD + VIDEO OLUŞTUR =====
+            self.manager._update_progress(f"[{i}] Yeni sohbet başlatılıyor...", 30 + (i * 8))
+
+            # Yeni sohbet başlat
+            account.new_chat()
+            time.sleep(3)
+
+            prev_video_count = self._start_video(account, i, prompt_data, cleaned_image_path, video_result)
+            if prev_video_count is None:
+                return video_result
+
+            self._finish_video(account, i, prev_video_count, video_result)
+
+            # Yeni sohbet başlat (sonraki video için)
+            account.new_chat()
+            time.sleep(2)
+
+        except Exception as e:
+            self._handle_prompt_error(account, i, video_result, e)
+
+        return video_result
+
+    def _run_pipeline(self, account: GeminiProAccount, next_item: Callable, record: Callable):
+        """
+        İki sekmeli hat: video i "video" sekmesinde üretilirken i+1'in görseli "image"
+        sekmesinde üretilir, indirilir ve temizlenir.
+
+        Sıra: video i gönder -> görsel i+1 gönder / bekle / temizle -> video i bekle / indir
+
+        Args:
+            next_item: next_item(in_flight) -> (i, prompt_data) veya None (kota / kuyruk bitti)
+            record: record(i, video_result) - biten prompt'un sonucu
+        """
+        def image_stage(i: int, prompt_data: Dict[str, str], video_result: Dict[str, Any],
+                        new_chat: bool = True) -> Optional[str]:
+            try:
+                account.switch_tab("image")
+                if new_chat:
+                    account.new_chat()
+                prev_image_count = self._start_image(account, i, prompt_data, video_result)
+                if prev_image_count is None:
+                    return None
+                return self._finish_image(account, i, prev_image_count, video_result)
+            except Exception as e:
+                self._handle_prompt_error(account, i, video_result, e)
+                return None
+
+        current = next_item(0)
+        if current is None:
+            return
+        result = self._new_result(current[0])
+        cleaned = image_stage(current[0], current[1], result, new_chat=False)
+
+        while current is not None:
+            i, prompt_data = current
+
+            # 1. Video i'yi video sekmesinde başlat
+            prev_video_count = None
+            if cleaned:
+                try:
+                    account.switch_tab("video")
+                    account.new_chat()
+                    prev_video_count = self._start_video(account, i, prompt_data, cleaned, result)
+                except Exception as e:
+                    self._handle_prompt_error(account, i, result, e)
+
+            # 2. Video i üretilirken i+1'in görseli (tarayıcı öldüyse hat durur, worker yeniden açar)
+            upcoming = next_item(1 if prev_video_count is not None else 0) if account.is_browser_alive() else None
+            upcoming_result = upcoming_cleaned = None
+            if upcoming:
+                upcoming_result = self._new_result(upcoming[0])
+                upcoming_cleaned = image_stage(upcoming[0], upcoming[1], upcoming_result)
+
+            # 3. Video i'yi topla
+            if prev_video_count is not None:
+                try:
+                    account.switch_tab("video")
+                    self._finish_video(account, i, prev_video_count, result)
+                except Exception as e:
+                    self._handle_prompt_error(account, i, result, e)
+
+            result["account_id"] = account.account_id
+            record(i, result)
+            current, result, cleaned = upcoming, upcoming_result, upcoming_cleaned
+
+    def _schedule_accounts(self, prompt_count: int) -> List[GeminiProAccount]:
+        """
+        Kuyruk tabanlı çalıştırmada kullanılacak hesaplar
+
+        Otomatik modda kapasitesi olan hesaplar (PARALLEL_ACCOUNTS["max_workers"] ile
+        sınırlı), belirli hesap seçildiyse sadece o hesap. Boş liste = eski sıralı döngü.
+        """
+        if self.selected_account != "auto":
+            if not config.TAB_PIPELINE["enabled"]:
+                return []
+            account = self.manager.get_account_by_id(int(self.selected_account))
+            return [account] if account and account.daily_usage < DAILY_VIDEO_LIMIT else []
+
+        if not (config.PARALLEL_ACCOUNTS["enabled"] or config.TAB_PIPELINE["enabled"]):
+            return []
+
+        accounts = []
+        for account in self.manager.accounts:
+            account = self.manager.get_account_by_id(account.account_id)
+            if account and account.daily_usage < DAILY_VIDEO_LIMIT:
+                accounts.append(account)
+
+        if config.PARALLEL_ACCOUNTS["enabled"]:
+            limit = config.PARALLEL_ACCOUNTS["max_workers"] or len(accounts)
+            accounts = accounts[:min(limit, prompt_count)]
+        return accounts
+
+    def _run_accounts(
+        self,
+        accounts: List[GeminiProAccount],
+        prompts: List[Dict[str, str]],
+        concurrent: bool = True
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Hesaplar ortak kuyruktan prompt alır; concurrent=True ise hesap başına bir thread
+
+        Bir hesap kotası dolunca veya tarayıcısı açılamayınca durur; kalan promptları
+        diğer hesaplar alır. TAB_PIPELINE açıksa her hesap iki sekmeli hat çalıştırır.
+
+        Returns:
+            (index sırasında video_result listesi, hiçbir hesabın alamadığı prompt varsa hata)
+        """
+        pending = queue.Queue()
+        for i, prompt_data in enumerate(prompts, 1):
+            pending.put((i, prompt_data))
+
+        results: Dict[int, Dict[str, Any]] = {}
+        results_lock = threading.Lock()
+        start_lock = threading.Lock()  # undetected_chromedriver aynı anda tek tarayıcı açsın
+        browser_failures = []
+
+        def record(i: int, result: Dict[str, Any]):
+            with results_lock:
+                results[i] = result
+
+        def worker(account: GeminiProAccount):
+            def next_item(in_flight: int) -> Optional[Tuple[int, Dict[str, str]]]:
+                # Üretimi süren promptlar da kotadan sayılır
+                if account.daily_usage + in_flight >= DAILY_VIDEO_LIMIT:
+                    return None
+                try:
+                    i, prompt_data = pending.get_nowait()
+                except queue.Empty:
+                    return None
+                self.manager._update_progress(f"[{i}] Hesap {account.account_id} işliyor...", 10 + (i * 8))
+                return i, prompt_data
+
+            while account.daily_usage < DAILY_VIDEO_LIMIT and not pending.empty():
+                if not account.is_browser_alive():
+                    with start_lock:
+                        account.close_browser()
+                        started = account.start_browser()
+                        time.sleep(config.PARALLEL_ACCOUNTS["start_stagger"])
+                    if not started or not account.navigate_to_gemini():
+                        # Promptlar diğer hesaplara kalsın
+                        logger.warning(f"Hesap {account.account_id} açılamadı, hesap devre dışı")
+                        browser_failures.append(account.account_id)
+                        return
+
+                if config.TAB_PIPELINE["enabled"] and account.open_tabs(["image", "video"]):
+                    self._run_pipeline(account, next_item, record)
+                    continue
+
+                item = next_item(0)
+                if item is None:
+                    return
+                result = self._process_prompt(account, *item)
+                result["account_id"] = account.account_id
+                record(item[0], result)
+
+        mode = "paralel" if concurrent and len(accounts) > 1 else "sırayla"
+        self.manager._update_progress(f"{len(prompts)} prompt {len(accounts)} hesapta {mode} işleniyor...", 10)
+        if concurrent:
+            threads = [
+                threading.Thread(target=worker, args=(account,), daemon=True, name=f"gemini-account-{account.account_id}")
+                for account in accounts
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        else:
+            for account in accounts:
+                worker(account)
+
+        # Kapasite / tarayıcı yüzünden kimsenin almadığı promptlar
+        error = None
+        if browser_failures and not pending.empty():
+            error = f"Hesap tarayıcıları açılamadı: {browser_failures}"
+        elif self.selected_account != "auto" and not pending.empty():
+            error = f"Hesap {self.selected_account} günlük limitine ulaştı ({DAILY_VIDEO_LIMIT}/{DAILY_VIDEO_LIMIT})"
+        elif not pending.empty():
+            error = "Tüm hesapların limiti doldu"
+        while not pending.empty():
+            i, _ = pending.get_nowait()
+            results[i] = {"index": i, "success": False, "error": error}
+
+        return [results[i] for i in sorted(results)], error
 
     def create_daily_project(self, prompts: List[Dict[str, str]], voice_text: str = "", aspect_format: str = "9:16", thumbnail_prompt: str = "", selected_account: str = "auto") -> Dict[str, Any]:
         """
@@ -1792,220 +2326,86 @@ class DailyShortsMode:
             remove_veo_watermark = None
             logger.warning("Video watermark remover bulunamadı")
 
-        for i, prompt_data in enumerate(prompts, 1):
-            self.manager._update_progress(f"Video {i}/{len(prompts)} işleniyor...", 10 + (i * 8))
-
-            # Hesap seçimi
-            if self.selected_account != "auto":
-                # Belirli bir hesap seçilmiş
-                account_id = int(self.selected_account)
-                account = self.manager.get_account_by_id(account_id)
-                if not account:
-                    results["success"] = False
-                    results["error"] = f"Hesap {account_id} bulunamadı"
-                    break
-                if account.daily_usage >= DAILY_VIDEO_LIMIT:
+        # Video temizleme arka planda süreç havuzunda yapılır, render öncesi beklenir
+        cleaning_pool = None
+        cleaning_jobs = {}  # index -> (cleaned_video_path, video_result)
+        cleaning_lock = threading.Lock()
+
+        def queue_cleaning(i: int, video_path: str, cleaned_video_path: str, video_result: Dict[str, Any]):
+            nonlocal cleaning_pool
+            with cleaning_lock:
+                if cleaning_pool is None:
+                    from cleaning_pool import VideoCleaningPool
+                    cleaning_pool = VideoCleaningPool(method="veo", expected_jobs=len(prompts))
+                cleaning_pool.submit(video_path, cleaned_video_path, key=f"video_{i}")
+                cleaning_jobs[i] = (cleaned_video_path, video_result)
+
+        # Aşama metotlarının ortak durumu
+        self.project_dir = project_dir
+        self.project_data = project_data
+        self._remove_watermark = remove_watermark
+        self._remove_veo_watermark = remove_veo_watermark
+        self._queue_cleaning = queue_cleaning
+
+        # Hata olursa da havuz kapanmalı - spawn worker'lar ve bütçe payı sızmasın
+        cleaning_results = {}
+        try:
+            # Otomatik modda hesaplar paralel; TAB_PIPELINE ile hesap içinde iki sekmeli hat
+            accounts = self._schedule_accounts(len(prompts))
+            if accounts:
+                concurrent = self.selected_account == "auto" and config.PARALLEL_ACCOUNTS["enabled"]
+                results["videos"], error = self._run_accounts(accounts, prompts, concurrent=concurrent)
+                if error:
                     results["success"] = False
-                    results["error"] = f"Hesap {account_id} günlük limitine ulaştı (3/3)"
-                    break
+                    results["error"] = error
             else:
-                # Otomatik mod - uygun hesabı bul
-                account = self.manager.get_available_account()
-                if not account:
-                    results["success"] = False
-                    results["error"] = "Tüm hesapların limiti doldu"
-                    break
-
-            logger.info(f"[{i}] Hesap {account.account_id} kullanılıyor (kullanım: {account.daily_usage}/3)")
-
-            # Hesap tarayıcısı açık ve çalışır durumda mı kontrol et
-            if not account.is_browser_alive():
-                logger.info(f"[{i}] Tarayıcı kapalı veya çökmüş, yeniden başlatılıyor...")
-                # Önceki oturumu temizle
-                account.close_browser()
-                time.sleep(2)  # Biraz bekle
-
-                if not account.start_browser():
-                    results["videos"].append({
-                        "index": i,
-                        "success": False,
-                        "error": "Tarayıcı başlatılamadı"
-                    })
-                    continue
-
-                if not account.navigate_to_gemini():
-                    results["videos"].append({
-                        "index": i,
-                        "success": False,
-                        "error": "Gemini'ye gidilemedi"
-                    })
-                    continue
-
-                # Sayfa yüklenmesi için bekle
-                time.sleep(3)
-
-            video_result = {
-                "index": i,
-                "success": False,
-                "image_path": None,
-                "cleaned_image_path": None,
-                "video_path": None,
-                "cleaned_video_path": None,
-                "error": None
-            }
-
-            try:
-                # ===== 1. GÖRSEL OLUŞTUR =====
-                self.manager._update_progress(f"[{i}] Görsel oluşturuluyor ({self.aspect_format})...", 15 + (i * 8))
-
-                image_prompt = prompt_data.get("image_prompt", "")
-                # Seçilen formatta görsel oluştur
-                full_image_prompt = f"Create a high quality image in {self.format_desc}: {image_prompt}"
-
-                # Önceki görsel sayısını al
-                prev_image_count = account._count_generated_images()
-
-                # Prompt gönder
-                if not account.send_prompt(full_image_prompt):
-                    video_result["error"] = "Görsel prompt gönderilemedi"
-                    results["videos"].append(video_result)
-                    # Tarayıcı problemi olabilir, kapat ki sonraki iterasyonda yeniden başlasın
-                    if not account.is_browser_alive():
-                        account.close_browser()
-                    continue
-
-                # Görsel oluşturulmasını bekle
-                if not account.wait_for_image_generation(prev_image_count):
-                    video_result["error"] = "Görsel oluşturulamadı - timeout"
-                    results["videos"].append(video_result)
-                    continue
-
-                # Görseli indir
-                image_path = os.path.join(project_dir, f"image_{i}.png")
-                downloaded_image = account.download_latest_image(image_path)
-
-                if not downloaded_image:
-                    video_result["error"] = "Görsel indirilemedi"
-                    results["videos"].append(video_result)
-                    continue
-
-                video_result["image_path"] = downloaded_image
-                logger.info(f"[{i}] Görsel indirildi: {downloaded_image}")
-
-                # Durumu güncelle: görsel tamamlandı
-                self._update_status(project_dir, project_data, i, "image_done")
-
-                # ===== 2. WATERMARK TEMİZLE =====
-                self.manager._update_progress(f"[{i}] Watermark temizleniyor...", 25 + (i * 8))
-
-                cleaned_image_path = os.path.join(project_dir, f"image_{i}_cleaned.png")
-
-                if remove_watermark:
-                    try:
-                        remove_watermark(downloaded_image, cleaned_image_path)
-                        video_result["cleaned_image_path"] = cleaned_image_path
-                        logger.info(f"[{i}] Watermark temizlendi")
-                    except Exception as e:
-                        logger.warning(f"[{i}] Watermark temizleme hatası: {e}")
-                        shutil.copy(downloaded_image, cleaned_image_path)
-                        video_result["cleaned_image_path"] = cleaned_image_path
-                else:
-                    shutil.copy(downloaded_image, cleaned_image_path)
-                    video_result["cleaned_image_path"] = cleaned_image_path
-
-                # ===== 3. YENİ SOHBET + TEMİZ GÖRSELİ UPLOAD + VIDEO OLUŞTUR =====
-                self.manager._update_progress(f"[{i}] Yeni sohbet başlatılıyor...", 30 + (i * 8))
-
-                # Yeni sohbet başlat
-                account.new_chat()
-                time.sleep(3)
-
-                self.manager._update_progress(f"[{i}] Temiz görsel yükleniyor...", 33 + (i * 8))
-
-                video_prompt = prompt_data.get("video_prompt", "")
-                # Video prompt'u hazırla - Gemini'ye video oluşturma talimatı
-                full_video_prompt = f"Turn this image into a video. Animate this image as a 5-8 second cinematic video. {self.video_format_desc}. {video_prompt}"
-
-                prev_video_count = account._count_generated_videos()
-
-                # Temizlenmiş görseli upload et ve video prompt'u gönder
-                if not account.upload_and_prompt(cleaned_image_path, full_video_prompt):
-                    video_result["error"] = "Görsel yüklenemedi veya video prompt gönderilemedi"
-                    results["videos"].append(video_result)
-                    # Tarayıcı problemi olabilir
-                    if not account.is_browser_alive():
-                        account.close_browser()
-                    continue
-
-                self.manager._update_progress(f"[{i}] Video oluşturuluyor ({self.aspect_format})...", 35 + (i * 8))
-
-                # Video oluşturulmasını bekle
-                if not account.wait_for_video_generation(prev_video_count):
-                    video_result["error"] = "Video oluşturulamadı - timeout"
-                    results["videos"].append(video_result)
-                    continue
-
-                # Videoyu indir
-                video_path = os.path.join(project_dir, f"video_{i}.mp4")
-                downloaded_video = account.download_latest_video(video_path)
-
-                if downloaded_video:
-                    video_result["video_path"] = downloaded_video
-                    logger.info(f"[{i}] Video indirildi: {downloaded_video}")
-
-                    # ===== 5. VIDEO WATERMARK TEMİZLE (Veo logosu) =====
-                    self.manager._update_progress(f"[{i}] Video watermark temizleniyor...", 45 + (i * 8))
-
-                    cleaned_video_path = os.path.join(project_dir, f"video_{i}_cleaned.mp4")
-
-                    if remove_veo_watermark:
-                        try:
-                            success = remove_veo_watermark(downloaded_video, cleaned_video_path)
-                            if success and os.path.exists(cleaned_video_path):
-                                video_result["cleaned_video_path"] = cleaned_video_path
-                                # Temizlenmiş videoyu orijinal yerine kullan
-                                os.replace(cleaned_video_path, downloaded_video)
-                                logger.info(f"[{i}] Video watermark temizlendi")
-                            else:
-                                logger.warning(f"[{i}] Video watermark temizlenemedi")
-                        except Exception as e:
-                            logger.warning(f"[{i}] Video watermark temizleme hatası: {e}")
+                for i, prompt_data in enumerate(prompts, 1):
+                    self.manager._update_progress(f"Video {i}/{len(prompts)} işleniyor...", 10 + (i * 8))
+
+                    # Hesap seçimi
+                    if self.selected_account != "auto":
+                        # Belirli bir hesap seçilmiş
+                        account_id = int(self.selected_account)
+                        account = self.manager.get_account_by_id(account_id)
+                        if not account:
+                            results["success"] = False
+                            results["error"] = f"Hesap {account_id} bulunamadı"
+                            break
+                        if account.daily_usage >= DAILY_VIDEO_LIMIT:
+                            results["success"] = False
+                            results["error"] = f"Hesap {account_id} günlük limitine ulaştı (3/3)"
+                            break
                     else:
-                        logger.debug(f"[{i}] Video watermark remover yüklü değil")
-
-                    video_result["success"] = True
-
-                    # Durumu güncelle: tamamlandı
-                    self._update_status(project_dir, project_data, i, "completed")
-
-                    # Hesap kullanımını güncelle
-                    account.daily_usage += 1
-                    self.manager._save_usage()
-
-                    logger.info(f"[{i}] Video tamamlandı: {downloaded_video}")
-                else:
-                    video_result["error"] = "Video indirilemedi"
-                    self._update_status(project_dir, project_data, i, "video_failed")
-
-                # Yeni sohbet başlat (sonraki video için)
-                account.new_chat()
-                time.sleep(2)
-
-            except Exception as e:
-                logger.error(f"[{i}] Hata: {e}")
-                import traceback
-                traceback.print_exc()
-                video_result["error"] = str(e)
-                self._update_status(project_dir, project_data, i, "failed")
-
-                # Tarayıcı hatası ise, sonraki iterasyonda yeniden başlatılsın
-                error_str = str(e).lower()
-                if any(x in error_str for x in ['session', 'disconnected', 'browser', 'closed', 'invalid']):
-                    logger.warning(f"[{i}] Tarayıcı hatası tespit edildi, kapatılıyor...")
-                    account.close_browser()
-                    time.sleep(3)
+                        # Otomatik mod - uygun hesabı bul
+                        account = self.manager.get_available_account()
+                        if not account:
+                            results["success"] = False
+                            results["error"] = "Tüm hesapların limiti doldu"
+                            break
 
-            results["videos"].append(video_result)
+                    results["videos"].append(self._process_prompt(account, i, prompt_data))
+
+            # Arka plandaki video temizliklerini bekle
+            if cleaning_pool is not None:
+                def on_cleaning_progress(snapshot):
+                    eta = f", kalan ~{snapshot['eta']}s" if snapshot["eta"] is not None else ""
+                    self.manager._update_progress(
+                        f"Video watermark temizleniyor: {snapshot['completed']}/{snapshot['total']}{eta}", 85)
+
+                cleaning_pool.on_progress = on_cleaning_progress
+                cleaning_results = cleaning_pool.wait()
+        finally:
+            if cleaning_pool is not None:
+                cleaning_pool.close()
+
+        for i, (cleaned_video_path, video_result) in cleaning_jobs.items():
+            if cleaning_results.get(f"video_{i}") and os.path.exists(cleaned_video_path):
+                video_result["cleaned_video_path"] = cleaned_video_path
+                # Temizlenmiş videoyu orijinal yerine kullan
+                os.replace(cleaned_video_path, video_result["video_path"])
+                logger.info(f"[{i}] Video watermark temizlendi")
+            else:
+                logger.warning(f"[{i}] Video watermark temizlenemedi")
 
         # Sonuç özeti
         success_count = sum(1 for v in results["videos"] if v.get("success"))
@@ -2300,7 +2700,7 @@ class DailyShortsMode:
                         continue
 
                     # Video watermark temizle
-                    if remove_veo_watermark:
+                    if remove_veo_watermark and self._video_has_watermark(video_path, i):
                         try:
                             cleaned_video = os.path.join(project_dir, f"video_{i}_cleaned.mp4")
                             if remove_veo_watermark(video_path, cleaned_video):
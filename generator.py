@@ -3,7 +3,6 @@ Auto Shorts Image Generator - Selenium Generator Module
 """
 import os
 import time
-import glob
 import shutil
 import logging
 import json
@@ -25,6 +24,10 @@ from selenium.common.exceptions import (
 )
 
 import config
+from dom_media import scan_media
+from dom_wait import wait_for_media_change, wait_for_media_loaded
+from media_capture import MediaCapture, enable_performance_logging
+from download_watcher import DownloadWatcher, IMAGE_EXTENSIONS, set_download_dir
 
 # Setup logging
 logging.basicConfig(
@@ -44,6 +47,7 @@ class GeminiImageGenerator:
     def __init__(self, project_name: str = None, progress_callback: Callable = None):
         self.driver: Optional[webdriver.Chrome] = None
         self.wait: Optional[WebDriverWait] = None
+        self.capture: Optional[MediaCapture] = None
         self.project_name = project_name or datetime.now().strftime("%Y%m%d_%H%M%S")
         self.project_dir = os.path.join(config.PROJECTS_DIR, self.project_name)
         self.progress_callback = progress_callback or (lambda msg, pct: logger.info(f"[{pct}%] {msg}"))
@@ -52,6 +56,7 @@ class GeminiImageGenerator:
         # Create directories
         os.makedirs(self.project_dir, exist_ok=True)
         os.makedirs(self.download_dir, exist_ok=True)
+        self.downloads = DownloadWatcher(self.download_dir)
 
     def _update_progress(self, message: str, percentage: int):
         """İlerleme durumunu güncelle"""
@@ -85,6 +90,7 @@ class GeminiImageGenerator:
             "safebrowsing.enabled": True
         }
         options.add_experimental_option("prefs", prefs)
+        enable_performance_logging(options)
 
         return options
 
@@ -109,6 +115,15 @@ class GeminiImageGenerator:
             })
 
             self.wait = WebDriverWait(self.driver, config.TIMEOUTS['element_wait'])
+
+            # Üretilen görselleri ağ yanıtlarından yakala (Downloads klasörü yerine)
+            self.capture = MediaCapture(self.driver)
+            self.capture.start()
+
+            # Buton ile indirme gerekirse: proje klasörü + dosya sistemi olayları
+            set_download_dir(self.driver, self.download_dir)
+            self.downloads.start()
+
             self._update_progress("Tarayıcı başlatıldı", 10)
             return True
 
@@ -129,7 +144,7 @@ class GeminiImageGenerator:
                 # Kullanıcının giriş yapmasını bekle (max 2 dakika)
                 for _ in range(24):  # 24 * 5 = 120 saniye
                     time.sleep(5)
-                    if "gemini.google.com" in self.driver.current_url:
+                    if config.GEMINI_HOST in self.driver.current_url:
                         break
                 else:
                     logger.warning("Login timeout - kullanıcı giriş yapmadı")
@@ -241,6 +256,8 @@ class GeminiImageGenerator:
                 full_prompt = prompt
 
             self._update_progress(f"Prompt gönderiliyor: {prompt[:50]}...", 30)
+            if self.capture:
+                self.capture.mark()
 
             # Sayfanın hazır olmasını bekle
             time.sleep(3)
@@ -356,7 +373,10 @@ class GeminiImageGenerator:
                 if current_count > previous_count:
                     self._update_progress("Görsel oluşturuldu!", 60)
                     logger.info(f"YENİ GÖRSEL TESPİT EDİLDİ! önceki={previous_count}, şimdiki={current_count}, süre={elapsed}s")
-                    time.sleep(3)  # Görsel tamamen yüklenmesi için bekle
+                    # Görsel tamamen yüklenmesi için bekle
+                    images = self._find_generated_images()
+                    if images:
+                        wait_for_media_loaded(self.driver, images[-1], timeout=10)
                     return True
 
                 # Loading/generating indicator kontrolü
@@ -368,7 +388,8 @@ class GeminiImageGenerator:
                 except:
                     pass
 
-                time.sleep(2)  # 2 saniye bekle ve tekrar kontrol et
+                # Yeni görsel / yükleme olayına kadar blokla (sabit 2s yerine)
+                wait_for_media_change(self.driver, "img", timeout=min(20, max_wait - elapsed))
 
             logger.error(f"TIMEOUT! Görsel {max_wait}s içinde oluşturulamadı - önceki: {previous_count}, şimdiki: {self._count_generated_images()}")
             return False
@@ -391,9 +412,18 @@ class GeminiImageGenerator:
             # En son oluşturulmuş görseli al
             target_image = generated_images[-1]
 
-            # ÖNCEKİ DOSYALARI KAYDET - indirme öncesi
-            files_before = self._get_files_in_dirs()
-            logger.info(f"İndirme öncesi dosya sayısı: {len(files_before)}")
+            # YÖNTEM 0: CDP ağ yakalama - sayfanın yüklediği baytlar doğrudan proje klasörüne
+            if self.capture:
+                new_path = self.capture.save(target_image.get_attribute('src') or "",
+                                             os.path.join(self.project_dir, filename), kind="image")
+                if new_path:
+                    logger.info(f"Görsel ağ yanıtından kaydedildi: {new_path} ({os.path.getsize(new_path)} bytes)")
+                    self._update_progress(f"Görsel kaydedildi: {filename}", 70)
+                    return new_path
+
+            # Tıklamadan önce kaydol - proje indirme klasörüne düşen ilk görsel bu indirmedir
+            pending = self.downloads.expect(IMAGE_EXTENSIONS)
+            download_clicked = False
 
             # YÖNTEM 1: Görselin üzerine gelip indirme butonunu bul
             try:
@@ -415,7 +445,6 @@ class GeminiImageGenerator:
                     'mat-icon-button[aria-label*="download" i]',
                 ]
 
-                download_clicked = False
                 for selector in download_selectors:
                     try:
                         btns = self.driver.find_elements(By.CSS_SELECTOR, selector)
@@ -425,7 +454,7 @@ class GeminiImageGenerator:
                                 btn.click()
                                 download_clicked = True
                                 logger.info(f"İNDİRME BUTONU TIKLANDI: {selector}")
-                                time.sleep(2)
+                                time.sleep(1)  # Dropdown menü açılabilir
 
                                 # Eğer dropdown açıldıysa, asıl indirme butonunu bul
                                 try:
@@ -436,7 +465,6 @@ class GeminiImageGenerator:
                                         if 'download' in text or 'indir' in text or 'save' in text:
                                             item.click()
                                             logger.info("Dropdown menüsünden indirme seçildi")
-                                            time.sleep(config.TIMEOUTS['download_wait'])
                                             break
                                 except:
                                     pass
@@ -449,11 +477,13 @@ class GeminiImageGenerator:
             except Exception as e:
                 logger.warning(f"Hover/click yöntemi başarısız: {e}")
 
-            # İndirmenin tamamlanmasını bekle
-            time.sleep(config.TIMEOUTS['download_wait'])
+            # İndirmenin tamamlanmasını bekle (.crdownload -> son ad olayı)
+            if not download_clicked:
+                self.downloads.discard(pending)
+                logger.warning("İndirilen dosya bulunamadı")
+                return None
 
-            # YENİ DOSYAYI BUL - önceki dosyalarla karşılaştır
-            downloaded_file = self._get_latest_download(files_before=files_before)
+            downloaded_file = self.downloads.wait(pending, timeout=config.DOWNLOAD_WATCH["image_timeout"])
             if downloaded_file:
                 new_path = os.path.join(self.project_dir, filename)
                 # Dosya zaten varsa sil
@@ -473,7 +503,6 @@ class GeminiImageGenerator:
 
     def _find_generated_images(self):
         """Oluşturulmuş görselleri bul"""
-        images = []
         selectors = [
             'img[data-test-id="generated-image"]',
             'img[alt*="Generated"]',
@@ -483,103 +512,19 @@ class GeminiImageGenerator:
             'model-response img',
         ]
 
-        for selector in selectors:
-            try:
-                found = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                images.extend([img for img in found if img.is_displayed()])
-            except:
-                continue
+        # Tüm seçiciler tek execute_script ile taranır
+        images = [item["element"] for item in scan_media(self.driver, selectors) if item["visible"]]
 
         # Fallback: Blob URL'li görselleri bul
         if not images:
-            try:
-                all_imgs = self.driver.find_elements(By.TAG_NAME, 'img')
-                for img in all_imgs:
-                    src = img.get_attribute('src') or ''
-                    if ('blob:' in src or 'generated' in src.lower() or
-                        img.get_attribute('alt') and 'generated' in img.get_attribute('alt').lower()):
-                        if img.is_displayed() and img.size['width'] > 100:
-                            images.append(img)
-            except:
-                pass
+            for item in scan_media(self.driver, ['img']):
+                if ('blob:' in item["src"] or 'generated' in item["src"].lower() or
+                        'generated' in item["alt"].lower()):
+                    if item["visible"] and item["width"] > 100:
+                        images.append(item["element"])
 
         return images
 
-    def _get_files_in_dirs(self) -> set:
-        """Tüm indirme klasörlerindeki dosyaları al"""
-        files = set()
-        extensions = ["*.png", "*.jpg", "*.jpeg", "*.webp", "*.gif"]
-
-        search_dirs = []
-        if self.download_dir and os.path.exists(self.download_dir):
-            search_dirs.append(self.download_dir)
-        search_dirs.append(os.path.expanduser("~/Downloads"))
-
-        for search_dir in search_dirs:
-            for ext in extensions:
-                files.update(glob.glob(os.path.join(search_dir, ext)))
-
-        return files
-
-    def _get_latest_download(self, files_before: set = None, max_wait: int = 30) -> Optional[str]:
-        """En son indirilen dosyayı bul - önceki dosya listesiyle karşılaştır"""
-        try:
-            logger.info(f"İndirme bekleniyor... (max {max_wait}s, önceki dosya sayısı: {len(files_before) if files_before else 0})")
-
-            # Birkaç kez dene (indirme gecikmeli olabilir)
-            for attempt in range(max_wait // 2):
-                # Eğer önceki dosya listesi verilmişse, yeni dosyayı bul
-                if files_before is not None:
-                    current_files = self._get_files_in_dirs()
-                    new_files = current_files - files_before
-
-                    # Devam eden indirmeleri kontrol et (.crdownload)
-                    downloads_dir = os.path.expanduser("~/Downloads")
-                    crdownloads = glob.glob(os.path.join(downloads_dir, "*.crdownload"))
-                    if crdownloads and attempt < (max_wait // 2) - 1:
-                        logger.info(f"İndirme devam ediyor ({len(crdownloads)} .crdownload dosyası)")
-                        time.sleep(2)
-                        continue
-
-                    if new_files:
-                        newest = max(new_files, key=os.path.getctime)
-                        logger.info(f"YENİ DOSYA BULUNDU: {newest}")
-                        return newest
-                    elif attempt % 3 == 0:
-                        logger.info(f"Henüz yeni dosya yok (şimdiki: {len(current_files)}, önceki: {len(files_before)})")
-
-                # Yaşa göre kontrol
-                search_dirs = []
-                if self.download_dir and os.path.exists(self.download_dir):
-                    search_dirs.append(self.download_dir)
-                search_dirs.append(os.path.expanduser("~/Downloads"))
-
-                extensions = ["*.png", "*.jpg", "*.jpeg", "*.webp", "*.gif"]
-
-                for search_dir in search_dirs:
-                    dir_files = []
-                    for ext in extensions:
-                        dir_files.extend(glob.glob(os.path.join(search_dir, ext)))
-
-                    if dir_files:
-                        latest = max(dir_files, key=os.path.getctime)
-                        file_age = time.time() - os.path.getctime(latest)
-
-                        if file_age < 60:  # Son 60 saniye
-                            logger.info(f"DOSYA BULUNDU (yaşa göre): {latest} ({file_age:.1f}s)")
-                            return latest
-
-                # Bulunamadı, bekle ve tekrar dene
-                if attempt < (max_wait // 2) - 1:
-                    logger.info(f"Dosya bekleniyor... ({attempt + 1})")
-                    time.sleep(2)
-
-            logger.warning("Yeni görsel dosyası bulunamadı")
-            return None
-        except Exception as e:
-            logger.error(f"Download dosyası bulma hatası: {e}")
-            return None
-
     def remove_watermark_locally(self, image_path: str, output_path: str) -> bool:
         """Görseldeki Gemini watermark'ını (yıldız ikonu) otomatik tespit edip temizle"""
         try:
@@ -993,6 +938,8 @@ class GeminiImageGenerator:
         if not keep_open and self.driver:
             self.driver.quit()
             self.driver = None
+            self.capture = None
+            self.downloads.stop()
             logger.info("Tarayıcı kapatıldı")
         elif keep_open:
             logger.info("Tarayıcı kontrol için açık bırakıldı")
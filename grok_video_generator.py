@@ -5,7 +5,6 @@ Cloudflare bypass için undetected-chromedriver kullanır
 """
 import os
 import time
-import glob
 import shutil
 import logging
 from datetime import datetime
@@ -23,6 +22,10 @@ from selenium.common.exceptions import (
 )
 
 import config
+from dom_media import scan_media
+from dom_wait import wait_for_media_change, wait_for_media_loaded
+from media_capture import MediaCapture, enable_performance_logging
+from download_watcher import DownloadWatcher, VIDEO_EXTENSIONS, set_download_dir
 
 logger = logging.getLogger(__name__)
 
@@ -33,12 +36,15 @@ class GrokVideoGenerator:
     def __init__(self, project_dir: str = None, progress_callback: Callable = None):
         self.driver: Optional[webdriver.Chrome] = None
         self.wait: Optional[WebDriverWait] = None
+        self.capture: Optional[MediaCapture] = None
         self.project_dir = project_dir
         self.progress_callback = progress_callback or (lambda msg, pct: logger.info(f"[{pct}%] {msg}"))
         self.download_dir = os.path.join(self.project_dir, "videos") if project_dir else None
+        self.downloads: Optional[DownloadWatcher] = None
 
         if self.download_dir:
             os.makedirs(self.download_dir, exist_ok=True)
+            self.downloads = DownloadWatcher(self.download_dir)
 
     def _update_progress(self, message: str, percentage: int):
         """İlerleme durumunu güncelle"""
@@ -70,6 +76,7 @@ class GrokVideoGenerator:
                     "download.directory_upgrade": True,
                 }
                 options.add_experimental_option("prefs", prefs)
+            enable_performance_logging(options)
 
             # Undetected Chrome başlat - Cloudflare'ı bypass eder
             self.driver = uc.Chrome(
@@ -79,6 +86,16 @@ class GrokVideoGenerator:
             )
 
             self.wait = WebDriverWait(self.driver, config.TIMEOUTS['element_wait'])
+
+            # Üretilen videoları ağ yanıtlarından yakala (Downloads klasörü yerine)
+            self.capture = MediaCapture(self.driver)
+            self.capture.start()
+
+            # Buton ile indirme gerekirse: proje klasörü + dosya sistemi olayları
+            if self.downloads:
+                set_download_dir(self.driver, self.download_dir)
+                self.downloads.start()
+
             self._update_progress("Tarayıcı başlatıldı (Stealth Mode)", 10)
             return True
 
@@ -94,11 +111,11 @@ class GrokVideoGenerator:
             self._update_progress("Grok Imagine'e gidiliyor...", 15)
 
             # Önce ana sayfaya git (Cloudflare challenge için)
-            self.driver.get("https://grok.com")
+            self.driver.get(config.GROK_BASE_URL)
             time.sleep(8)  # Cloudflare challenge için bekle
 
             # Şimdi imagine sayfasına git
-            self.driver.get("https://grok.com/imagine")
+            self.driver.get(f"{config.GROK_BASE_URL}/imagine")
             time.sleep(5)
 
             # Login kontrolü
@@ -116,10 +133,10 @@ class GrokVideoGenerator:
                 for _ in range(36):  # 3 dakika
                     time.sleep(5)
                     current_url = self.driver.current_url
-                    if "grok.com" in current_url:
+                    if config.GROK_HOST in current_url:
                         # imagine sayfasına yönlendir
                         if "imagine" not in current_url:
-                            self.driver.get("https://grok.com/imagine")
+                            self.driver.get(f"{config.GROK_BASE_URL}/imagine")
                             time.sleep(3)
                         break
                 else:
@@ -163,7 +180,7 @@ class GrokVideoGenerator:
 
             # Yöntem 2: Sayfayı yenile
             logger.info("Yeni chat butonu bulunamadı, sayfa yenileniyor...")
-            self.driver.get("https://grok.com/imagine")
+            self.driver.get(f"{config.GROK_BASE_URL}/imagine")
             time.sleep(5)
 
             # Sayfanın yüklenmesini bekle
@@ -322,6 +339,8 @@ class GrokVideoGenerator:
         """Video prompt'unu gönder"""
         try:
             self._update_progress(f"Video prompt gönderiliyor: {prompt[:50]}...", 50)
+            if self.capture:
+                self.capture.mark()
             time.sleep(2)
 
             # Input bul
@@ -485,18 +504,13 @@ class GrokVideoGenerator:
                     '.video-player',
                 ]
 
-                for selector in video_selectors:
-                    try:
-                        videos = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                        for video in videos:
-                            src = video.get_attribute('src') or ''
-                            if src and video.is_displayed():
-                                self._update_progress("Video oluşturuldu!", 80)
-                                self._save_debug_screenshot("video_ready")
-                                time.sleep(3)
-                                return True
-                    except:
-                        continue
+                # Tüm seçiciler tek execute_script ile taranır
+                for item in scan_media(self.driver, video_selectors):
+                    if item["src"] and item["visible"]:
+                        self._update_progress("Video oluşturuldu!", 80)
+                        wait_for_media_loaded(self.driver, item["element"], timeout=15)
+                        self._save_debug_screenshot("video_ready")
+                        return True
 
                 # Loading indicator kontrolü
                 try:
@@ -507,7 +521,9 @@ class GrokVideoGenerator:
                 except:
                     pass
 
-                time.sleep(3)
+                # Yeni video / yükleme olayına kadar blokla
+                elapsed = time.time() - start_time
+                wait_for_media_change(self.driver, "video", timeout=min(20, max_wait - elapsed))
 
             logger.warning("Video bekleme timeout")
             return False
@@ -523,23 +539,30 @@ class GrokVideoGenerator:
 
             # Video elementi bul
             video_element = None
+            video_src = ""
             video_selectors = ['video[src]', 'video', '[data-testid*="video"] video']
 
-            for selector in video_selectors:
-                try:
-                    videos = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for video in videos:
-                        if video.is_displayed():
-                            video_element = video
-                            break
-                    if video_element:
-                        break
-                except:
-                    continue
+            for item in scan_media(self.driver, video_selectors):
+                if item["visible"]:
+                    video_element = item["element"]
+                    video_src = item["src"]
+                    break
+
+            # YÖNTEM 0: CDP ağ yakalama - buton tıklama ve Downloads beklemesi olmadan
+            if self.capture and self.project_dir:
+                new_path = self.capture.save(video_src, os.path.join(self.project_dir, filename),
+                                             kind="video", min_size=50000)
+                if new_path:
+                    logger.info(f"Video ağ yanıtından kaydedildi: {new_path}")
+                    self._update_progress(f"Video kaydedildi: {filename}", 95)
+                    return new_path
 
-            # ÖNCEKİ VIDEO DOSYALARINI KAYDET - indirme öncesi
-            files_before = self._get_video_files_in_dirs()
-            logger.info(f"İndirme öncesi video dosya sayısı: {len(files_before)}")
+            if not self.downloads:
+                logger.warning("Proje klasörü yok, buton ile indirme yapılamaz")
+                return None
+
+            # Tıklamadan önce kaydol - proje video klasörüne düşen ilk video bu indirmedir
+            pending = self.downloads.expect(VIDEO_EXTENSIONS)
 
             # İndirme butonu ara - Grok'un yeni buton selektörleri
             download_selectors = [
@@ -568,7 +591,6 @@ class GrokVideoGenerator:
                             btn.click()
                             download_clicked = True
                             logger.info(f"İndirme butonu tıklandı: {selector}")
-                            time.sleep(config.TIMEOUTS['download_wait'])
                             break
                     if download_clicked:
                         break
@@ -604,7 +626,6 @@ class GrokVideoGenerator:
                                 btn.click()
                                 download_clicked = True
                                 logger.info(f"İndirme butonu tıklandı (XPath): {xpath}")
-                                time.sleep(config.TIMEOUTS['download_wait'])
                                 break
                         if download_clicked:
                             break
@@ -636,20 +657,22 @@ class GrokVideoGenerator:
                 except:
                     pass
 
-            # İndirilen dosyayı kontrol et - önceki dosyalarla karşılaştır
-            time.sleep(5)
-            downloaded_file = self._get_latest_download(files_before=files_before)
-
-            if downloaded_file:
-                new_path = os.path.join(self.project_dir, filename)
-                shutil.move(downloaded_file, new_path)
-                self._update_progress(f"Video kaydedildi: {filename}", 95)
-                return new_path
+            # İndirmenin tamamlanmasını bekle (.crdownload -> .mp4 olayı)
+            if download_clicked:
+                downloaded_file = self.downloads.wait(pending, timeout=config.DOWNLOAD_WATCH["video_timeout"])
+                if downloaded_file:
+                    new_path = os.path.join(self.project_dir, filename)
+                    shutil.move(downloaded_file, new_path)
+                    self._update_progress(f"Video kaydedildi: {filename}", 95)
+                    return new_path
+            else:
+                self.downloads.discard(pending)
 
             # Alternatif: Video src'den indir
             if video_element:
                 video_src = video_element.get_attribute('src')
                 if video_src and video_src.startswith('http'):
+                    pending = self.downloads.expect(VIDEO_EXTENSIONS)
                     logger.info(f"Video src'den indiriliyor: {video_src[:50]}...")
                     # JavaScript ile indirme tetikle
                     self.driver.execute_script(f"""
@@ -660,8 +683,7 @@ class GrokVideoGenerator:
                         a.click();
                         document.body.removeChild(a);
                     """)
-                    time.sleep(5)
-                    downloaded_file = self._get_latest_download(files_before=files_before)
+                    downloaded_file = self.downloads.wait(pending, timeout=config.DOWNLOAD_WATCH["video_timeout"])
                     if downloaded_file:
                         new_path = os.path.join(self.project_dir, filename)
                         shutil.move(downloaded_file, new_path)
@@ -677,65 +699,6 @@ class GrokVideoGenerator:
             traceback.print_exc()
             return None
 
-    def _get_video_files_in_dirs(self) -> set:
-        """Tüm video klasörlerindeki dosyaları al"""
-        files = set()
-        extensions = ["*.mp4", "*.webm", "*.mov"]
-
-        search_dirs = []
-        if self.download_dir and os.path.exists(self.download_dir):
-            search_dirs.append(self.download_dir)
-        search_dirs.append(os.path.expanduser("~/Downloads"))
-
-        for search_dir in search_dirs:
-            for ext in extensions:
-                files.update(glob.glob(os.path.join(search_dir, ext)))
-
-        return files
-
-    def _get_latest_download(self, files_before: set = None) -> Optional[str]:
-        """En son indirilen video dosyasını bul - önceki dosya listesiyle karşılaştır"""
-        try:
-            # Eğer önceki dosya listesi verilmişse, yeni dosyayı bul
-            if files_before is not None:
-                current_files = self._get_video_files_in_dirs()
-                new_files = current_files - files_before
-
-                if new_files:
-                    newest = max(new_files, key=os.path.getctime)
-                    logger.info(f"YENİ VIDEO DOSYASI BULUNDU: {newest}")
-                    return newest
-                else:
-                    logger.info("Yeni video dosyası yok, yaşa göre kontrol ediliyor...")
-
-            # Fallback: yaşa göre kontrol
-            search_dirs = []
-            if self.download_dir and os.path.exists(self.download_dir):
-                search_dirs.append(self.download_dir)
-            search_dirs.append(os.path.expanduser("~/Downloads"))
-
-            extensions = ["*.mp4", "*.webm", "*.mov"]
-
-            for search_dir in search_dirs:
-                dir_files = []
-                for ext in extensions:
-                    dir_files.extend(glob.glob(os.path.join(search_dir, ext)))
-
-                if dir_files:
-                    latest = max(dir_files, key=os.path.getctime)
-                    file_age = time.time() - os.path.getctime(latest)
-                    logger.info(f"Klasör {search_dir}: En yeni video: {latest} (yaş: {file_age:.1f}s)")
-
-                    if file_age < 120:  # Son 2 dakika
-                        logger.info(f"VIDEO DOSYASI BULUNDU (yaşa göre): {latest}")
-                        return latest
-
-            logger.warning("Yeni video dosyası bulunamadı")
-            return None
-        except Exception as e:
-            logger.error(f"Download dosyası bulma hatası: {e}")
-            return None
-
     def generate_video_from_image(self, image_path: str, video_prompt: str, output_filename: str) -> Dict[str, Any]:
         """Görsel ve prompt'tan video oluştur - RETRY YOK, tek deneme"""
         result = {
@@ -787,6 +750,9 @@ class GrokVideoGenerator:
         if not keep_open and self.driver:
             self.driver.quit()
             self.driver = None
+            self.capture = None
+            if self.downloads:
+                self.downloads.stop()
             logger.info("Tarayıcı kapatıldı")
         elif keep_open:
             logger.info("Tarayıcı kontrol için açık bırakıldı")
@@ -0,0 +1,123 @@
+"""
+Inpainting Sonuç Önbelleği - içerik adresli
+
+Anahtar: (giriş dosyasının SHA-256'sı, yöntem, mask geometrisi, model sürümü).
+Aynı dosya tekrar temizlenmek istendiğinde (retry, yeniden indirme, UI'dan
+"watermark temizle") model yüklenmeden önbellekteki çıktı kopyalanır.
+
+Kullanım:
+    key = cache_key(input_path, "gemini-lama", bbox, model_version())
+    if fetch(key, output_path):
+        return True
+    ... inpainting ...
+    store(key, output_path)
+"""
+import os
+import json
+import shutil
+import hashlib
+import logging
+import threading
+from functools import lru_cache
+from typing import Optional
+
+from config import INPAINT_CACHE
+
+logger = logging.getLogger(__name__)
+
+_evict_lock = threading.Lock()
+
+
+@lru_cache(maxsize=256)
+def _digest(path: str, size: int, mtime_ns: int) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def file_digest(path: str) -> str:
+    """Dosya içeriğinin SHA-256'sı (aynı boyut/mtime için süreç içinde tekrar okunmaz)"""
+    stat = os.stat(path)
+    return _digest(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def cache_key(input_path: str, method: str, geometry, model: str = "") -> Optional[str]:
+    """
+    Önbellek anahtarı, önbellek kapalıysa None
+
+    Args:
+        input_path: Temizlenecek dosya
+        method: Yöntem ve çıktıyı etkileyen ayarlar (örn. "veo-lama:keyframes=0")
+        geometry: Mask geometrisi (bbox vb., JSON'a çevrilebilir olmalı)
+        model: Model sürümü (lama_backend.model_version)
+    """
+    if not INPAINT_CACHE["enabled"]:
+        return None
+    payload = json.dumps([file_digest(input_path), method, geometry, model], default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _entry_path(key: str, ext: str) -> str:
+    return os.path.join(INPAINT_CACHE["dir"], key[:2], key + ext)
+
+
+def fetch(key: Optional[str], output_path: str) -> bool:
+    """Önbellekte varsa çıktıyı output_path'e kopyala"""
+    if not key:
+        return False
+    entry = _entry_path(key, os.path.splitext(output_path)[1])
+    if not os.path.exists(entry):
+        return False
+
+    try:
+        shutil.copyfile(entry, output_path)
+        os.utime(entry)  # Son kullanım (eviction sırası)
+    except OSError as e:
+        logger.warning(f"Önbellekten kopyalanamadı: {e}")
+        return False
+    logger.info(f"Önbellekten alındı: {output_path}")
+    return True
+
+
+def store(key: Optional[str], output_path: str):
+    """Üretilen çıktıyı önbelleğe kopyala (hata olursa sadece loglanır)"""
+    if not key or not os.path.exists(output_path):
+        return
+    entry = _entry_path(key, os.path.splitext(output_path)[1])
+    try:
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        # Kopya - hardlink değil: çıktı dosyası sonradan yerinde yazılabilir
+        tmp_path = f"{entry}.{os.getpid()}.tmp"
+        shutil.copyfile(output_path, tmp_path)
+        os.replace(tmp_path, entry)
+    except OSError as e:
+        logger.warning(f"Önbelleğe yazılamadı: {e}")
+        return
+    _evict()
+
+
+def _evict():
+    """Boyut sınırı aşıldıysa en eski kullanılan dosyaları sil"""
+    limit = INPAINT_CACHE["max_size_gb"] * 1024 ** 3
+    with _evict_lock:
+        entries = []
+        for root, _, files in os.walk(INPAINT_CACHE["dir"]):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
@@ -0,0 +1,631 @@
+"""
+LaMa Inference Backend'leri - TorchScript ve ONNX Runtime (CPU)
+LamaVideoInpainter ve watermark_remover aynı backend arayüzünü kullanır:
+
+    backend = get_lama_backend("onnx")
+    result_rgb = backend.inpaint(image_rgb, mask)
+
+Her export, kullanılmadan önce TorchScript modelin çıktısıyla karşılaştırılır; sonuç
+modelin yanına <model>.parity.json olarak yazılır ve tolerans aşılırsa model kullanılmaz.
+
+Kullanım (CLI):
+    python lama_backend.py export 512x512    # ONNX modelini tile boyutu için export et (+ parity)
+    python lama_backend.py parity 512x512    # torch ve onnx çıktılarını karşılaştır, kaydı yaz
+    python lama_backend.py quantize 512x512  # INT8 varyantını üret (LAMA_SETTINGS["int8_mode"])
+"""
+import os
+import sys
+import json
+import logging
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+from config import LAMA_MODEL_PATH, LAMA_MODEL_URL, LAMA_ONNX_DIR, LAMA_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+# Süreç başına tek model - aynı backend tekrar yüklenmez
+_backends = {}
+_backends_lock = threading.Lock()
+
+# TorchScript -> ONNX dönüşümü torch._export.converter'a (özel API) dayanıyor; export ve
+# parity'si doğrulanan sürümler [alt, üst). 2.4-2.6'nın exporter'ı bu modeli dönüştüremiyor.
+EXPORT_TORCH_VERSIONS = ((2, 7), (2, 15))
+
+
+def ensure_lama_model(model_path: Optional[str] = None) -> str:
+    """big-lama.pt yoksa indir, model yolunu döndür"""
+    model_path = model_path or LAMA_MODEL_PATH
+    if not os.path.exists(model_path):
+        logger.info("LaMa modeli indiriliyor...")
+        os.makedirs(os.path.dirname(model_path), exist_ok=True)
+        import urllib.request
+        urllib.request.urlretrieve(LAMA_MODEL_URL, model_path)
+    return model_path
+
+
+def model_signature(model_path: Optional[str] = None) -> str:
+    """Model dosyasının boyut-mtime imzası (dosya yoksa "missing")"""
+    try:
+        stat = os.stat(model_path or LAMA_MODEL_PATH)
+        return f"{stat.st_size}-{int(stat.st_mtime)}"
+    except OSError:
+        return "missing"
+
+
+def _reflect_pad(array: np.ndarray, height: int, width: int) -> np.ndarray:
+    """NCHW diziyi sağdan/alttan reflect padding ile (height, width) boyutuna getir"""
+    pad_h = height - array.shape[2]
+    pad_w = width - array.shape[3]
+    if pad_h == 0 and pad_w == 0:
+        return np.ascontiguousarray(array)
+    return np.pad(array, ((0, 0), (0, 0), (0, pad_h), (0, pad_w)), mode='reflect')
+
+
+class LamaBackend:
+    """
+    Backend arayüzü - alt sınıflar sadece `forward` tanımlar
+
+    forward: (1, 3, H, W) float32 [0, 1] görüntü + (1, 1, H, W) float32 {0, 1} mask
+             -> (1, 3, H, W) float32 [0, 1]
+    """
+
+    name = "base"
+
+    def forward(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def inpaint(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """
+        Tek görüntüyü inpaint et
+
+        Args:
+            image: RGB uint8 (H, W, 3)
+            mask: uint8 (H, W), >127 olan pikseller doldurulur
+
+        Returns:
+            RGB uint8 (H, W, 3)
+        """
+        height, width = image.shape[:2]
+        # 8'in katına yuvarla (model gereksinimi)
+        pad_h = (8 - height % 8) % 8
+        pad_w = (8 - width % 8) % 8
+        return self._run_padded(image, mask, height + pad_h, width + pad_w)
+
+    def _run_padded(self, image: np.ndarray, mask: np.ndarray, pad_height: int, pad_width: int) -> np.ndarray:
+        height, width = image.shape[:2]
+        img = image.astype(np.float32).transpose(2, 0, 1)[None] / 255.0
+        msk = (mask > 127).astype(np.float32)[None, None]
+
+        result = self.forward(_reflect_pad(img, pad_height, pad_width), _reflect_pad(msk, pad_height, pad_width))
+        result = result[0, :, :height, :width].transpose(1, 2, 0)
+        return (result * 255).clip(0, 255).astype(np.uint8)
+
+
+class TorchLamaBackend(LamaBackend):
+    """TorchScript big-lama.pt (mps / cuda / cpu)"""
+
+    name = "torch"
+
+    def __init__(self, model_path: Optional[str] = None):
+        import torch
+        self._torch = torch
+
+        model_path = ensure_lama_model(model_path)
+
+        # Device seç
+        if torch.backends.mps.is_available():
+            self.device = 'mps'
+        elif torch.cuda.is_available():
+            self.device = 'cuda'
+        else:
+            self.device = 'cpu'
+
+        logger.info(f"LaMa modeli yükleniyor (torch, {self.device})...")
+        self.model = torch.jit.load(model_path, map_location='cpu')
+        self.model = self.model.to(self.device)
+        self.model.eval()
+
+    def forward(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        torch = self._torch
+        with torch.no_grad():
+            result = self.model(torch.from_numpy(image).to(self.device), torch.from_numpy(mask).to(self.device))
+        return result.cpu().numpy()
+
+
+def onnx_model_path(tile_size: Tuple[int, int], onnx_dir: Optional[str] = None, variant: str = "") -> str:
+    """Tile boyutuna ait ONNX dosyasının yolu (variant: "" = float32, "int8-dynamic", "int8-static")"""
+    height, width = tile_size
+    suffix = f"_{variant}" if variant else ""
+    return os.path.join(onnx_dir or LAMA_ONNX_DIR, f"big-lama_{height}x{width}{suffix}.onnx")
+
+
+def parity_path(onnx_path: str) -> str:
+    """ONNX modelinin parity kaydı"""
+    return os.path.splitext(onnx_path)[0] + ".parity.json"
+
+
+def read_parity(onnx_path: str) -> Optional[dict]:
+    try:
+        with open(parity_path(onnx_path), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_parity(onnx_path: str, record: dict):
+    tmp_path = parity_path(onnx_path) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(record, f, indent=2)
+    os.replace(tmp_path, parity_path(onnx_path))
+
+
+def is_verified(onnx_path: str, model_path: Optional[str] = None) -> bool:
+    """Model dosyası var ve şu anki big-lama.pt ile yapılmış geçerli bir parity kaydı var"""
+    record = read_parity(onnx_path)
+    return (os.path.exists(onnx_path) and record is not None and record.get("ok")
+            and record.get("model") == model_signature(model_path))
+
+
+def parity_samples(tile_size: Tuple[int, int], samples: int = 3, seed: int = 0):
+    """Yumuşak doku + ortada dikdörtgen mask (Veo/Gemini watermark'ına benzer) örnekleri"""
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    height, width = tile_size
+    mask = synthetic_mask(height, width)
+    for _ in range(samples):
+        noise = rng.random((height // 8, width // 8, 3)).astype(np.float32)
+        image = cv2.resize(noise, (width, height), interpolation=cv2.INTER_CUBIC).clip(0, 1)
+        yield image.transpose(2, 0, 1)[None].copy(), mask
+
+
+def compare_outputs(reference, candidate, tile_size: Tuple[int, int], samples: int = 3) -> dict:
+    """
+    İki forward fonksiyonunu aynı girişlerde karşılaştır
+
+    Returns:
+        {"max_abs": ..., "mean_abs": ..., "samples": n} - farklar [0, 1] ölçeğinde
+    """
+    max_abs, mean_abs = 0.0, []
+    for image, mask in parity_samples(tile_size, samples):
+        diff = np.abs(reference(image, mask) - candidate(image, mask))
+        max_abs = max(max_abs, float(diff.max()))
+        mean_abs.append(float(diff.mean()))
+    return {"max_abs": max_abs, "mean_abs": float(np.mean(mean_abs)), "samples": samples}
+
+
+def _ts_converter():
+    """
+    TorchScript -> ExportedProgram dönüştürücü (torch._export.converter, özel API)
+
+    Sadece export + parity'si doğrulanmış torch sürümlerinde kullanılır
+    (LAMA_EXPORT_ANY_TORCH=1 ile zorlanabilir; sonuç yine parity'den geçmeli).
+    """
+    import torch
+
+    version = tuple(int(p) for p in torch.__version__.split("+")[0].split(".")[:2])
+    low, high = EXPORT_TORCH_VERSIONS
+    if not low <= version < high and not LAMA_SETTINGS["export_any_torch"]:
+        raise RuntimeError(f"LaMa ONNX export torch {low[0]}.{low[1]} - <{high[0]}.{high[1]} ile doğrulandı, "
+                           f"kurulu: {torch.__version__} (zorlamak için LAMA_EXPORT_ANY_TORCH=1)")
+    try:
+        from torch._export.converter import TS2EPConverter
+    except ImportError as e:
+        raise RuntimeError(f"torch {torch.__version__} TorchScript dönüştürücüsünü içermiyor: {e}")
+    return TS2EPConverter
+
+
+def export_onnx(tile_size: Tuple[int, int], onnx_path: Optional[str] = None,
+                model_path: Optional[str] = None, opset: int = 18) -> str:
+    """
+    TorchScript modeli sabit giriş boyutuyla ONNX'e export et (torch + onnxscript sadece burada gerekir)
+
+    TorchScript exporter'ında FFC katmanlarının FFT'leri (aten::fft_rfftn) yok, dynamo
+    exporter'ı da yüklenmiş ScriptModule'ü izleyemiyor; model önce ExportedProgram'a
+    çevrilip dynamo exporter'ı ile DFT düğümlerine dönüştürülür. Sonuç TorchScript
+    çıktısıyla karşılaştırılır ve sadece LAMA_SETTINGS["parity_tolerance"] içindeyse
+    parity kaydıyla birlikte yerine konur.
+
+    Args:
+        tile_size: (yükseklik, genişlik) - 8'in katı olmalı
+        onnx_path: Çıktı yolu (varsayılan: LAMA_ONNX_DIR altında)
+        model_path: big-lama.pt yolu
+        opset: ONNX opset (DFT için >= 17; ONNX Runtime 1.31 opset 20 DFT'sini çalıştıramıyor)
+
+    Raises:
+        RuntimeError: torch sürümü doğrulanmamışsa veya parity toleransı aşılırsa
+    """
+    import torch
+    import onnxruntime as ort
+
+    TS2EPConverter = _ts_converter()
+
+    height, width = tile_size
+    if height % 8 or width % 8:
+        raise ValueError(f"Tile boyutu 8'in katı olmalı: {height}x{width}")
+
+    onnx_path = onnx_path or onnx_model_path(tile_size)
+    os.makedirs(os.path.dirname(onnx_path), exist_ok=True)
+
+    logger.info(f"LaMa ONNX export: {height}x{width} -> {onnx_path}")
+    model = torch.jit.load(ensure_lama_model(model_path), map_location='cpu')
+    model.eval()
+
+    image = torch.rand(1, 3, height, width)
+    mask = (torch.rand(1, 1, height, width) > 0.5).float()
+
+    # Yarım kalan / parity'den geçmeyen export bir sonraki çalıştırmada kullanılmasın
+    tmp_path = onnx_path + ".tmp"
+    with torch.no_grad():
+        program = TS2EPConverter(model, (image, mask)).convert()
+        # Ağırlıklar ayrı .data dosyasına yazılırsa os.replace sonrası referans kopar
+        torch.onnx.export(
+            program, (image, mask), tmp_path,
+            input_names=["image", "mask"], output_names=["output"],
+            opset_version=opset, dynamo=True, external_data=False
+        )
+
+        session = ort.InferenceSession(tmp_path, providers=['CPUExecutionProvider'])
+        stats = compare_outputs(
+            lambda i, m: model(torch.from_numpy(i), torch.from_numpy(m)).numpy(),
+            lambda i, m: session.run(None, {"image": i, "mask": m})[0],
+            tile_size
+        )
+
+    tolerance = LAMA_SETTINGS["parity_tolerance"]
+    record = {"model": model_signature(model_path), "reference": "torch", "tile": [height, width],
+              "torch": torch.__version__, "onnxruntime": ort.__version__, "opset": opset,
+              "tolerance": tolerance, "ok": stats["max_abs"] <= tolerance, **stats}
+    logger.info(f"Parity {height}x{width}: max {stats['max_abs']:.2e}, ortalama {stats['mean_abs']:.2e}")
+    if not record["ok"]:
+        os.remove(tmp_path)
+        raise RuntimeError(f"ONNX çıktısı torch'tan sapıyor ({height}x{width}): "
+                           f"max {stats['max_abs']:.2e} > {tolerance:.2e}")
+
+    os.replace(tmp_path, onnx_path)
+    _write_parity(onnx_path, record)
+    return onnx_path
+
+
+class OnnxLamaBackend(LamaBackend):
+    """
+    ONNX Runtime CPU backend - sabit tile boyutları
+
+    Mask'ın çevresi, mask + bağlamı içine alan en küçük tile'a kırpılır ve sadece
+    o tile çalıştırılır. Her tile boyutu için model bir kez export edilir ve
+    diskte saklanır. Hiçbir tile yetmezse görüntü boyutu için export yapılır.
+    """
+
+    name = "onnx"
+
+    def __init__(
+        self,
+        tile_sizes: Optional[list] = None,
+        intra_op_threads: Optional[int] = None,
+        inter_op_threads: Optional[int] = None,
+        onnx_dir: Optional[str] = None,
+        model_path: Optional[str] = None
+    ):
+        import onnxruntime as ort
+        self._ort = ort
+
+        tile_sizes = tile_sizes or LAMA_SETTINGS["tile_sizes"]
+        self.tile_sizes = sorted((tuple(t) for t in tile_sizes), key=lambda t: t[0] * t[1])
+        self.tile_margin = LAMA_SETTINGS["tile_margin"]
+        self.onnx_dir = onnx_dir or LAMA_ONNX_DIR
+        self.model_path = model_path
+
+        self.options = ort.SessionOptions()
+        self.options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        intra = LAMA_SETTINGS["intra_op_threads"] if intra_op_threads is None else intra_op_threads
+        inter = LAMA_SETTINGS["inter_op_threads"] if inter_op_threads is None else inter_op_threads
+        if intra:
+            self.options.intra_op_num_threads = intra
+        if inter:
+            self.options.inter_op_num_threads = inter
+
+        self._sessions = {}
+        self._lock = threading.Lock()
+        logger.info(f"LaMa ONNX Runtime backend (CPU, intra={intra or 'auto'}, inter={inter or 'auto'})")
+
+    def _model_file(self, tile_size: Tuple[int, int]) -> str:
+        """Tile için ONNX dosyası - yoksa veya bu model için parity kaydı yoksa export et"""
+        path = onnx_model_path(tile_size, self.onnx_dir)
+        if not is_verified(path, self.model_path):
+            export_onnx(tile_size, path, self.model_path)
+        return path
+
+    def _session(self, tile_size: Tuple[int, int]):
+        with self._lock:
+            if tile_size not in self._sessions:
+                path = self._model_file(tile_size)
+                self._sessions[tile_size] = self._ort.InferenceSession(
+                    path, self.options, providers=['CPUExecutionProvider']
+                )
+            return self._sessions[tile_size]
+
+    def forward(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        session = self._session((image.shape[2], image.shape[3]))
+        return session.run(None, {"image": image, "mask": mask})[0]
+
+    def _pick_tile(self, box_height: int, box_width: int, height: int, width: int) -> Optional[Tuple[int, int]]:
+        """Mask kutusunu bağlamıyla birlikte içine alan en küçük tile"""
+        need_h = min(height, box_height + 2 * self.tile_margin)
+        need_w = min(width, box_width + 2 * self.tile_margin)
+        for tile_h, tile_w in self.tile_sizes:
+            if tile_h >= need_h and tile_w >= need_w:
+                return tile_h, tile_w
+        return None
+
+    def inpaint(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        ys, xs = np.nonzero(mask > 127)
+        if len(ys) == 0:
+            return image.copy()
+
+        height, width = image.shape[:2]
+        by1, by2, bx1, bx2 = ys.min(), ys.max() + 1, xs.min(), xs.max() + 1
+
+        tile = self._pick_tile(by2 - by1, bx2 - bx1, height, width)
+        if tile is None:
+            return super().inpaint(image, mask)
+
+        # Tile'ı mask kutusuna ortala, görüntü sınırlarına kaydır
+        tile_h, tile_w = tile
+        ty = min(max(0, (by1 + by2) // 2 - tile_h // 2), max(0, height - tile_h))
+        tx = min(max(0, (bx1 + bx2) // 2 - tile_w // 2), max(0, width - tile_w))
+        crop = image[ty:ty + tile_h, tx:tx + tile_w]
+        crop_mask = mask[ty:ty + tile_h, tx:tx + tile_w]
+
+        result = image.copy()
+        result[ty:ty + crop.shape[0], tx:tx + crop.shape[1]] = self._run_padded(crop, crop_mask, tile_h, tile_w)
+        return result
+
+
+def synthetic_mask(height: int, width: int) -> np.ndarray:
+    """Tile ortasında dikdörtgen mask (1, 1, H, W) - watermark bölgesine benzer"""
+    mask = np.zeros((1, 1, height, width), dtype=np.float32)
+    mask[:, :, height // 3:2 * height // 3, width // 3:2 * width // 3] = 1.0
+    return mask
+
+
+def load_calibration_tiles(source_dir: str, tile_size: Tuple[int, int], max_samples: int = 32,
+                           frames_per_video: int = 4) -> list:
+    """
+    Üretilmiş görsel/videolardan tile boyutunda örnekler çıkar
+
+    Watermark'lar sağ alt köşede olduğundan her kaynaktan sağ alt köşe crop'u alınır.
+
+    Returns:
+        (image, mask) listesi - image (1, 3, H, W) float32 [0, 1] RGB, mask synthetic_mask
+    """
+    import cv2
+
+    height, width = tile_size
+    sources = []
+    for root, _, files in os.walk(source_dir):
+        for name in sorted(files):
+            ext = os.path.splitext(name)[1].lower()
+            if ext in (".png", ".jpg", ".jpeg", ".webp", ".mp4", ".mov"):
+                sources.append(os.path.join(root, name))
+
+    frames = []
+    for path in sorted(sources):
+        if path.lower().endswith((".mp4", ".mov")):
+            cap = cv2.VideoCapture(path)
+            count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            for idx in np.linspace(0, max(0, count - 1), frames_per_video).astype(int):
+                cap.set(cv2.CAP_PROP_POS_FRAMES, int(idx))
+                ret, frame = cap.read()
+                if ret:
+                    frames.append(frame)
+            cap.release()
+        else:
+            frame = cv2.imread(path)
+            if frame is not None:
+                frames.append(frame)
+        if len(frames) >= max_samples:
+            break
+
+    mask = synthetic_mask(height, width)
+    tiles = []
+    for frame in frames[:max_samples]:
+        crop = frame[-height:, -width:]
+        if crop.shape[0] < height or crop.shape[1] < width:
+            crop = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        image = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB).astype(np.float32).transpose(2, 0, 1)[None] / 255.0
+        tiles.append((np.ascontiguousarray(image), mask))
+    return tiles
+
+
+def quantize_onnx(tile_size: Tuple[int, int], mode: str = "dynamic", calibration_dir: Optional[str] = None,
+                  onnx_dir: Optional[str] = None, model_path: Optional[str] = None) -> str:
+    """
+    Float32 ONNX modelinden INT8 varyant üret
+
+    Kaynak float32 model parity'den geçmiş olmalı (yoksa önce export edilir). INT8'in
+    float32'den sapması parity kaydına yazılır; kalite lama_quant_report.py ile ölçülür.
+
+    Args:
+        tile_size: (yükseklik, genişlik)
+        mode: "dynamic" (sadece ağırlıklar, kalibrasyon gerekmez) veya
+              "static" (aktivasyonlar da INT8, calibration_dir'deki framelerle kalibre edilir)
+        calibration_dir: Üretilmiş görsel/videoların bulunduğu klasör (static için)
+    """
+    from onnxruntime.quantization import (
+        CalibrationDataReader, QuantFormat, QuantType, quantize_dynamic, quantize_static
+    )
+
+    import onnxruntime as ort
+
+    float_path = onnx_model_path(tile_size, onnx_dir)
+    if not is_verified(float_path, model_path):
+        export_onnx(tile_size, float_path, model_path)
+
+    quant_path = onnx_model_path(tile_size, onnx_dir, variant=f"int8-{mode}")
+    tmp_path = quant_path + ".tmp"
+    logger.info(f"LaMa INT8 ({mode}) quantization: {tile_size[0]}x{tile_size[1]} -> {quant_path}")
+
+    if mode == "dynamic":
+        quantize_dynamic(float_path, tmp_path, weight_type=QuantType.QInt8)
+    elif mode == "static":
+        if not calibration_dir:
+            raise ValueError("Static quantization için calibration_dir gerekli")
+        tiles = load_calibration_tiles(calibration_dir, tile_size)
+        if not tiles:
+            raise ValueError(f"Kalibrasyon için frame bulunamadı: {calibration_dir}")
+        logger.info(f"Kalibrasyon: {len(tiles)} örnek")
+
+        class _TileReader(CalibrationDataReader):
+            def __init__(self):
+                self._iter = iter(tiles)
+
+            def get_next(self):
+                item = next(self._iter, None)
+                return None if item is None else {"image": item[0], "mask": item[1]}
+
+        quantize_static(
+            float_path, tmp_path, _TileReader(),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+            per_channel=True
+        )
+    else:
+        raise ValueError(f"Bilinmeyen quantization modu: {mode}")
+
+    float_session = ort.InferenceSession(float_path, providers=['CPUExecutionProvider'])
+    quant_session = ort.InferenceSession(tmp_path, providers=['CPUExecutionProvider'])
+    stats = compare_outputs(
+        lambda i, m: float_session.run(None, {"image": i, "mask": m})[0],
+        lambda i, m: quant_session.run(None, {"image": i, "mask": m})[0],
+        tile_size
+    )
+    logger.info(f"INT8 / float32 farkı: max {stats['max_abs']:.2e}, ortalama {stats['mean_abs']:.2e}")
+
+    os.replace(tmp_path, quant_path)
+    _write_parity(quant_path, {"model": model_signature(model_path), "reference": "onnx", "mode": mode,
+                               "tile": list(tile_size), "onnxruntime": ort.__version__, "ok": True, **stats})
+    return quant_path
+
+
+class OnnxInt8LamaBackend(OnnxLamaBackend):
+    """
+    INT8 quantize edilmiş ONNX modeli - float32 modelden bir kez üretilip saklanır
+
+    Mod ve kalibrasyon klasörü config.LAMA_SETTINGS["int8_mode"] / ["calibration_dir"]
+    ile seçilir.
+    """
+
+    name = "onnx-int8"
+
+    def __init__(self, mode: Optional[str] = None, calibration_dir: Optional[str] = None, **kwargs):
+        self.mode = mode or LAMA_SETTINGS["int8_mode"]
+        self.calibration_dir = calibration_dir or LAMA_SETTINGS["calibration_dir"]
+        super().__init__(**kwargs)
+
+    def _model_file(self, tile_size: Tuple[int, int]) -> str:
+        path = onnx_model_path(tile_size, self.onnx_dir, variant=f"int8-{self.mode}")
+        if not is_verified(path, self.model_path):
+            quantize_onnx(tile_size, self.mode, self.calibration_dir, self.onnx_dir, self.model_path)
+        return path
+
+
+BACKENDS = {
+    "torch": TorchLamaBackend,
+    "onnx": OnnxLamaBackend,
+    "onnx-int8": OnnxInt8LamaBackend,
+}
+
+
+def get_lama_backend(name: Optional[str] = None) -> LamaBackend:
+    """
+    Backend'i yükle (süreç içinde paylaşılır)
+
+    Args:
+        name: "torch", "onnx" veya "onnx-int8" - None ise config.LAMA_SETTINGS["backend"] (LAMA_BACKEND env)
+    """
+    name = (name or LAMA_SETTINGS["backend"]).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Bilinmeyen LaMa backend: {name} (seçenekler: {', '.join(BACKENDS)})")
+
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = BACKENDS[name]()
+        return _backends[name]
+
+
+def model_version(name: Optional[str] = None) -> str:
+    """
+    Backend + model dosyası imzası (modeli yüklemeden)
+
+    Önbellek anahtarlarında kullanılır; model dosyası veya ONNX/INT8 ayarı
+    değişince eski sonuçlar geçersiz olur.
+    """
+    name = (name or LAMA_SETTINGS["backend"]).lower()
+    signature = model_signature()
+
+    if name == "onnx-int8":
+        name = f"{name}-{LAMA_SETTINGS['int8_mode']}"
+    if name.startswith("onnx"):
+        name += "-" + ",".join(f"{h}x{w}" for h, w in LAMA_SETTINGS["tile_sizes"])
+    return f"big-lama:{signature}:{name}"
+
+
+def check_parity(tile_size: Tuple[int, int] = (512, 512), samples: int = 3,
+                 tolerance: Optional[float] = None) -> dict:
+    """
+    Aynı girişlerde torch ve onnx çıktılarını karşılaştır, parity kaydını güncelle
+
+    Kayıt "ok" değilse backend bir sonraki kullanımda modeli yeniden export eder.
+
+    Returns:
+        {"max_abs": ..., "mean_abs": ..., "ok": bool, ...} - farklar [0, 1] ölçeğinde
+    """
+    import torch
+    import onnxruntime as ort
+
+    tolerance = LAMA_SETTINGS["parity_tolerance"] if tolerance is None else tolerance
+    torch_backend = get_lama_backend("torch")
+    onnx_backend = get_lama_backend("onnx")
+
+    height, width = tile_size
+    stats = compare_outputs(torch_backend.forward, onnx_backend.forward, tile_size, samples)
+    path = onnx_backend._model_file(tile_size)
+    record = {**(read_parity(path) or {}), **stats,
+              "model": model_signature(), "reference": "torch", "tile": [height, width],
+              "torch": torch.__version__, "onnxruntime": ort.__version__,
+              "tolerance": tolerance, "ok": stats["max_abs"] <= tolerance}
+    _write_parity(path, record)
+
+    logger.info(f"Parity {height}x{width}: max {record['max_abs']:.2e}, ortalama {record['mean_abs']:.2e} "
+                f"-> {'OK' if record['ok'] else 'FARKLI'}")
+    return record
+
+
+def _parse_tile(value: str) -> Tuple[int, int]:
+    height, width = value.lower().split("x")
+    return int(height), int(width)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ("export", "parity", "quantize"):
+        print("Kullanım: python lama_backend.py export|parity|quantize [YxG ...]")
+        sys.exit(1)
+
+    tiles = [_parse_tile(t) for t in sys.argv[2:]] or [tuple(t) for t in LAMA_SETTINGS["tile_sizes"]]
+    ok = True
+    for tile in tiles:
+        if sys.argv[1] == "export":
+            print(f"✓ {export_onnx(tile, onnx_model_path(tile))}")
+        elif sys.argv[1] == "quantize":
+            print(f"✓ {quantize_onnx(tile, LAMA_SETTINGS['int8_mode'], LAMA_SETTINGS['calibration_dir'])}")
+        else:
+            stats = check_parity(tile)
+            print(f"{tile[0]}x{tile[1]}: max {stats['max_abs']:.2e}, ortalama {stats['mean_abs']:.2e} "
+                  f"(torch {stats['torch']}, onnxruntime {stats['onnxruntime']}) {'✓' if stats['ok'] else '✗'}")
+            ok = ok and stats["ok"]
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+LaMa INT8 kalite/hız raporu
+Float32 ONNX modeli ile INT8 varyantını aynı tile'larda karşılaştırır:
+mask bölgesi içinde PSNR/SSIM ve tile başına gecikme (ms)
+
+Kullanım:
+    python lama_quant_report.py [frames_dir] [YxG ...]
+    LAMA_INT8_MODE=static python lama_quant_report.py gemini_pro_projects 256x256 512x512
+"""
+import re
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from config import LAMA_SETTINGS
+from lama_backend import OnnxInt8LamaBackend, OnnxLamaBackend, load_calibration_tiles, synthetic_mask
+
+
+def masked_psnr(reference: np.ndarray, test: np.ndarray, mask: np.ndarray) -> float:
+    """(H, W, 3) [0, 1] görüntülerde sadece mask pikselleri üzerinden PSNR (dB)"""
+    mse = float(((reference - test) ** 2)[mask].mean())
+    return float("inf") if mse == 0 else 10 * np.log10(1.0 / mse)
+
+
+def masked_ssim(reference: np.ndarray, test: np.ndarray, mask: np.ndarray) -> float:
+    """Gaussian pencereli (11x11, sigma 1.5) SSIM haritasının mask içindeki ortalaması"""
+    c1, c2 = 0.01 ** 2, 0.03 ** 2
+
+    def blur(x):
+        return cv2.GaussianBlur(x, (11, 11), 1.5)
+
+    mu_x, mu_y = blur(reference), blur(test)
+    sigma_x = blur(reference * reference) - mu_x ** 2
+    sigma_y = blur(test * test) - mu_y ** 2
+    sigma_xy = blur(reference * test) - mu_x * mu_y
+
+    ssim_map = ((2 * mu_x * mu_y + c1) * (2 * sigma_xy + c2) /
+                ((mu_x ** 2 + mu_y ** 2 + c1) * (sigma_x + sigma_y + c2)))
+    return float(ssim_map.mean(axis=2)[mask].mean())
+
+
+def synthetic_tiles(tile_size: tuple, count: int = 8, seed: int = 0) -> list:
+    """Frame klasörü yoksa yumuşak doku örnekleri"""
+    rng = np.random.default_rng(seed)
+    height, width = tile_size
+    tiles = []
+    for _ in range(count):
+        noise = rng.random((height // 8, width // 8, 3)).astype(np.float32)
+        image = cv2.resize(noise, (width, height), interpolation=cv2.INTER_CUBIC).clip(0, 1)
+        tiles.append((np.ascontiguousarray(image.transpose(2, 0, 1)[None]), synthetic_mask(height, width)))
+    return tiles
+
+
+def timed_forward(backend, image: np.ndarray, mask: np.ndarray) -> tuple:
+    t0 = time.perf_counter()
+    result = backend.forward(image, mask)
+    return result, (time.perf_counter() - t0) * 1000
+
+
+def report_tile(float_backend, int8_backend, tiles: list) -> dict:
+    """Tek tile boyutu için metrikler"""
+    # Session oluşturma / export süresi ölçüme girmesin
+    float_backend.forward(*tiles[0])
+    int8_backend.forward(*tiles[0])
+
+    psnrs, ssims, float_ms, int8_ms = [], [], [], []
+    for image, mask in tiles:
+        reference, t_float = timed_forward(float_backend, image, mask)
+        test, t_int8 = timed_forward(int8_backend, image, mask)
+        float_ms.append(t_float)
+        int8_ms.append(t_int8)
+
+        region = mask[0, 0] > 0.5
+        reference = reference[0].transpose(1, 2, 0).clip(0, 1)
+        test = test[0].transpose(1, 2, 0).clip(0, 1)
+        psnrs.append(masked_psnr(reference, test, region))
+        ssims.append(masked_ssim(reference, test, region))
+
+    return {
+        "samples": len(tiles),
+        "psnr": float(np.mean(psnrs)),
+        "ssim": float(np.mean(ssims)),
+        "float_ms": (float(np.median(float_ms)), float(np.percentile(float_ms, 95))),
+        "int8_ms": (float(np.median(int8_ms)), float(np.percentile(int8_ms, 95))),
+    }
+
+
+def main(frames_dir: str = None, tile_sizes: list = None) -> list:
+    tile_sizes = tile_sizes or [tuple(t) for t in LAMA_SETTINGS["tile_sizes"]]
+    float_backend = OnnxLamaBackend()
+    int8_backend = OnnxInt8LamaBackend()
+
+    print(f"INT8 modu: {int8_backend.mode}")
+    print(f"{'Tile':>9} | {'Örnek':>5} | {'PSNR dB':>8} | {'SSIM':>6} | "
+          f"{'FP32 p50/p95 ms':>17} | {'INT8 p50/p95 ms':>17} | {'Hızlanma':>8}")
+
+    rows = []
+    for tile in tile_sizes:
+        tiles = load_calibration_tiles(frames_dir, tile) if frames_dir else []
+        if not tiles:
+            tiles = synthetic_tiles(tile)
+
+        row = report_tile(float_backend, int8_backend, tiles)
+        row["tile"] = tile
+        rows.append(row)
+
+        speedup = row["float_ms"][0] / row["int8_ms"][0]
+        print(f"{tile[0]:>4}x{tile[1]:<4} | {row['samples']:>5} | {row['psnr']:>8.2f} | {row['ssim']:>6.4f} | "
+              f"{row['float_ms'][0]:>8.1f}/{row['float_ms'][1]:<8.1f} | "
+              f"{row['int8_ms'][0]:>8.1f}/{row['int8_ms'][1]:<8.1f} | {speedup:>7.2f}x")
+
+    return rows
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    frames_dir = args.pop(0) if args and not re.fullmatch(r"\d+x\d+", args[0]) else None
+    tiles = [tuple(int(v) for v in t.lower().split("x")) for t in args]
+    main(frames_dir, tiles or None)
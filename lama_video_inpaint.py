@@ -5,49 +5,158 @@ Frame-by-frame inpainting with temporal consistency
 """
 import cv2
 import numpy as np
-import os
-import tempfile
-import subprocess
-from typing import Tuple, Optional
+from typing import Callable, Tuple, Optional
 import logging
 
+from inpaint_cache import cache_key, fetch, store
+from lama_backend import get_lama_backend, model_version
+from watermark_geometry import bbox_to_region, get_watermark_bbox
+from video_io import (
+    FFmpegFrameReader, FFmpegFrameWriter, FFmpegPatchOverlayWriter, align_crop, iter_capture
+)
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _filter_stack(stack: np.ndarray, frame_filter, radius: int) -> np.ndarray:
+    """
+    Frame başına çalışan bir OpenCV filtresini tüm (T, H, W, C) stack'e tek çağrıda uygula.
+
+    Her frame üst/alt kenarından `radius` kadar reflect-101 ile (OpenCV'nin
+    BORDER_DEFAULT'u) doldurulup alt alta dizilir; böylece filtre frameler arasında
+    taşmaz ve sonuç frame frame çalıştırmakla birebir aynı olur.
+    """
+    t, h = stack.shape[:2]
+    padded = np.pad(stack, ((0, 0), (radius, radius)) + ((0, 0),) * (stack.ndim - 2), mode='reflect')
+    tall = padded.reshape((t * (h + 2 * radius),) + stack.shape[2:])
+    filtered = frame_filter(np.ascontiguousarray(tall))
+    filtered = filtered.reshape(padded.shape)
+    return filtered[:, radius:radius + h]
+
+
+def temporal_smooth_rois(
+    rois: np.ndarray,
+    smooth_window: int = 3,
+    sigma: float = 1.5,
+    threshold: float = 30,
+    block_size: int = 16
+) -> np.ndarray:
+    """
+    Inpaint edilmiş watermark ROI'lerine temporal smoothing uygula (vektörel)
+
+    Stack, cache'te kalacak büyüklükte zaman bloklarına bölünerek işlenir;
+    her blok içinde tüm hesaplar tek seferde yapılır.
+
+    Args:
+        rois: (T, H, W, C) uint8 ROI stack'i
+        smooth_window: Gaussian pencere boyutu (frame)
+        sigma: Zaman eksenindeki Gaussian sigma
+        threshold: Forward-backward düzeltme eşiği
+        block_size: Blok başına frame sayısı
+
+    Returns:
+        (T, H, W, C) uint8 yumuşatılmış ROI stack'i
+    """
+    t = rois.shape[0]
+    half = smooth_window // 2
+    smoothed = rois
+
+    # İlk geçiş - zaman ekseni boyunca 1-D Gaussian konvolüsyon + bilateral filter
+    # (kenarlarda pencere kırpılır ve ağırlıklar yeniden normalize edilir)
+    if half > 0 and t > 1:
+        offsets = np.arange(-half, half + 1)
+        weights = np.exp(-0.5 * (offsets / sigma) ** 2).astype(np.float32)
+        smoothed = np.empty_like(rois)
+
+        for b0 in range(0, t, block_size):
+            b1 = min(t, b0 + block_size)
+            acc = np.zeros((b1 - b0,) + rois.shape[1:], dtype=np.float32)
+            norm = np.zeros(b1 - b0, dtype=np.float32)
+
+            for offset, weight in zip(offsets, weights):
+                src0, src1 = max(0, b0 + offset), min(t, b1 + offset)
+                acc[src0 - offset - b0:src1 - offset - b0] += rois[src0:src1] * weight
+                norm[src0 - offset - b0:src1 - offset - b0] += weight
+
+            acc /= norm[:, None, None, None]
+
+            # Bilateral filter - edge-aware smoothing (d=5 -> yarıçap 2)
+            smoothed[b0:b1] = _filter_stack(
+                acc.astype(np.uint8), lambda img: cv2.bilateralFilter(img, 5, 50, 50), 2
+            )
+
+    # İkinci geçiş - forward-backward consistency (komşular ilk geçişin çıktısından)
+    if t <= 2:
+        return smoothed
+
+    result = smoothed.copy()
+    for b0 in range(1, t - 1, block_size):
+        b1 = min(t - 1, b0 + block_size)
+        window = smoothed[b0 - 1:b1 + 1].astype(np.float32)
+        curr = window[1:-1]
+
+        # Önceki ve sonraki frame ortalamasından sapma
+        delta = (window[:-2] + window[2:]) * 0.5 - curr
+
+        # Sadece büyük farkları (flickering) düzelt
+        correction = (np.abs(delta) > threshold).astype(np.float32)
+        correction = _filter_stack(correction, lambda img: cv2.GaussianBlur(img, (5, 5), 0), 2)
+
+        correction *= 0.5
+        correction *= delta
+        correction += curr
+        result[b0:b1] = correction.astype(np.uint8)
+
+    return result
+
+
+def _fill_masked_flow(flow: np.ndarray, hole: np.ndarray, sigma: float = 15.0) -> np.ndarray:
+    """
+    Mask içindeki (güvenilmez) akışı çevredeki maskesiz bağlamdan doldur
+
+    Normalized convolution: maskesiz piksellerin akışı Gaussian ağırlıkla
+    deliğin içine yayılır.
+    """
+    valid = (~hole).astype(np.float32)
+    num = cv2.GaussianBlur(flow * valid[..., None], (0, 0), sigma)
+    den = cv2.GaussianBlur(valid, (0, 0), sigma)
+    filled = num / np.maximum(den, 1e-6)[..., None]
+    flow = flow.copy()
+    flow[hole] = filled[hole]
+    return flow
+
+
+def _warp_with_flow(image: np.ndarray, flow: np.ndarray) -> np.ndarray:
+    """Görüntüyü geriye doğru akışla (hedef -> kaynak) warp et"""
+    h, w = flow.shape[:2]
+    grid_x, grid_y = np.meshgrid(np.arange(w, dtype=np.float32), np.arange(h, dtype=np.float32))
+    return cv2.remap(image, grid_x + flow[..., 0], grid_y + flow[..., 1],
+                     interpolation=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+
 class LamaVideoInpainter:
-    def __init__(self):
-        self.model = None
-        self.device = None
+    def __init__(self, backend: Optional[str] = None):
+        """
+        Args:
+            backend: "torch" veya "onnx" (None = config.LAMA_SETTINGS / LAMA_BACKEND env)
+        """
+        self.backend_name = backend
+        self.backend = None
+        self.last_stats = None
+        self.watermark_geometry = None  # ((width, height), (x, y, w, h))
         self._load_model()
 
     def _load_model(self):
-        """LaMa modelini yükle"""
-        import torch
-        import torch.nn.functional as F
-
-        model_path = os.path.expanduser("~/.cache/torch/hub/checkpoints/big-lama.pt")
-
-        if not os.path.exists(model_path):
-            logger.info("LaMa modeli indiriliyor...")
-            os.makedirs(os.path.dirname(model_path), exist_ok=True)
-            import urllib.request
-            url = "https://github.com/enesmsahin/simple-lama-inpainting/releases/download/v0.1.0/big-lama.pt"
-            urllib.request.urlretrieve(url, model_path)
-
-        # Device seç
-        if torch.backends.mps.is_available():
-            self.device = 'mps'
-        elif torch.cuda.is_available():
-            self.device = 'cuda'
-        else:
-            self.device = 'cpu'
-
-        logger.info(f"LaMa modeli yükleniyor ({self.device})...")
-        self.model = torch.jit.load(model_path, map_location='cpu')
-        self.model = self.model.to(self.device)
-        self.model.eval()
-        logger.info("Model hazır!")
+        """LaMa inference backend'ini yükle"""
+        self.backend = get_lama_backend(self.backend_name)
+        logger.info(f"Model hazır! ({self.backend.name})")
+
+    def _veo_bbox(self, height: int, width: int) -> tuple:
+        """Bu çözünürlük için Veo yazısının kutusu (x, y, w, h) - process_video'da bulunan veya kayıtlı"""
+        if self.watermark_geometry and self.watermark_geometry[0] == (width, height):
+            return self.watermark_geometry[1]
+        return get_watermark_bbox("veo", width, height)
 
     def create_veo_mask(self, height: int, width: int, feather: bool = True) -> np.ndarray:
         """
@@ -56,24 +165,10 @@ class LamaVideoInpainter:
         """
         mask = np.zeros((height, width), dtype=np.uint8)
 
-        # Veo watermark bölgesi (sağ alt köşe)
-        # Daha geniş alan - kenarları da kapsasın
-        margin_right = 5
-        margin_bottom = 5
-        wm_width = 85
-        wm_height = 40
-
-        x1 = width - wm_width - margin_right
-        y1 = height - wm_height - margin_bottom
-        x2 = width - margin_right
-        y2 = height - margin_bottom
-
-        # Daha fazla padding
+        # Veo watermark bölgesi (sağ alt köşe) - çözünürlüğe göre geometri kaydından
+        # Daha fazla padding - kenarları da kapsasın
         padding = 12
-        x1 = max(0, x1 - padding)
-        y1 = max(0, y1 - padding)
-        x2 = min(width, x2 + padding)
-        y2 = min(height, y2 + padding)
+        x1, y1, x2, y2 = bbox_to_region(self._veo_bbox(height, width), width, height, padding)
 
         # Dikdörtgen mask
         mask[y1:y2, x1:x2] = 255
@@ -90,58 +185,20 @@ class LamaVideoInpainter:
 
     def get_mask_bounds(self, height: int, width: int) -> tuple:
         """Mask sınırlarını döndür (temporal smoothing için)"""
-        margin_right = 5
-        margin_bottom = 5
-        wm_width = 85
-        wm_height = 40
-        padding = 15
-
-        x1 = max(0, width - wm_width - margin_right - padding)
-        y1 = max(0, height - wm_height - margin_bottom - padding)
-        x2 = min(width, width - margin_right + padding)
-        y2 = min(height, height - margin_bottom + padding)
-
+        x1, y1, x2, y2 = bbox_to_region(self._veo_bbox(height, width), width, height, padding=15)
         return y1, y2, x1, x2
 
     def inpaint_frame(self, frame: np.ndarray, mask: np.ndarray, blend_edges: bool = True) -> np.ndarray:
         """Tek bir frame'i inpaint et - edge blending ile"""
-        import torch
-        import torch.nn.functional as F
-
         # BGR -> RGB
         img = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        height, width = img.shape[:2]
         original = frame.copy()
 
         # Binary mask (inpainting için)
         binary_mask = (mask > 127).astype(np.uint8) * 255
 
-        # Tensörlere çevir
-        img_tensor = torch.from_numpy(img).permute(2, 0, 1).unsqueeze(0).float() / 255.0
-        mask_tensor = torch.from_numpy(binary_mask).unsqueeze(0).unsqueeze(0).float() / 255.0
-
-        # 8'in katına yuvarla (model gereksinimi)
-        pad_h = (8 - height % 8) % 8
-        pad_w = (8 - width % 8) % 8
-
-        if pad_h > 0 or pad_w > 0:
-            img_tensor = F.pad(img_tensor, (0, pad_w, 0, pad_h), mode='reflect')
-            mask_tensor = F.pad(mask_tensor, (0, pad_w, 0, pad_h), mode='reflect')
-
-        img_tensor = img_tensor.to(self.device)
-        mask_tensor = mask_tensor.to(self.device)
-
         # Inpaint
-        with torch.no_grad():
-            result_tensor = self.model(img_tensor, mask_tensor)
-
-        # Padding'i kaldır
-        if pad_h > 0 or pad_w > 0:
-            result_tensor = result_tensor[:, :, :height, :width]
-
-        # Numpy'a çevir
-        result = result_tensor.squeeze(0).permute(1, 2, 0).cpu().numpy()
-        result = (result * 255).clip(0, 255).astype(np.uint8)
+        result = self.backend.inpaint(img, binary_mask)
         result = cv2.cvtColor(result, cv2.COLOR_RGB2BGR)
 
         if blend_edges:
@@ -157,12 +214,142 @@ class LamaVideoInpainter:
 
         return result
 
+    def _context_geometry(self, mask: np.ndarray, bounds: tuple, shape: tuple, context: int) -> tuple:
+        """
+        Mask çevresindeki bağlam bölgesi ve yardımcı maskeler
+
+        Returns:
+            ((cy1, cy2, cx1, cx2), hole, ring, blend) - hole: genişletilmiş watermark,
+            ring: maskesiz bağlam, blend: inpaint_frame ile aynı yumuşak geçiş (H, W, 1)
+        """
+        height, width = shape
+        y1, y2, x1, x2 = bounds
+        cy1, cy2 = max(0, y1 - context), min(height, y2 + context)
+        cx1, cx2 = max(0, x1 - context), min(width, x2 + context)
+
+        binary = mask[cy1:cy2, cx1:cx2] > 127
+        # Watermark kenarı da bozuk - deliği biraz genişlet
+        hole = cv2.dilate(binary.astype(np.uint8), np.ones((7, 7), np.uint8), iterations=2) > 0
+        ring = ~hole
+
+        blend = cv2.GaussianBlur(binary.astype(np.uint8) * 255, (31, 31), 0).astype(np.float32) / 255.0
+        return (cy1, cy2, cx1, cx2), hole, ring, blend[..., None]
+
+    def _inpaint_with_keyframes(
+        self,
+        frames: list,
+        mask: np.ndarray,
+        bounds: tuple,
+        context: int = 48,
+        stride: int = 0,
+        change_threshold: float = 6.0,
+        max_error: float = 8.0
+    ) -> dict:
+        """
+        LaMa'yı sadece keyframe'lerde çalıştır, aradaki frameleri optik akışla doldur
+
+        Keyframe'ler sabit aralıkla (stride > 0) veya maskesiz bağlamdaki değişim
+        `change_threshold`'u geçtiğinde seçilir. Ara frameler en yakın önceki/sonraki
+        keyframe patch'inin Farneback akışıyla warp edilmesi ve akış güveniyle
+        harmanlanmasıyla oluşturulur. Warp hatası `max_error`'u geçen frameler
+        LaMa'ya geri düşer.
+
+        Args:
+            frames: BGR frameler (yerinde güncellenir)
+            mask: Frame boyutunda watermark mask'ı
+            bounds: (y1, y2, x1, x2) mask sınırları
+            context: Akış için mask çevresinde kullanılacak bağlam (piksel)
+            stride: Sabit keyframe aralığı (0 = değişime göre seç)
+            change_threshold: Keyframe seçimi için ortalama gri seviye değişimi
+            max_error: Propagasyon için kabul edilen ortalama warp hatası
+
+        Returns:
+            İstatistikler: frames, keyframes, propagated, fallback, lama_calls
+        """
+        (cy1, cy2, cx1, cx2), hole, ring, blend = self._context_geometry(
+            mask, bounds, frames[0].shape[:2], context
+        )
+
+        raw_crops = [f[cy1:cy2, cx1:cx2].copy() for f in frames]
+        grays = [cv2.cvtColor(c, cv2.COLOR_BGR2GRAY) for c in raw_crops]
+
+        # Keyframe seçimi
+        keyframes = [0]
+        for i in range(1, len(frames)):
+            if stride > 0:
+                is_key = i - keyframes[-1] >= stride
+            else:
+                change = np.abs(grays[i].astype(np.float32) - grays[keyframes[-1]])[ring].mean()
+                is_key = change > change_threshold
+            if is_key:
+                keyframes.append(i)
+
+        logger.info(f"Keyframe: {len(keyframes)}/{len(frames)}")
+
+        key_crops = {}
+        for k in keyframes:
+            frames[k] = self.inpaint_frame(frames[k], mask)
+            key_crops[k] = frames[k][cy1:cy2, cx1:cx2]
+
+        # Ara frameleri akışla doldur
+        stats = {"frames": len(frames), "keyframes": len(keyframes), "propagated": 0, "fallback": 0}
+        key_set = set(keyframes)
+        next_key = {}
+        upcoming = None
+        for i in range(len(frames) - 1, -1, -1):
+            if i in key_set:
+                upcoming = i
+            next_key[i] = upcoming
+
+        prev = None
+        for i in range(len(frames)):
+            if i in key_set:
+                prev = i
+                continue
+
+            candidates = [k for k in (prev, next_key[i]) if k is not None]
+            warped, confidences = [], []
+            for k in candidates:
+                flow = cv2.calcOpticalFlowFarneback(grays[i], grays[k], None, 0.5, 3, 15, 3, 5, 1.2, 0)
+                flow = _fill_masked_flow(flow, hole)
+
+                # Maskesiz bağlamda warp hatası = akışın güvenilirliği
+                error = np.abs(_warp_with_flow(grays[k], flow).astype(np.float32) - grays[i])[ring].mean()
+                if error > max_error:
+                    continue
+
+                warped.append(_warp_with_flow(key_crops[k], flow).astype(np.float32))
+                confidences.append(np.exp(-error / max_error) / abs(i - k))
+
+            if not warped:
+                frames[i] = self.inpaint_frame(frames[i], mask)
+                stats["fallback"] += 1
+                continue
+
+            weights = np.array(confidences, dtype=np.float32) / sum(confidences)
+            patch = sum(w * p for w, p in zip(weights, warped))
+            result = patch * blend + raw_crops[i].astype(np.float32) * (1 - blend)
+            frames[i][cy1:cy2, cx1:cx2] = result.astype(np.uint8)
+            stats["propagated"] += 1
+
+        stats["lama_calls"] = stats["keyframes"] + stats["fallback"]
+        logger.info(f"LaMa çağrısı: {stats['lama_calls']}/{stats['frames']} "
+                    f"(keyframe: {stats['keyframes']}, propagasyon: {stats['propagated']}, "
+                    f"fallback: {stats['fallback']})")
+        return stats
+
     def process_video(
         self,
         input_path: str,
         output_path: str,
         temporal_smooth: bool = True,
-        smooth_window: int = 3
+        smooth_window: int = 3,
+        patch_only: bool = False,
+        context: int = 64,
+        keyframes: bool = False,
+        keyframe_stride: int = 0,
+        reuse_threshold: float = 2.0,
+        progress_callback: Optional[Callable[[int, int], None]] = None
     ) -> bool:
         """
         Video watermark'ını kaldır
@@ -172,6 +359,14 @@ class LamaVideoInpainter:
             output_path: Çıktı video yolu
             temporal_smooth: Temporal smoothing uygula
             smooth_window: Smoothing pencere boyutu
+            patch_only: Sadece watermark çevresindeki patch'i decode et/işle,
+                ffmpeg overlay ile orijinal videonun üzerine bindir
+            context: Patch modunda mask çevresinde LaMa'ya verilecek bağlam (piksel)
+            keyframes: LaMa'yı sadece keyframe'lerde çalıştır, arayı optik akışla doldur
+            keyframe_stride: Sabit keyframe aralığı (0 = bağlam değişimine göre seç)
+            reuse_threshold: Maskesiz bağlamdaki ortalama gri değişim bu değerin altındaysa
+                modeli çağırmadan önceki patch'i kullan (0 = kapalı)
+            progress_callback: (işlenen_frame, toplam_frame) ile çağrılır
         """
         try:
             cap = cv2.VideoCapture(input_path)
@@ -186,16 +381,41 @@ class LamaVideoInpainter:
 
             logger.info(f"Video: {width}x{height}, {fps}fps, {total_frames} frame")
 
+            # Bu çözünürlükte watermark konumu (ilk kez görülüyorsa framelerden bulunur)
+            bbox = get_watermark_bbox("veo", width, height, video_path=input_path)
+            self.watermark_geometry = ((width, height), bbox)
+            logger.info(f"Veo watermark kutusu: {bbox}")
+
+            # Aynı video aynı geometri/ayarlar/model ile daha önce temizlendiyse kopyala
+            method = (f"veo-lama:smooth={temporal_smooth}/{smooth_window}:patch={patch_only}:context={context}"
+                      f":keyframes={keyframes}/{keyframe_stride}:reuse={reuse_threshold}")
+            cache = cache_key(input_path, method, list(bbox), model_version(self.backend_name))
+            if fetch(cache, output_path):
+                cap.release()
+                self.last_stats = {"frames": total_frames, "lama_calls": 0, "reused": 0,
+                                   "skip_ratio": 1.0, "cached": True}
+                if progress_callback:
+                    progress_callback(total_frames, total_frames)
+                return True
+
             # Mask oluştur (tüm frameler için aynı)
             mask = self.create_veo_mask(height, width, feather=True)
 
             # Watermark bölgesinin koordinatları (smoothing için)
             wm_y1, wm_y2, wm_x1, wm_x2 = self.get_mask_bounds(height, width)
 
-            # Temp video dosyası
-            temp_video = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False).name
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(temp_video, fourcc, fps, (width, height))
+            if patch_only:
+                # Sadece mask + bağlam bölgesini decode et, koordinatları patch'e taşı
+                cap.release()
+                px, py, pw, ph = align_crop(wm_x1 - context, wm_y1 - context,
+                                            wm_x2 + context, wm_y2 + context, width, height)
+                logger.info(f"Patch modu: ({px},{py}) {pw}x{ph}")
+
+                mask = mask[py:py + ph, px:px + pw]
+                wm_y1, wm_y2, wm_x1, wm_x2 = wm_y1 - py, wm_y2 - py, wm_x1 - px, wm_x2 - px
+                frame_source = FFmpegFrameReader(input_path, crop=(px, py, pw, ph))
+            else:
+                frame_source = iter_capture(cap)
 
             # Tüm frameleri oku ve işle
             frames = []
@@ -204,91 +424,97 @@ class LamaVideoInpainter:
             logger.info("Frameler işleniyor...")
             frame_idx = 0
 
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-
-                # Frame'i inpaint et
-                result = self.inpaint_frame(frame, mask)
-                frames.append(result)
-
-                # Watermark bölgesini sakla (temporal smoothing için)
-                region = result[wm_y1:wm_y2, wm_x1:wm_x2].copy()
-                inpainted_regions.append(region)
-
-                frame_idx += 1
-                if frame_idx % 10 == 0:
-                    logger.info(f"İşlenen: {frame_idx}/{total_frames}")
-
-            cap.release()
+            if keyframes:
+                # LaMa sadece keyframe'lerde, ara frameler optik akışla
+                frames = list(frame_source)
+                if not frames:
+                    logger.error("Frame okunamadı")
+                    return False
+
+                self.last_stats = self._inpaint_with_keyframes(
+                    frames, mask, (wm_y1, wm_y2, wm_x1, wm_x2), stride=keyframe_stride
+                )
+                inpainted_regions = [f[wm_y1:wm_y2, wm_x1:wm_x2].copy() for f in frames]
+                if progress_callback:
+                    progress_callback(len(frames), total_frames)
+            else:
+                (cy1, cy2, cx1, cx2), _, ring, blend = self._context_geometry(
+                    mask, (wm_y1, wm_y2, wm_x1, wm_x2), (mask.shape[0], mask.shape[1]), 32
+                )
+                # Modelin son çalıştığı frame: gri bağlam, orijinal ve sonuç crop'u
+                reference = None
+                stats = {"frames": 0, "lama_calls": 0, "reused": 0}
+
+                for frame in frame_source:
+                    crop = frame[cy1:cy2, cx1:cx2].astype(np.float32)
+                    gray = cv2.cvtColor(frame[cy1:cy2, cx1:cx2], cv2.COLOR_BGR2GRAY).astype(np.float32)
+                    change = None
+                    if reference is not None and reuse_threshold > 0:
+                        change = np.abs(gray - reference[0])[ring].mean()
+
+                    if change is not None and change < reuse_threshold:
+                        # Statik arka plan - önceki inpaint sonucunu taşı, maske dışı
+                        # geçiş bölgesinde mevcut frame'in detayını koru
+                        _, ref_crop, ref_result = reference
+                        patch = ref_result + (crop - ref_crop) * (1 - blend)
+                        result = frame
+                        result[cy1:cy2, cx1:cx2] = np.clip(patch, 0, 255).astype(np.uint8)
+                        stats["reused"] += 1
+                    else:
+                        # Frame'i inpaint et
+                        result = self.inpaint_frame(frame, mask)
+                        reference = (gray, crop, result[cy1:cy2, cx1:cx2].astype(np.float32))
+                        stats["lama_calls"] += 1
+                    stats["frames"] += 1
+                    frames.append(result)
+
+                    # Watermark bölgesini sakla (temporal smoothing için)
+                    region = result[wm_y1:wm_y2, wm_x1:wm_x2].copy()
+                    inpainted_regions.append(region)
+
+                    frame_idx += 1
+                    if frame_idx % 10 == 0:
+                        logger.info(f"İşlenen: {frame_idx}/{total_frames}")
+                        if progress_callback:
+                            progress_callback(frame_idx, total_frames)
+
+                if not frames:
+                    logger.error("Frame okunamadı")
+                    return False
+
+                stats["skip_ratio"] = stats["reused"] / stats["frames"]
+                self.last_stats = stats
+                logger.info(f"LaMa çağrısı: {stats['lama_calls']}/{stats['frames']} "
+                            f"(tekrar kullanılan patch: {stats['reused']}, "
+                            f"atlama oranı: %{stats['skip_ratio'] * 100:.1f})")
 
             # Temporal smoothing (opsiyonel - flickering azaltır)
             if temporal_smooth and len(frames) > smooth_window:
                 logger.info("Gelişmiş temporal smoothing uygulanıyor...")
 
-                # İlk geçiş - weighted average
-                for i in range(len(frames)):
-                    start_idx = max(0, i - smooth_window // 2)
-                    end_idx = min(len(frames), i + smooth_window // 2 + 1)
-
-                    window_regions = inpainted_regions[start_idx:end_idx]
-
-                    if len(window_regions) > 1:
-                        # Gaussian weighted average
-                        weights = []
-                        center = i - start_idx
-                        for j in range(len(window_regions)):
-                            dist = abs(j - center)
-                            # Gaussian weight
-                            weight = np.exp(-0.5 * (dist / 1.5) ** 2)
-                            weights.append(weight)
-
-                        weights = np.array(weights) / sum(weights)
-
-                        smoothed_region = np.zeros_like(window_regions[0], dtype=np.float32)
-                        for region, w in zip(window_regions, weights):
-                            smoothed_region += region.astype(np.float32) * w
-
-                        smoothed_region = smoothed_region.astype(np.uint8)
-
-                        # Bilateral filter - edge-aware smoothing
-                        smoothed_region = cv2.bilateralFilter(smoothed_region, 5, 50, 50)
-
-                        frames[i][wm_y1:wm_y2, wm_x1:wm_x2] = smoothed_region
-
-                # İkinci geçiş - forward-backward consistency
-                logger.info("Forward-backward consistency kontrolü...")
-                for i in range(1, len(frames) - 1):
-                    prev_region = frames[i-1][wm_y1:wm_y2, wm_x1:wm_x2].astype(np.float32)
-                    curr_region = frames[i][wm_y1:wm_y2, wm_x1:wm_x2].astype(np.float32)
-                    next_region = frames[i+1][wm_y1:wm_y2, wm_x1:wm_x2].astype(np.float32)
-
-                    # Önceki ve sonraki frame ortalaması ile karşılaştır
-                    expected = (prev_region + next_region) / 2
+                # ROI'ler tek bir contiguous (T, H, W, C) dizide tutulur
+                roi_stack = np.stack(inpainted_regions)
+                smoothed = temporal_smooth_rois(roi_stack, smooth_window)
 
-                    # Fark çok büyükse düzelt (flickering)
-                    diff = np.abs(curr_region - expected)
-                    threshold = 30
+                for i, frame in enumerate(frames):
+                    frame[wm_y1:wm_y2, wm_x1:wm_x2] = smoothed[i]
 
-                    # Sadece büyük farkları düzelt
-                    correction_mask = (diff > threshold).astype(np.float32)
-                    correction_mask = cv2.GaussianBlur(correction_mask, (5, 5), 0)
-
-                    # Blend
-                    corrected = curr_region * (1 - correction_mask * 0.5) + expected * (correction_mask * 0.5)
-                    frames[i][wm_y1:wm_y2, wm_x1:wm_x2] = corrected.astype(np.uint8)
-
-            # Frameleri yaz
+            # Frameleri tek ffmpeg sürecine yaz (H.264 tek encode, orijinal ses kopyalanır)
             logger.info("Video yazılıyor...")
-            for frame in frames:
-                out.write(frame)
-
-            out.release()
+            if patch_only:
+                writer = FFmpegPatchOverlayWriter(output_path, input_path, px, py, pw, ph, fps,
+                                                  preset='slow', crf=17)
+            else:
+                writer = FFmpegFrameWriter(output_path, width, height, fps, audio_source=input_path,
+                                           preset='slow', crf=17)
 
-            # FFmpeg ile ses ekle ve finalize et
-            self._finalize_video(input_path, temp_video, output_path)
+            with writer:
+                for frame in frames:
+                    writer.write(frame)
+            store(cache, output_path)
 
+            if progress_callback:
+                progress_callback(total_frames, total_frames)
             logger.info(f"Tamamlandı: {output_path}")
             return True
 
@@ -298,64 +524,22 @@ class LamaVideoInpainter:
             traceback.print_exc()
             return False
 
-    def _finalize_video(self, original_path: str, temp_video: str, output_path: str):
-        """FFmpeg ile ses ekle ve H.264 encode et"""
-        try:
-            # Orijinalden ses çıkar
-            temp_audio = tempfile.NamedTemporaryFile(suffix='.aac', delete=False).name
-
-            result = subprocess.run([
-                'ffmpeg', '-y', '-i', original_path,
-                '-vn', '-acodec', 'aac', '-b:a', '192k', temp_audio
-            ], capture_output=True, timeout=60)
-
-            has_audio = os.path.exists(temp_audio) and os.path.getsize(temp_audio) > 1000
-
-            if has_audio:
-                # Video + Audio birleştir
-                subprocess.run([
-                    'ffmpeg', '-y',
-                    '-i', temp_video,
-                    '-i', temp_audio,
-                    '-c:v', 'libx264',
-                    '-preset', 'slow',  # Daha iyi kalite
-                    '-crf', '17',  # Yüksek kalite
-                    '-c:a', 'aac',
-                    '-b:a', '192k',
-                    '-shortest',
-                    '-movflags', '+faststart',
-                    '-pix_fmt', 'yuv420p',
-                    output_path
-                ], capture_output=True, timeout=300)
-
-                os.unlink(temp_audio)
-            else:
-                # Sadece video
-                subprocess.run([
-                    'ffmpeg', '-y',
-                    '-i', temp_video,
-                    '-c:v', 'libx264',
-                    '-preset', 'slow',
-                    '-crf', '17',
-                    '-movflags', '+faststart',
-                    '-pix_fmt', 'yuv420p',
-                    output_path
-                ], capture_output=True, timeout=300)
-
-            os.unlink(temp_video)
-
-        except Exception as e:
-            logger.warning(f"FFmpeg hatası: {e}")
-            import shutil
-            shutil.move(temp_video, output_path)
 
-
-def remove_video_watermark_lama(input_path: str, output_path: str) -> bool:
+def remove_video_watermark_lama(input_path: str, output_path: str, patch_only: bool = False,
+                                keyframes: bool = False, backend: Optional[str] = None,
+                                progress_callback: Optional[Callable[[int, int], None]] = None) -> bool:
     """
     Ana fonksiyon - Video watermark kaldır
+
+    Args:
+        patch_only: Sadece watermark patch'ini işle (ffmpeg overlay ile birleştir)
+        keyframes: LaMa'yı sadece keyframe'lerde çalıştır (optik akış propagasyonu)
+        backend: Inference backend'i ("torch" / "onnx", None = config)
+        progress_callback: (işlenen_frame, toplam_frame) ile çağrılır
     """
-    inpainter = LamaVideoInpainter()
-    return inpainter.process_video(input_path, output_path)
+    inpainter = LamaVideoInpainter(backend=backend)
+    return inpainter.process_video(input_path, output_path, patch_only=patch_only, keyframes=keyframes,
+                                   progress_callback=progress_callback)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,259 @@
+"""
+CDP ağ yakalama - üretilen görsel/video baytlarını doğrudan proje yoluna yaz
+
+İndirme butonuna tıklayıp ~/Downloads klasörünü sleep + glob ile izlemek yerine,
+sayfanın zaten yüklediği medya yanıtları Chrome DevTools Protocol ile alınır:
+
+    1. Performans logundaki Network.responseReceived / loadingFinished olayları
+       medya yanıtlarını (url, mime, requestId) kaydeder.
+    2. Gövde Network.getResponseBody ile okunur (tampondaysa, ek istek yok).
+    3. Tamponda yoksa (206 range yanıtı, büyük video) Network.loadNetworkResource
+       tarayıcının çerezleriyle dosyayı tekrar çeker, IO.read ile parça parça yazılır.
+
+blob: src'ler için ağ tarafındaki karşılık, türü uyan en son tamamlanmış yanıttır.
+Downloads klasörü hiç kullanılmadığı için hesaplar arası çakışma olmaz.
+
+Kullanım:
+    enable_performance_logging(options)          # tarayıcı başlamadan önce
+    self.capture = MediaCapture(self.driver)
+    self.capture.start()
+    self.capture.mark()                          # prompt göndermeden önce
+    ...
+    path = self.capture.save(img_src, save_path, kind="image")   # None = fallback'e geç
+"""
+import os
+import json
+import base64
+import logging
+from typing import Dict, List, Optional
+
+from config import MEDIA_CAPTURE
+
+logger = logging.getLogger(__name__)
+
+# Bellekte tutulan en fazla medya yanıtı (eskiler atılır)
+MAX_RESPONSES = 200
+
+
+def enable_performance_logging(options):
+    """Chrome seçeneklerinde performans logunu (Network olayları) aç"""
+    if MEDIA_CAPTURE["enabled"]:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+def _media_kind(mime: str) -> Optional[str]:
+    mime = (mime or "").lower()
+    if mime.startswith("image/"):
+        return "image"
+    if mime.startswith("video/"):
+        return "video"
+    return None
+
+
+class MediaCapture:
+    """Tek tarayıcı oturumunun medya yanıtlarını izler"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.active = False
+        self._responses: Dict[str, dict] = {}
+        self._seq = 0
+        self._marks: Dict[Optional[str], int] = {}  # sekme -> mark() anındaki seq
+
+    def start(self) -> bool:
+        """Network domain'ini büyük gövde tamponuyla aç"""
+        if not MEDIA_CAPTURE["enabled"]:
+            return False
+        total = MEDIA_CAPTURE["max_buffer_mb"] * 1024 * 1024
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {
+                "maxTotalBufferSize": total,
+                "maxResourceBufferSize": total // 2,
+            })
+            self.active = True
+        except Exception as e:
+            logger.warning(f"CDP ağ yakalama başlatılamadı: {e}")
+            self.active = False
+        return self.active
+
+    def poll(self):
+        """Performans logunu oku (get_log logu boşaltır, yanıtlar burada birikir)"""
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            logger.debug(f"Performans logu okunamadı: {e}")
+            return
+
+        for entry in entries:
+            try:
+                outer = json.loads(entry["message"])
+                message = outer["message"]
+            except (KeyError, ValueError, TypeError):
+                continue
+            method = message.get("method")
+            params = message.get("params", {})
+
+            if method == "Network.responseReceived":
+                response = params.get("response", {})
+                kind = _media_kind(response.get("mimeType"))
+                if kind:
+                    self._seq += 1
+                    self._responses[params["requestId"]] = {
+                        "seq": self._seq,
+                        "url": response.get("url", ""),
+                        "kind": kind,
+                        "status": response.get("status", 0),
+                        "finished": False,
+                        "size": 0,
+                        "tab": outer.get("webview"),  # hangi sekmenin yanıtı
+                    }
+            elif method == "Network.loadingFinished":
+                response = self._responses.get(params.get("requestId"))
+                if response:
+                    response["finished"] = True
+                    response["size"] = int(params.get("encodedDataLength") or 0)
+            elif method == "Network.loadingFailed":
+                self._responses.pop(params.get("requestId"), None)
+
+        # dict ekleme sırasını korur: en eskileri at
+        while len(self._responses) > MAX_RESPONSES:
+            self._responses.pop(next(iter(self._responses)))
+
+    def mark(self):
+        """Prompt gönderilmeden önce çağrılır: blob: eşleşmesi sadece bundan sonraki yanıtlara bakar"""
+        if self.active:
+            self.poll()
+            self._marks[self._current_tab()] = self._seq
+
+    def _candidates(self, src: str, kind: str) -> List[tuple]:
+        """src'ye uyan yanıtlar, en yeniden eskiye"""
+        items = list(self._responses.items())[::-1]
+        # Çok sekmeli oturumda (open_tabs) sadece aktif sekmenin yanıtları
+        tab = self._current_tab()
+        mark = self._marks.get(tab, 0)
+        if tab:
+            items = [(rid, r) for rid, r in items if r["tab"] in (None, tab)]
+        if src.startswith("http"):
+            return [(rid, r) for rid, r in items if r["url"] == src]
+        # blob: / boş src - son prompt'tan sonra gelen, türü uyan tamamlanmış yanıtlar
+        return [(rid, r) for rid, r in items if r["kind"] == kind and r["finished"] and r["seq"] > mark]
+
+    def _current_tab(self) -> Optional[str]:
+        """Aktif sekmenin hedef id'si (performans logundaki "webview" alanıyla aynı)"""
+        try:
+            handle = self.driver.current_window_handle
+        except Exception:
+            return None
+        return handle[len("CDwindow-"):] if handle.startswith("CDwindow-") else handle
+
+    def save(self, src: str, save_path: str, kind: str = "image", min_size: int = 10000) -> Optional[str]:
+        """
+        Medyayı ağ yanıtından save_path'e yaz
+
+        Args:
+            src: Elemanın src'si (http, blob: veya data:)
+            save_path: Hedef dosya
+            kind: "image" veya "video"
+            min_size: Bundan küçük gövdeler (ikon, önizleme) yok sayılır
+
+        Returns:
+            save_path veya None (yakalanamadı - çağıran eski yöntemlere düşer)
+        """
+        if not self.active:
+            return None
+        src = src or ""
+
+        if src.startswith("data:"):
+            try:
+                data = base64.b64decode(src.split(",", 1)[1])
+            except (IndexError, ValueError):
+                return None
+            return self._write(save_path, data) if len(data) >= min_size else None
+
+        self.poll()
+        for request_id, response in self._candidates(src, kind):
+            if response["status"] != 206 and response["finished"]:
+                data = self._response_body(request_id)
+                if data and len(data) >= min_size:
+                    logger.info(f"Ağ yanıtından yakalandı ({len(data)} bytes): {response['url'][:80]}")
+                    return self._write(save_path, data)
+            # Gövde tamponda değil / kısmi yanıt: tam dosyayı tarayıcı üzerinden çek
+            if self._load_resource(response["url"], save_path, min_size):
+                return save_path
+
+        # Performans logu kaçırmış olabilir: http src'yi doğrudan tarayıcıdan çek
+        if src.startswith("http") and self._load_resource(src, save_path, min_size):
+            return save_path
+        return None
+
+    def _response_body(self, request_id: str) -> Optional[bytes]:
+        try:
+            result = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        except Exception as e:
+            logger.debug(f"Yanıt gövdesi alınamadı ({request_id}): {e}")
+            return None
+        body = result.get("body", "")
+        if result.get("base64Encoded"):
+            return base64.b64decode(body)
+        return body.encode("latin-1", errors="ignore")
+
+    def _load_resource(self, url: str, save_path: str, min_size: int) -> bool:
+        """Network.loadNetworkResource + IO.read ile dosyayı parça parça yaz"""
+        if not url.startswith("http"):
+            return False
+        try:
+            frame_id = self.driver.execute_cdp_cmd("Page.getFrameTree", {})["frameTree"]["frame"]["id"]
+            resource = self.driver.execute_cdp_cmd("Network.loadNetworkResource", {
+                "frameId": frame_id,
+                "url": url,
+                "options": {"disableCache": False, "includeCredentials": True},
+            })["resource"]
+        except Exception as e:
+            logger.debug(f"loadNetworkResource başarısız: {e}")
+            return False
+
+        handle = resource.get("stream")
+        if not resource.get("success") or not handle:
+            logger.debug(f"Kaynak yüklenemedi (HTTP {resource.get('httpStatusCode')}): {url[:80]}")
+            return False
+
+        os.makedirs(os.path.dirname(os.path.abspath(save_path)), exist_ok=True)
+        temp_path = save_path + ".part"
+        size = 0
+        try:
+            with open(temp_path, "wb") as f:
+                while True:
+                    chunk = self.driver.execute_cdp_cmd("IO.read", {
+                        "handle": handle, "size": MEDIA_CAPTURE["read_chunk_kb"] * 1024,
+                    })
+                    data = chunk.get("data", "")
+                    data = base64.b64decode(data) if chunk.get("base64Encoded") else data.encode("latin-1", errors="ignore")
+                    f.write(data)
+                    size += len(data)
+                    if chunk.get("eof"):
+                        break
+        except Exception as e:
+            logger.debug(f"IO.read başarısız: {e}")
+            size = 0
+        finally:
+            try:
+                self.driver.execute_cdp_cmd("IO.close", {"handle": handle})
+            except Exception:
+                pass
+
+        if size < min_size:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+        os.replace(temp_path, save_path)
+        logger.info(f"Tarayıcı üzerinden indirildi ({size} bytes): {url[:80]}")
+        return True
+
+    def _write(self, save_path: str, data: bytes) -> str:
+        os.makedirs(os.path.dirname(os.path.abspath(save_path)), exist_ok=True)
+        temp_path = save_path + ".part"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, save_path)
+        return save_path
@@ -0,0 +1,406 @@
+"""
+Yerel Gemini / Grok taklidi - canlı hesap olmadan uçtan uca otomasyon testi
+
+gemini_pro_manager.py, generator.py ve grok_video_generator.py'nin kullandığı
+seçicileri (config.GEMINI_SELECTORS / GROK_SELECTORS ve yöneticilerdeki sabit
+seçiciler) taşıyan iki sayfa sunar:
+
+    /gemini, /gemini/app   - rich-textarea + .ql-editor, send-button, "Add image" + file input,
+                             model-response içinde generated-image img / video, indirme butonları,
+                             "New chat"
+    /grok, /grok/imagine   - "Describe..." textarea, file input, Generate (submit), video + Download
+
+Prompt gönderilince sayfa /api/generate'e istek atar; sunucu ayarlanan gecikmeden
+sonra sahte medya (PNG / ffmpeg testsrc MP4) döndürür ya da hata oranına göre
+başarısız olur. Yöneticiler GEMINI_BASE_URL / GROK_BASE_URL ile buraya yönlendirilir:
+
+    python mock_web.py --port 8765 --image-delay 3 --video-delay 10 --failure-rate 0.1
+    GEMINI_BASE_URL=http://127.0.0.1:8765/gemini GROK_BASE_URL=http://127.0.0.1:8765/grok python app.py
+
+    # Sunucu + DailyShortsMode.create_daily_project (geçici BASE_DIR, gerçek kullanım dosyası değişmez)
+    python mock_web.py --bench 3
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import struct
+import argparse
+import tempfile
+import threading
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+# Prompt'taki format -> medya boyutu (yöneticiler formatı prompt metnine yazar)
+SIZES = {
+    "9:16": (576, 1024),
+    "16:9": (1024, 576),
+    "1:1": (768, 768),
+}
+
+_STYLE = """
+body { font-family: sans-serif; margin: 0; background: #fafafa; }
+#chat { padding: 16px; max-width: 900px; margin: 0 auto 160px; }
+user-query, model-response { display: block; margin: 12px 0; padding: 12px; border-radius: 12px; }
+user-query { background: #e8f0fe; }
+model-response { background: #fff; border: 1px solid #ddd; }
+.generated-image img, video { width: 288px; display: block; }
+.loading { color: #888; }
+.input-area { position: fixed; bottom: 0; left: 0; right: 0; background: #fff; padding: 12px; border-top: 1px solid #ddd; }
+.ql-editor, textarea { min-height: 48px; width: 70%; border: 1px solid #ccc; padding: 8px; display: inline-block; }
+.attachment-preview { width: 64px; height: 64px; object-fit: cover; }
+[role="menu"] { display: none; border: 1px solid #ccc; background: #fff; position: absolute; bottom: 80px; }
+[role="menu"].open { display: block; }
+"""
+
+_COMMON_SCRIPT = """
+var attachment = null;
+
+function attach(input, preview) {
+    input.addEventListener('change', function () {
+        if (!input.files.length) return;
+        attachment = input.files[0];
+        preview.innerHTML = '';
+        var img = document.createElement('img');
+        img.className = 'attachment-preview';
+        img.src = URL.createObjectURL(attachment);
+        preview.appendChild(img);
+    });
+}
+
+function download(url) {
+    var a = document.createElement('a');
+    a.href = url;
+    a.download = url.split('/').pop();
+    document.body.appendChild(a);
+    a.click();
+    a.remove();
+}
+
+function generate(kind, prompt, container, render) {
+    var loading = document.createElement('div');
+    loading.className = 'loading';
+    loading.textContent = 'Generating...';
+    container.appendChild(loading);
+    fetch(API, {method: 'POST', headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({kind: kind, prompt: prompt, attachment: !!attachment})})
+        .then(function (r) { return r.json(); })
+        .then(function (data) {
+            loading.remove();
+            if (!data.ok) {
+                var error = document.createElement('p');
+                error.textContent = data.error;
+                container.appendChild(error);
+                return;
+            }
+            render(data.url);
+        });
+}
+"""
+
+_GEMINI_PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Gemini (mock)</title><style>%(style)s</style></head>
+<body>
+<button aria-label="New chat" data-test-id="new-chat" id="new-chat">New chat</button>
+<div id="chat"></div>
+<div class="input-area">
+  <div id="preview" class="upload-preview"></div>
+  <rich-textarea>
+    <div class="ql-editor" contenteditable="true" data-placeholder="Enter a prompt here"></div>
+  </rich-textarea>
+  <button aria-label="Add image" class="upload-button" id="add">+</button>
+  <div role="menu" id="menu"><div role="menuitem" id="upload-item">Upload file</div></div>
+  <input type="file" accept="image/*" style="display:none" id="file">
+  <button data-test-id="send-button" aria-label="Send message" id="send">Send</button>
+</div>
+<script>
+var API = '%(prefix)s/api/generate';
+%(common)s
+var editor = document.querySelector('.ql-editor'), chat = document.getElementById('chat');
+var preview = document.getElementById('preview'), menu = document.getElementById('menu');
+attach(document.getElementById('file'), preview);
+
+document.getElementById('add').onclick = function () { menu.classList.toggle('open'); };
+// Gerçek dosya diyaloğu açılmaz; otomasyon input[type=file]'a send_keys yapar
+document.getElementById('upload-item').onclick = function () { menu.classList.remove('open'); };
+document.getElementById('new-chat').onclick = function () {
+    chat.innerHTML = ''; preview.innerHTML = ''; attachment = null;
+};
+
+function send() {
+    var prompt = editor.innerText.trim();
+    if (!prompt) return;
+    var query = document.createElement('user-query');
+    query.textContent = prompt;
+    chat.appendChild(query);
+
+    var response = document.createElement('model-response');
+    var content = document.createElement('message-content');
+    response.setAttribute('data-message-author-role', 'model');
+    response.appendChild(content);
+    chat.appendChild(response);
+
+    var kind = /\\b(video|animate)\\b/i.test(prompt) ? 'video' : 'image';
+    generate(kind, prompt, content, function (url) {
+        if (kind === 'image') {
+            content.innerHTML =
+                '<div class="generated-image"><img data-test-id="generated-image" alt="Generated image" src="' + url + '"></div>' +
+                '<button data-test-id="download-generated-image-button" aria-label="Download full size image">Download</button>' +
+                '<button data-test-id="image-download-button" style="display:none">Download PNG</button>';
+            var buttons = content.querySelectorAll('button');
+            buttons[0].onclick = function () { buttons[1].style.display = 'inline-block'; };
+            buttons[1].onclick = function () { download(url); };
+        } else {
+            content.innerHTML = '<div class="video-container"><video src="' + url + '" controls muted preload="auto"></video></div>' +
+                '<button aria-label="Download video">Download</button>';
+            content.querySelector('button').onclick = function () { download(url); };
+        }
+    });
+    editor.innerHTML = ''; preview.innerHTML = ''; attachment = null;
+}
+document.getElementById('send').onclick = send;
+editor.addEventListener('keydown', function (e) {
+    if (e.key === 'Enter' && !e.shiftKey) { e.preventDefault(); send(); }
+});
+</script>
+</body></html>
+"""
+
+_GROK_PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Grok Imagine (mock)</title><style>%(style)s</style></head>
+<body>
+<a href="%(prefix)s/imagine" aria-label="New">New</a>
+<div id="chat"></div>
+<form class="input-area" id="form">
+  <div id="preview"></div>
+  <button type="button" aria-label="Upload image" id="upload">Upload</button>
+  <input type="file" accept="image/*" style="display:none" id="file">
+  <textarea placeholder="Describe the motion you want to see"></textarea>
+  <button type="submit" aria-label="Generate">Generate</button>
+</form>
+<script>
+var API = '%(prefix)s/api/generate';
+%(common)s
+var chat = document.getElementById('chat'), textarea = document.querySelector('textarea');
+attach(document.getElementById('file'), document.getElementById('preview'));
+
+document.getElementById('form').onsubmit = function (e) {
+    e.preventDefault();
+    var prompt = textarea.value.trim();
+    if (!prompt && !attachment) return;
+    var item = document.createElement('div');
+    chat.appendChild(item);
+    generate('video', prompt, item, function (url) {
+        item.innerHTML = '<video src="' + url + '" controls muted preload="auto"></video>' +
+            '<button aria-label="Download">Download</button>';
+        item.querySelector('button').onclick = function () { download(url); };
+    });
+    textarea.value = '';
+};
+</script>
+</body></html>
+"""
+
+
+def _png(width: int, height: int) -> bytes:
+    """Gürültülü gradyan PNG (medya yakalamanın min_size eşiğini geçecek kadar büyük)"""
+    rows = []
+    noise = random.Random()
+    for y in range(height):
+        row = bytearray(b"\x00")
+        shade = 255 * y // height
+        for x in range(width):
+            row += bytes((shade, 255 * x // width, noise.randrange(256)))
+        rows.append(bytes(row))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) +
+            chunk(b"IDAT", zlib.compress(b"".join(rows), 1)) + chunk(b"IEND", b""))
+
+
+def _mp4(width: int, height: int, cache_dir: str) -> bytes:
+    """ffmpeg testsrc2 ile 5 saniyelik H.264 video (boyut başına bir kez üretilir)"""
+    path = os.path.join(cache_dir, f"mock_{width}x{height}.mp4")
+    if not os.path.exists(path):
+        subprocess.run([
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate=24:duration=5",
+            "-c:v", "libx264", "-pix_fmt", "yuv420p", "-movflags", "+faststart", path,
+        ], check=True)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class MockState:
+    """Sunucu ayarları ve üretilen medya"""
+
+    def __init__(self, image_delay: float = 3, video_delay: float = 10, failure_rate: float = 0.0):
+        self.image_delay = image_delay
+        self.video_delay = video_delay
+        self.failure_rate = failure_rate
+        self.cache_dir = tempfile.mkdtemp(prefix="mock_web_")
+        self.media: Dict[str, Tuple[str, bytes]] = {}
+        self.counter = 0
+        self.lock = threading.Lock()
+
+    def generate(self, prefix: str, kind: str, prompt: str) -> dict:
+        time.sleep(self.image_delay if kind == "image" else self.video_delay)
+        if random.random() < self.failure_rate:
+            return {"ok": False, "error": "Something went wrong. Please try again."}
+
+        size = next((SIZES[fmt] for fmt in SIZES if fmt in prompt), SIZES["9:16"])
+        if kind == "image":
+            name, mime, data = "png", "image/png", _png(*size)
+        else:
+            name, mime, data = "mp4", "video/mp4", _mp4(*size, self.cache_dir)
+
+        with self.lock:
+            self.counter += 1
+            name = f"{kind}_{self.counter}.{name}"
+            self.media[name] = (mime, data)
+        return {"ok": True, "url": f"{prefix}/media/{name}"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    state: MockState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _route(self) -> Tuple[str, str]:
+        path = urlparse(self.path).path.rstrip("/")
+        for prefix in ("/gemini", "/grok"):
+            if path == prefix or path.startswith(prefix + "/"):
+                return prefix, path[len(prefix):]
+        return "", path
+
+    def do_GET(self):
+        prefix, path = self._route()
+        if path.startswith("/media/"):
+            item = self.state.media.get(path[len("/media/"):])
+            if not item:
+                return self._send(404, b"not found", "text/plain")
+            return self._send(200, item[1], item[0])
+
+        values = {"style": _STYLE, "common": _COMMON_SCRIPT, "prefix": prefix}
+        if prefix == "/gemini" and path in ("", "/app"):
+            return self._send(200, (_GEMINI_PAGE % values).encode(), "text/html; charset=utf-8")
+        if prefix == "/grok" and path in ("", "/imagine"):
+            return self._send(200, (_GROK_PAGE % values).encode(), "text/html; charset=utf-8")
+        self._send(404, b"not found", "text/plain")
+
+    do_HEAD = do_GET
+
+    def do_POST(self):
+        prefix, path = self._route()
+        if path != "/api/generate":
+            return self._send(404, b"not found", "text/plain")
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            return self._send(400, b"bad request", "text/plain")
+        result = self.state.generate(prefix, request.get("kind", "image"), request.get("prompt", ""))
+        self._send(200, json.dumps(result).encode(), "application/json")
+
+
+def start_mock_server(port: int = 8765, image_delay: float = 3, video_delay: float = 10,
+                      failure_rate: float = 0.0) -> ThreadingHTTPServer:
+    """
+    Mock sunucuyu arka plan thread'inde başlat
+
+    Returns:
+        ThreadingHTTPServer (durdurmak için shutdown())
+    """
+    handler = type("MockHandler", (_Handler,), {"state": MockState(image_delay, video_delay, failure_rate)})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="mock-web").start()
+    return server
+
+
+def base_urls(port: int) -> Dict[str, str]:
+    return {
+        "GEMINI_BASE_URL": f"http://127.0.0.1:{port}/gemini",
+        "GROK_BASE_URL": f"http://127.0.0.1:{port}/grok",
+    }
+
+
+def run_bench(prompt_count: int, aspect_format: str = "9:16") -> Optional[dict]:
+    """
+    DailyShortsMode.create_daily_project'i mock sunucuya karşı çalıştır ve süreyi ölç
+
+    config, base URL env'leri ayarlandıktan sonra import edilir; profiller, kullanım
+    dosyası ve projeler geçici bir BASE_DIR altında tutulur.
+    """
+    import config
+    config.BASE_DIR = tempfile.mkdtemp(prefix="mock_bench_")
+    from gemini_pro_manager import GeminiProManager, DailyShortsMode
+
+    prompts = [{
+        "image_prompt": f"Mock scene {i}, dramatic lighting",
+        "video_prompt": f"CAMERA: slow dolly in | scene {i}",
+    } for i in range(1, prompt_count + 1)]
+
+    manager = GeminiProManager()
+    start = time.time()
+    try:
+        result = DailyShortsMode(manager).create_daily_project(prompts, aspect_format=aspect_format)
+    finally:
+        manager.close_all()
+    elapsed = time.time() - start
+
+    videos = result.get("videos", [])
+    print(f"\n{sum(1 for v in videos if v.get('success'))}/{prompt_count} video, {elapsed:.1f}s "
+          f"({elapsed / max(prompt_count, 1):.1f}s/prompt) - {result.get('project_dir')}")
+    for video in videos:
+        print(f"  [{video.get('index')}] {'OK' if video.get('success') else video.get('error')}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yerel Gemini / Grok mock sunucusu")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--image-delay", type=float, default=3, help="Görsel üretim gecikmesi (saniye)")
+    parser.add_argument("--video-delay", type=float, default=10, help="Video üretim gecikmesi (saniye)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Başarısız üretim oranı (0-1)")
+    parser.add_argument("--bench", type=int, metavar="N", help="N prompt ile create_daily_project çalıştır ve çık")
+    parser.add_argument("--format", default="9:16", choices=list(SIZES))
+    args = parser.parse_args()
+
+    server = start_mock_server(args.port, args.image_delay, args.video_delay, args.failure_rate)
+    urls = base_urls(args.port)
+
+    if args.bench:
+        os.environ.update(urls)
+        run_bench(args.bench, args.format)
+        server.shutdown()
+        return
+
+    print("Mock sunucu çalışıyor. Yöneticileri yönlendirmek için:")
+    for key, value in urls.items():
+        print(f"  export {key}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+CPU Çekirdek Bütçesi - eşzamanlı işler arasında thread paylaştırma
+
+Render (MoviePy/ffmpeg), watermark temizleme (LaMa/OpenCV) ve ffmpeg pipe'ları
+aynı anda çalışınca her biri tüm çekirdekleri kullanmaya çalışır. Bütçe, çalışan
+iş birimlerine göre her işe thread sayısı (ve opsiyonel olarak ayrık çekirdek
+kümeleri) verir:
+
+    with get_budget().job("render") as job:
+        clip.write_videofile(..., threads=job.threads)
+
+    threads = current_threads()   # ffmpeg -threads, cv2 / torch için
+
+Süreç havuzları (cleaning_pool) iş başına `units` = worker sayısı ister, her
+worker sürecinde configure_process() çağrılır.
+"""
+import os
+import sys
+import logging
+import threading
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+from config import RESOURCE_BUDGET
+
+logger = logging.getLogger(__name__)
+
+_budget = None
+_budget_lock = threading.Lock()
+_local = threading.local()
+_process_threads = None  # configure_process ile worker süreçlerinde ayarlanır
+
+
+def available_cores() -> List[int]:
+    """Bu sürecin kullanabileceği çekirdekler"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def set_library_threads(threads: int):
+    """OpenCV ve (yüklüyse) torch thread havuzlarını ayarla - süreç genelinde geçerli"""
+    try:
+        import cv2
+        cv2.setNumThreads(threads)
+    except ImportError:
+        pass
+    # torch'u sadece thread için import etme (yavaş, opsiyonel bağımlılık)
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+
+
+def configure_process(threads: int, cores: Optional[Tuple[int, ...]] = None):
+    """
+    Worker süreci başlangıcı: thread sayısını sabitle, istenirse çekirdeklere sabitle
+
+    Args:
+        threads: Bu süreçteki kütüphane / ffmpeg thread sayısı
+        cores: Süreç (ve başlattığı ffmpeg'ler) bu çekirdeklerle sınırlanır
+    """
+    global _process_threads
+    _process_threads = threads
+    set_library_threads(threads)
+
+    from config import LAMA_SETTINGS
+    if not LAMA_SETTINGS["intra_op_threads"]:
+        LAMA_SETTINGS["intra_op_threads"] = threads
+
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+
+
+class Allocation:
+    """Bir işe verilen pay"""
+
+    def __init__(self, name: str, units: int, threads: int, core_sets: Optional[List[Tuple[int, ...]]]):
+        self.name = name
+        self.units = units
+        self.threads = threads          # Birim (worker) başına thread
+        self.core_sets = core_sets      # Birim başına çekirdek kümesi (pinning kapalıysa None)
+
+    @property
+    def cores(self) -> Optional[Tuple[int, ...]]:
+        """Tek birimlik işin çekirdekleri"""
+        return self.core_sets[0] if self.core_sets else None
+
+
+class ResourceBudget:
+    """Süreç içindeki işlerin çekirdek muhasebesi"""
+
+    def __init__(self, cores: Optional[int] = None, pin: Optional[bool] = None):
+        """
+        Args:
+            cores: Toplam çekirdek (None = config / kullanılabilir çekirdekler)
+            pin: İşleri ayrık çekirdek kümelerine sabitle (None = config)
+        """
+        core_ids = available_cores()
+        cores = cores or RESOURCE_BUDGET["cores"] or len(core_ids)
+        self.core_ids = core_ids[:cores] if cores <= len(core_ids) else core_ids
+        self.cores = cores
+        self.pin = (RESOURCE_BUDGET["pin_cores"] if pin is None else pin) and hasattr(os, "sched_setaffinity")
+        self._jobs: List[Allocation] = []
+        self._lock = threading.Lock()
+
+    def _units(self) -> int:
+        return sum(job.units for job in self._jobs)
+
+    def fair_share(self) -> int:
+        """Şu an çalışan birim başına düşen thread"""
+        with self._lock:
+            return max(1, self.cores // max(1, self._units()))
+
+    def acquire(self, name: str, units: int = 1) -> Allocation:
+        """
+        Yeni iş için pay al
+
+        Thread sayısı iş başlarken çalışan birimlere göre belirlenir; çalışan
+        işlerin payı geriye dönük değişmez (süreç içi OpenCV/torch havuzları hariç).
+        """
+        with self._lock:
+            total_units = self._units() + units
+            threads = max(1, self.cores // total_units)
+            core_sets = self._pick_cores(units, threads) if self.pin else None
+            allocation = Allocation(name, units, threads, core_sets)
+            self._jobs.append(allocation)
+            self._rebalance()
+
+        logger.info(f"Çekirdek bütçesi: {name} -> {units} x {threads} thread "
+                    f"(çalışan birim: {total_units}, çekirdek: {self.cores})")
+        return allocation
+
+    def release(self, allocation: Allocation):
+        with self._lock:
+            if allocation in self._jobs:
+                self._jobs.remove(allocation)
+            self._rebalance()
+
+    @contextmanager
+    def job(self, name: str, units: int = 1):
+        """İş süresince pay al; current_threads() bu thread'de payı döndürür"""
+        allocation = self.acquire(name, units)
+        previous = getattr(_local, "allocation", None)
+        _local.allocation = allocation
+        try:
+            yield allocation
+        finally:
+            _local.allocation = previous
+            self.release(allocation)
+
+    def _pick_cores(self, units: int, threads: int) -> List[Tuple[int, ...]]:
+        """Diğer işlerin kullanmadığı çekirdeklerden birim başına küme (yetmezse paylaşılır)"""
+        used = {core for job in self._jobs if job.core_sets for cores in job.core_sets for core in cores}
+        free = [core for core in self.core_ids if core not in used]
+        ordered = free + [core for core in self.core_ids if core in used]
+        return [tuple(ordered[(i * threads + k) % len(ordered)] for k in range(threads)) for i in range(units)]
+
+    def _rebalance(self):
+        # Bu süreçteki OpenCV/torch havuzları tüm süreç için ortaktır: güncel adil paya çek
+        set_library_threads(max(1, self.cores // max(1, self._units())))
+
+
+def get_budget() -> ResourceBudget:
+    """Süreç genelinde tek bütçe"""
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            _budget = ResourceBudget()
+        return _budget
+
+
+def current_threads() -> int:
+    """Çağıran iş için thread sayısı (ffmpeg -threads, MoviePy vb.)"""
+    allocation = getattr(_local, "allocation", None)
+    if allocation is not None:
+        return allocation.threads
+    if _process_threads is not None:
+        return _process_threads
+    return get_budget().fair_share()
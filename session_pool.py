@@ -0,0 +1,180 @@
+"""
+Sıcak tarayıcı oturum havuzu - işler tarayıcı açılışını / Gemini yüklenmesini beklemesin
+
+Her iş start_browser + navigate_to_gemini ile başlıyordu (15s sayfa yükleme +
+sabit beklemeler). Havuz, app.py açılırken kotası kalan hesapların tarayıcılarını
+sırayla açar ve Gemini'de boşta bekletir. Arka plan thread'i düzenli aralıklarla:
+
+    - tarayıcı ölmüşse kapatıp yeniden açar (recycle),
+    - Gemini dışına çıkmışsa tekrar Gemini'ye götürür,
+    - Google girişi isteniyorsa durumu "login_required" olarak işaretler.
+
+Havuz aynı anda tek hesabı sürer ve lease varken yeni hesap almaz; lease sadece
+o an sürülen hesabın bitmesini bekler. Kullanımdaki (lease) hesaplara dokunulmaz.
+
+Kullanım:
+    pool = SessionPool(manager).start()
+    with pool.lease():                 # ısınma bitene kadar bekler, sağlık kontrolünü durdurur
+        shorts_mode.create_daily_project(...)
+    pool.status()                      # {"1": {"state": "ready", ...}, ...}
+"""
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+from config import GEMINI_HOST, SESSION_POOL
+
+logger = logging.getLogger(__name__)
+
+# Hesap durumları
+COLD = "cold"
+WARMING = "warming"
+CHECKING = "checking"
+READY = "ready"
+LOGIN_REQUIRED = "login_required"
+FAILED = "failed"
+BUSY = "busy"
+
+
+class SessionPool:
+    """GeminiProManager hesaplarının tarayıcılarını açık ve Gemini'de hazır tutar"""
+
+    def __init__(self, manager, health_interval: float = None):
+        self.manager = manager
+        self.health_interval = health_interval or SESSION_POOL["health_interval"]
+        self._states: Dict[int, Dict[str, Any]] = {
+            account.account_id: {"state": COLD, "checked_at": None, "recycled": 0}
+            for account in manager.accounts
+        }
+        self._leases = 0
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> "SessionPool":
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="session-pool")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    @contextmanager
+    def lease(self, timeout: float = None):
+        """
+        İş süresince hesapları havuzdan al
+
+        Lease alındıktan sonra havuz yeni hesap sürmez; o an ısıtılan / kontrol
+        edilen hesap bitene kadar (en fazla timeout) beklenir. Böylece iş, havuz
+        thread'inin kullandığı bir tarayıcıyla hiçbir zaman yarışmaz. Havuzun hiç
+        almadığı (cold) hesapları iş kendisi açar. Lease süresince sağlık kontrolü yapılmaz.
+
+        Args:
+            timeout: Sürülen hesap için en fazla bekleme (saniye, varsayılan SESSION_POOL["warm_timeout"])
+
+        Yields:
+            Hazır (READY) hesapların listesi
+
+        Raises:
+            TimeoutError: Havuz süre dolduğunda hâlâ bir hesabı sürüyorsa
+        """
+        deadline = time.time() + (timeout if timeout is not None else SESSION_POOL["warm_timeout"])
+        with self._cond:
+            self._leases += 1
+            while any(s["state"] in (WARMING, CHECKING) for s in self._states.values()) and not self._stop.is_set():
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    self._leases -= 1
+                    self._cond.notify_all()
+                    busy = [str(i) for i, s in self._states.items() if s["state"] in (WARMING, CHECKING)]
+                    raise TimeoutError(f"Oturum havuzu hesap {', '.join(busy)} hazırlığını bitiremedi")
+                self._cond.wait(remaining)
+            ready = [a for a in self.manager.accounts if self._states[a.account_id]["state"] == READY]
+            for account in ready:
+                self._states[account.account_id]["state"] = BUSY
+        try:
+            yield ready
+        finally:
+            with self._cond:
+                self._leases -= 1
+                if not self._leases:
+                    for state in self._states.values():
+                        if state["state"] == BUSY:
+                            state["state"] = READY
+                self._cond.notify_all()
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        with self._cond:
+            return {str(account_id): dict(state) for account_id, state in self._states.items()}
+
+    def _set_state(self, account, state: str):
+        with self._cond:
+            self._states[account.account_id]["state"] = state
+            self._states[account.account_id]["checked_at"] = time.time()
+            self._cond.notify_all()
+
+    def _accounts_with_quota(self) -> List:
+        return self.manager.get_accounts_with_quota()
+
+    def _claim(self, account, state: str) -> bool:
+        """Lease yoksa hesabı havuz thread'ine ayır (lease bu durum bitene kadar bekler)"""
+        with self._cond:
+            if self._leases or self._stop.is_set():
+                return False
+            self._states[account.account_id]["state"] = state
+            return True
+
+    def _run(self):
+        # Önce hepsini ısıt: sırayla ve her hesabı ayrı ayrı al (undetected_chromedriver aynı
+        # anda tek tarayıcı açsın; lease başlarsa kalan hesaplar cold kalır ve iş onları açar)
+        for account in self._accounts_with_quota():
+            if not self._claim(account, WARMING):
+                break
+            self._warm(account)
+
+        while not self._stop.wait(self.health_interval):
+            for account in self._accounts_with_quota():
+                if self._claim(account, CHECKING):
+                    self._check(account)
+
+    def _warm(self, account) -> bool:
+        """Tarayıcıyı (yeniden) aç ve Gemini'ye götür"""
+        self._set_state(account, WARMING)
+        if not account.start_browser() or not account.navigate_to_gemini():
+            # navigate_to_gemini girişi 2 dakika bekler; açık pencerede giriş yapılabilir
+            self._set_state(account, LOGIN_REQUIRED if account.is_browser_alive() else FAILED)
+            logger.warning(f"Oturum havuzu: hesap {account.account_id} hazırlanamadı")
+            return False
+        self._set_state(account, READY)
+        logger.info(f"Oturum havuzu: hesap {account.account_id} hazır")
+        return True
+
+    def _check(self, account):
+        """Sağlık kontrolü: canlılık + giriş; başarısız oturumu yeniden aç"""
+        if not account.is_browser_alive():
+            logger.info(f"Oturum havuzu: hesap {account.account_id} tarayıcısı kapalı, yeniden açılıyor")
+            with self._cond:
+                self._states[account.account_id]["recycled"] += 1
+            self._warm(account)
+            return
+
+        try:
+            current_url = account.driver.current_url
+        except Exception:
+            current_url = ""
+        if "accounts.google" in current_url:
+            self._set_state(account, LOGIN_REQUIRED)
+        elif GEMINI_HOST not in current_url:
+            self._warm(account)
+        else:
+            self._set_state(account, READY)
@@ -0,0 +1,73 @@
+"""
+Sekme bekçisi - DOM büyüklüğü ve JS heap ölçümü
+
+Aynı sekme çok sayıda prompt boyunca kullanıldıkça sohbet üretilen medyayla
+şişer: her medya taraması ve sayfa etkileşimi yavaşlar, renderer belleği büyür.
+Her adımdan sonra sekme ölçülür; eşik aşılırsa çağıran sekmeyi yeniler
+(GeminiProAccount.recycle_tab).
+
+Kullanım:
+    metrics, reason = check_tab(self.driver)
+    if reason:
+        account.recycle_tab()
+"""
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from config import TAB_WATCHDOG
+
+logger = logging.getLogger(__name__)
+
+_SAMPLE_SCRIPT = """
+var memory = window.performance && performance.memory;
+return {
+    dom_nodes: document.getElementsByTagName('*').length,
+    media: document.querySelectorAll('img, video').length,
+    heap_bytes: memory ? memory.usedJSHeapSize : null
+};
+"""
+
+
+def sample_tab(driver) -> Dict[str, Any]:
+    """
+    Aktif sekmenin DOM düğüm sayısı, medya sayısı ve kullanılan JS heap'i (MB)
+
+    performance.memory yoksa (Chrome dışı / kapalı) CDP Runtime.getHeapUsage denenir.
+
+    Returns:
+        {"dom_nodes", "media", "heap_mb"} - okunamayan değerler None
+    """
+    try:
+        sample = driver.execute_script(_SAMPLE_SCRIPT) or {}
+    except Exception as e:
+        logger.debug(f"Sekme ölçümü başarısız: {e}")
+        sample = {}
+
+    heap_bytes = sample.get("heap_bytes")
+    if heap_bytes is None:
+        try:
+            heap_bytes = driver.execute_cdp_cmd("Runtime.getHeapUsage", {}).get("usedSize")
+        except Exception:
+            heap_bytes = None
+
+    return {
+        "dom_nodes": sample.get("dom_nodes"),
+        "media": sample.get("media"),
+        "heap_mb": round(heap_bytes / (1024 * 1024), 1) if heap_bytes else None,
+    }
+
+
+def check_tab(driver) -> Tuple[Dict[str, Any], Optional[str]]:
+    """
+    Sekmeyi ölç ve TAB_WATCHDOG eşikleriyle karşılaştır
+
+    Returns:
+        (ölçüm, yenileme nedeni veya None)
+    """
+    metrics = sample_tab(driver)
+    reason = None
+    if metrics["dom_nodes"] and metrics["dom_nodes"] > TAB_WATCHDOG["max_dom_nodes"]:
+        reason = f"DOM {metrics['dom_nodes']} düğüm > {TAB_WATCHDOG['max_dom_nodes']}"
+    elif metrics["heap_mb"] and metrics["heap_mb"] > TAB_WATCHDOG["max_heap_mb"]:
+        reason = f"JS heap {metrics['heap_mb']} MB > {TAB_WATCHDOG['max_heap_mb']} MB"
+    return metrics, reason
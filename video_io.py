@@ -0,0 +1,332 @@
+"""
+Video I/O - FFmpeg pipe ile frame okuma/yazma
+Frameler ara dosya olmadan ffmpeg süreçlerine stdin/stdout üzerinden raw BGR olarak aktarılır
+"""
+import os
+import shutil
+import subprocess
+import logging
+from typing import Optional, Tuple, Iterator
+
+import cv2
+import numpy as np
+
+from resource_budget import current_threads
+
+logger = logging.getLogger(__name__)
+
+
+def ffmpeg_available() -> bool:
+    """Sistemde ffmpeg var mı"""
+    return shutil.which("ffmpeg") is not None
+
+
+def probe_video(path: str) -> Tuple[int, int, float, int]:
+    """Video boyutu, fps ve frame sayısını döndür (width, height, fps, frame_count)"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Video açılamadı: {path}")
+    try:
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        cap.release()
+    return width, height, fps, frame_count
+
+
+def iter_capture(cap) -> Iterator[np.ndarray]:
+    """cv2.VideoCapture'dan frameleri sırayla döndür ve sonunda kapat"""
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
+    finally:
+        cap.release()
+
+
+def open_frame_source(path: str, crop: Optional[Tuple[int, int, int, int]] = None) -> Iterator[np.ndarray]:
+    """
+    Frameleri akış halinde oku - ffmpeg varsa FFmpegFrameReader, yoksa OpenCV
+
+    crop=(x, y, w, h) verilirse sadece o bölge döndürülür (OpenCV'de frame'den kesilir).
+    """
+    if ffmpeg_available():
+        return iter(FFmpegFrameReader(path, crop=crop))
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Video açılamadı: {path}")
+    if crop is None:
+        return iter_capture(cap)
+    x, y, w, h = crop
+    return (frame[y:y + h, x:x + w] for frame in iter_capture(cap))
+
+
+def align_crop(x1: int, y1: int, x2: int, y2: int, width: int, height: int) -> Tuple[int, int, int, int]:
+    """
+    Bölgeyi çift koordinatlara genişlet (yuv420p chroma hizası için)
+
+    Returns:
+        (x, y, w, h) - frame sınırları içinde, hepsi çift sayı
+    """
+    x1 = max(0, x1 - x1 % 2)
+    y1 = max(0, y1 - y1 % 2)
+    x2 = min(width - width % 2, x2 + x2 % 2)
+    y2 = min(height - height % 2, y2 + y2 % 2)
+    return x1, y1, x2 - x1, y2 - y1
+
+
+class FFmpegFrameReader:
+    """
+    ffmpeg ile frameleri raw BGR olarak oku - opsiyonel `crop` filtresi ile
+
+    crop=(x, y, w, h) verilirse sadece o bölge decode edilip Python'a aktarılır.
+
+    Kullanım:
+        with FFmpegFrameReader(input_path, crop=(x, y, w, h)) as reader:
+            for patch in reader:
+                ...
+    """
+
+    def __init__(self, path: str, crop: Optional[Tuple[int, int, int, int]] = None):
+        self.path = path
+        self.crop = crop
+        self.width, self.height, self.fps, self.frame_count = probe_video(path)
+        if crop:
+            self.out_width, self.out_height = crop[2], crop[3]
+        else:
+            self.out_width, self.out_height = self.width, self.height
+        self._process = None
+
+    def _build_command(self) -> list:
+        cmd = ['ffmpeg', '-loglevel', 'error', '-threads', str(current_threads()), '-i', self.path]
+        if self.crop:
+            x, y, w, h = self.crop
+            cmd += ['-vf', f'crop={w}:{h}:{x}:{y}']
+        cmd += ['-f', 'rawvideo', '-pix_fmt', 'bgr24', '-']
+        return cmd
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        if not ffmpeg_available():
+            raise RuntimeError("ffmpeg bulunamadı")
+
+        frame_size = self.out_width * self.out_height * 3
+        self._process = subprocess.Popen(
+            self._build_command(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=frame_size
+        )
+        try:
+            while True:
+                data = self._process.stdout.read(frame_size)
+                if len(data) < frame_size:
+                    break
+                yield np.frombuffer(data, dtype=np.uint8).reshape(self.out_height, self.out_width, 3).copy()
+        finally:
+            self.close()
+
+    def close(self):
+        if self._process is not None:
+            process, self._process = self._process, None
+            process.stdout.close()
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class FFmpegFrameWriter:
+    """
+    Raw BGR frameleri tek bir ffmpeg sürecine yazar
+
+    Video bir kez H.264 olarak encode edilir, kaynak videodaki ses (varsa)
+    yeniden encode edilmeden `-map` ile kopyalanır.
+
+    Kullanım:
+        with FFmpegFrameWriter(output_path, width, height, fps, audio_source=input_path) as writer:
+            writer.write(frame)
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        width: int,
+        height: int,
+        fps: float,
+        audio_source: Optional[str] = None,
+        preset: str = "medium",
+        crf: int = 18
+    ):
+        self.output_path = output_path
+        self.width = width
+        self.height = height
+        self.fps = fps or 30
+        self.audio_source = audio_source
+        self.preset = preset
+        self.crf = crf
+        self.frame_count = 0
+        self._process = None
+        self._fallback = None
+        self._open()
+
+    def _build_command(self) -> list:
+        cmd = [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+            '-s', f'{self.width}x{self.height}', '-r', f'{self.fps}',
+            '-i', '-',
+        ]
+
+        if self.audio_source:
+            cmd += ['-i', self.audio_source, '-map', '0:v:0', '-map', '1:a:0?', '-c:a', 'copy', '-shortest']
+
+        cmd += [
+            '-c:v', 'libx264', '-preset', self.preset, '-crf', str(self.crf),
+            '-threads', str(current_threads()),
+            '-pix_fmt', 'yuv420p',
+            '-movflags', '+faststart',
+            self.output_path
+        ]
+        return cmd
+
+    def _open(self):
+        if not ffmpeg_available():
+            # ffmpeg yoksa OpenCV ile doğrudan çıktıya yaz (ses olmadan)
+            logger.warning("ffmpeg bulunamadı, OpenCV VideoWriter (mp4v) kullanılıyor - ses kopyalanmayacak")
+            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+            self._fallback = cv2.VideoWriter(self.output_path, fourcc, self.fps, (self.width, self.height))
+            return
+
+        self._process = subprocess.Popen(
+            self._build_command(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+
+    def write(self, frame: np.ndarray):
+        """Tek bir BGR frame yaz"""
+        if self._fallback is not None:
+            self._fallback.write(frame)
+        else:
+            try:
+                self._process.stdin.write(np.ascontiguousarray(frame, dtype=np.uint8).tobytes())
+            except BrokenPipeError:
+                raise RuntimeError(f"ffmpeg beklenmedik şekilde kapandı: {self._read_error()}")
+        self.frame_count += 1
+
+    def _read_error(self) -> str:
+        try:
+            return self._process.stderr.read().decode(errors="ignore").strip()
+        except Exception:
+            return ""
+
+    def close(self) -> bool:
+        """Yazmayı bitir ve ffmpeg'in çıkmasını bekle"""
+        if self._fallback is not None:
+            self._fallback.release()
+            self._fallback = None
+            return os.path.exists(self.output_path)
+
+        if self._process is None:
+            return os.path.exists(self.output_path)
+
+        process, self._process = self._process, None
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+
+        stderr = process.stderr.read().decode(errors="ignore").strip()
+        process.stderr.close()
+        returncode = process.wait()
+
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg encode hatası ({returncode}): {stderr}")
+        return True
+
+    def abort(self):
+        """Hata durumunda süreci öldür ve yarım çıktıyı sil"""
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+            self._process = None
+        if self._fallback is not None:
+            self._fallback.release()
+            self._fallback = None
+        if os.path.exists(self.output_path):
+            os.unlink(self.output_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+            return False
+        self.close()
+        return False
+
+
+class FFmpegPatchOverlayWriter(FFmpegFrameWriter):
+    """
+    Sadece temizlenmiş patch'leri yaz; ffmpeg bunları orijinal videonun üzerine bindirir
+
+    Orijinal video ve sesi ffmpeg tarafından okunur, patch akışı (x, y) konumuna
+    `overlay` ile yerleştirilir ve tek seferde H.264 encode edilir.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        source_path: str,
+        x: int,
+        y: int,
+        patch_width: int,
+        patch_height: int,
+        fps: float,
+        preset: str = "medium",
+        crf: int = 18
+    ):
+        self.source_path = source_path
+        self.x = x
+        self.y = y
+        super().__init__(output_path, patch_width, patch_height, fps, preset=preset, crf=crf)
+
+    def _build_command(self) -> list:
+        overlay = (
+            "[0:v]setpts=PTS-STARTPTS[base];"
+            "[1:v]setpts=PTS-STARTPTS[patch];"
+            f"[base][patch]overlay={self.x}:{self.y}:eof_action=pass[v]"
+        )
+        return [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-i', self.source_path,
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+            '-s', f'{self.width}x{self.height}', '-r', f'{self.fps}',
+            '-i', '-',
+            '-filter_complex', overlay,
+            '-map', '[v]', '-map', '0:a:0?', '-c:a', 'copy',
+            '-fps_mode', 'passthrough',
+            '-c:v', 'libx264', '-preset', self.preset, '-crf', str(self.crf),
+            '-threads', str(current_threads()),
+            '-pix_fmt', 'yuv420p',
+            '-movflags', '+faststart',
+            self.output_path
+        ]
+
+    def _open(self):
+        if not ffmpeg_available():
+            raise RuntimeError("Patch modu için ffmpeg gerekli")
+        super()._open()
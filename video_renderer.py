@@ -19,6 +19,7 @@ from moviepy import (
 )
 
 import config
+from resource_budget import get_budget
 
 logger = logging.getLogger(__name__)
 
@@ -225,14 +226,16 @@ class VideoRenderer:
             # Videoları birleştir
             final_clip = concatenate_videoclips(clips, method="compose")
 
-            # Geçici dosyaya kaydet
-            final_clip.write_videofile(
-                output_path,
-                codec="libx264",
-                audio_codec="aac",
-                fps=30,
-                logger=None  # MoviePy loglarını kapat
-            )
+            # Geçici dosyaya kaydet (thread sayısı çalışan diğer işlerle paylaşılır)
+            with get_budget().job("concat") as job:
+                final_clip.write_videofile(
+                    output_path,
+                    codec="libx264",
+                    audio_codec="aac",
+                    fps=30,
+                    threads=job.threads,
+                    logger=None  # MoviePy loglarını kapat
+                )
 
             # Klipleri kapat
             for clip in clips:
@@ -380,14 +383,15 @@ class VideoRenderer:
 
             final_output = os.path.join(self.output_dir, f"final_video_{datetime.now().strftime('%H%M%S')}.mp4")
 
-            final_clip.write_videofile(
-                final_output,
-                codec="libx264",
-                audio_codec="aac",
-                fps=30,
-                threads=4,
-                logger=None
-            )
+            with get_budget().job("render") as job:
+                final_clip.write_videofile(
+                    final_output,
+                    codec="libx264",
+                    audio_codec="aac",
+                    fps=30,
+                    threads=job.threads,
+                    logger=None
+                )
 
             # Temizlik
             for clip in clips:
@@ -3,32 +3,138 @@ Video Watermark Remover - Temporal Inpainting
 Video hareketinden yararlanarak watermark altındaki orijinal pikselleri kurtarır
 """
 import os
+import json
+import tempfile
 import cv2
 import numpy as np
 import logging
-import tempfile
-import shutil
-from typing import Tuple, List
+from typing import Callable, Optional, Tuple, List
 from collections import deque
+from functools import lru_cache
+
+from config import VIDEO_METHOD_POLICY, WATERMARK_BENCH_FILE
+from watermark_geometry import bbox_to_region, get_watermark_bbox
+from video_io import FFmpegFrameWriter, FFmpegPatchOverlayWriter, align_crop, open_frame_source
 
 logger = logging.getLogger(__name__)
 
 
+def _watermark_roi(input_path: str, width: int, height: int,
+                   watermark_region: Optional[Tuple[float, float, float, float]] = None,
+                   padding: int = 16) -> Tuple[int, int, int, int]:
+    """
+    Watermark ROI'si (x1, y1, x2, y2)
+
+    watermark_region (oransal) verilmişse ondan, yoksa Veo geometri kaydından
+    (ilk kez görülen çözünürlükte framelerden bulunur) padding ile hesaplanır.
+    """
+    if watermark_region is not None:
+        return (
+            int(width * watermark_region[0]),
+            int(height * watermark_region[1]),
+            int(width * watermark_region[2]),
+            int(height * watermark_region[3]),
+        )
+    bbox = get_watermark_bbox("veo", width, height, video_path=input_path)
+    return bbox_to_region(bbox, width, height, padding)
+
+
+@lru_cache(maxsize=16)
+def _edge_blend_mask(height: int, width: int, fade: int, ksize: int) -> np.ndarray:
+    """
+    Üst ve sol kenarda `fade` piksel boyunca 0'dan 1'e yükselen blend mask'ı (H, W, 1)
+
+    ROI geometrisi başına bir kez hesaplanır.
+    """
+    ramp_y = np.minimum(np.arange(height, dtype=np.float32) / fade, 1.0)
+    ramp_x = np.minimum(np.arange(width, dtype=np.float32) / fade, 1.0)
+    blend_mask = cv2.GaussianBlur(ramp_y[:, None] * ramp_x[None, :], (ksize, ksize), 0)
+    blend_mask = blend_mask[..., None]
+    blend_mask.flags.writeable = False
+    return blend_mask
+
+
+@lru_cache(maxsize=16)
+def _lowpass_filter(height: int, width: int) -> np.ndarray:
+    """
+    rfft2 düzeninde (ortalanmamış) Gaussian low-pass filtresi (H, W // 2 + 1, 1)
+
+    fftshift edilmiş spektrumda merkeze uzaklığa göre tanımlı filtrenin aynısıdır.
+    """
+    sigma = min(height, width) // 4
+    fy = np.fft.fftfreq(height) * height
+    fx = np.fft.rfftfreq(width) * width
+    dist_sq = fy[:, None] ** 2 + fx[None, :] ** 2
+    lowpass = np.exp(-dist_sq / (2 * sigma ** 2)).astype(np.float32)[..., None]
+    lowpass.flags.writeable = False
+    return lowpass
+
+
+def _temporal_statistics(stack: np.ndarray, percentile: float = 15, band_rows: int = 32) -> tuple:
+    """
+    ROI stack'i (T, H, W, C) için percentile, median ve standart sapma
+
+    Her satır bandı için tek bir np.partition çağrısı percentile ve median'ın
+    ihtiyaç duyduğu sıra istatistiklerini birlikte üretir (np.percentile ile aynı
+    lineer interpolasyon). Std aynı bant üzerinden toplam / kare toplamıyla
+    hesaplanır. Bant bant çalıştığı için memmap stack tamamen belleğe alınmaz.
+
+    Returns:
+        (percentile, median, std) - float64 (H, W, C)
+    """
+    count = stack.shape[0]
+
+    def ranks(q):
+        position = q / 100 * (count - 1)
+        low = int(np.floor(position))
+        return low, min(low + 1, count - 1), position - low
+
+    p_lo, p_hi, p_frac = ranks(percentile)
+    m_lo, m_hi, m_frac = ranks(50)
+    kth = sorted({p_lo, p_hi, m_lo, m_hi})
+
+    shape = stack.shape[1:]
+    low_values = np.empty(shape, dtype=np.float64)
+    median_values = np.empty(shape, dtype=np.float64)
+    std_values = np.empty(shape, dtype=np.float64)
+
+    for r0 in range(0, shape[0], band_rows):
+        band = np.asarray(stack[:, r0:r0 + band_rows])
+        ordered = np.partition(band, kth, axis=0).astype(np.float64)
+
+        low_values[r0:r0 + band_rows] = ordered[p_lo] + (ordered[p_hi] - ordered[p_lo]) * p_frac
+        median_values[r0:r0 + band_rows] = ordered[m_lo] + (ordered[m_hi] - ordered[m_lo]) * m_frac
+
+        mean = ordered.mean(axis=0)
+        std_values[r0:r0 + band_rows] = np.sqrt(np.maximum((ordered ** 2).mean(axis=0) - mean ** 2, 0))
+
+    return low_values, median_values, std_values
+
+
 def remove_video_watermark_temporal(
     input_path: str,
     output_path: str,
-    watermark_region: Tuple[float, float, float, float] = (0.85, 0.88, 1.0, 1.0),
-    buffer_size: int = 30
+    watermark_region: Optional[Tuple[float, float, float, float]] = None,
+    buffer_size: int = 30,
+    patch_only: bool = False,
+    use_memmap: bool = False
 ) -> bool:
     """
     Temporal Inpainting - video hareketinden yararlanarak watermark'ı kaldır
 
     Nasıl çalışır:
-    1. Birden fazla frame'i hafızada tut
-    2. Her frame için watermark bölgesindeki piksellerin ne olması gerektiğini
-       diğer frame'lerden hesapla (optik akış ile)
-    3. En uygun pikselleri seç ve blend et
+    1. Birinci geçiş: sadece watermark bölgesini decode et ve ROI stack'inde tut
+    2. Her piksel için temporal istatistiklerden (percentile / median) temiz bölgeyi hesapla
+    3. İkinci geçiş: videoyu tekrar decode et, frameleri tek tek blend edip yaz
+
+    Bellekte tam frameler yerine sadece ROI stack'i tutulur.
+
+    patch_only=True ise sadece watermark bölgesi decode edilir ve temizlenmiş
+    patch'ler ffmpeg overlay ile orijinal videonun üzerine bindirilir.
+    use_memmap=True ise ROI stack'i geçici bir dosyada (np.memmap) tutulur.
+    watermark_region verilmezse bölge çözünürlüğe göre geometri kaydından alınır.
     """
+    roi_file = None
     try:
         cap = cv2.VideoCapture(input_path)
         if not cap.isOpened():
@@ -39,107 +145,109 @@ def remove_video_watermark_temporal(
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         fps = cap.get(cv2.CAP_PROP_FPS)
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
 
         logger.info(f"Video: {width}x{height}, {fps}fps, {total_frames} frames")
 
         # Watermark bölgesi
-        x1 = int(width * watermark_region[0])
-        y1 = int(height * watermark_region[1])
-        x2 = int(width * watermark_region[2])
-        y2 = int(height * watermark_region[3])
+        x1, y1, x2, y2 = _watermark_roi(input_path, width, height, watermark_region)
 
-        wm_width = x2 - x1
-        wm_height = y2 - y1
+        if patch_only:
+            x1, y1, wm_width, wm_height = align_crop(x1, y1, x2, y2, width, height)
+            x2, y2 = x1 + wm_width, y1 + wm_height
+        else:
+            wm_width = x2 - x1
+            wm_height = y2 - y1
 
         logger.info(f"Watermark: ({x1},{y1}) - ({x2},{y2})")
 
-        # İlk geçiş: Tüm frame'leri oku ve watermark olmayan referans bölgeleri topla
+        # Birinci geçiş: sadece ROI decode edilir (crop çift koordinatlara hizalı)
         logger.info("İlk geçiş: Referans pikseller toplanıyor...")
-
-        frames = []
-        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            frames.append(frame)
-
-        cap.release()
-
-        if len(frames) == 0:
+        cx, cy, cw, ch = align_crop(x1, y1, x2, y2, width, height)
+        ox, oy = x1 - cx, y1 - cy
+
+        rois = []
+        frame_count = 0
+        if use_memmap:
+            roi_file = tempfile.NamedTemporaryFile(suffix=".roi", delete=False)
+
+        for patch in open_frame_source(input_path, crop=(cx, cy, cw, ch)):
+            roi = np.ascontiguousarray(patch[oy:oy + wm_height, ox:ox + wm_width])
+            if roi_file is not None:
+                roi_file.write(roi.tobytes())
+            else:
+                rois.append(roi)
+            frame_count += 1
+
+        if frame_count == 0:
             logger.error("Frame okunamadı")
             return False
 
-        # Her piksel için en iyi değeri bul (median filter temporal)
-        logger.info("Temporal median hesaplanıyor...")
+        if roi_file is not None:
+            roi_file.close()
+            wm_stack = np.memmap(roi_file.name, dtype=np.uint8, mode='r',
+                                 shape=(frame_count, wm_height, wm_width, 3))
+        else:
+            wm_stack = np.stack(rois)
+            del rois
 
-        # Watermark bölgesi için temporal stack oluştur
-        wm_stack = np.array([f[y1:y2, x1:x2] for f in frames])
+        logger.info(f"ROI stack: {wm_stack.shape} ({wm_stack.nbytes / 1e6:.1f} MB)")
+
+        # Her piksel için en iyi değeri bul (median filter temporal)
+        logger.info("Temporal istatistikler hesaplanıyor...")
 
         # Watermark genellikle açık renkli (beyaz/gri) olduğundan
         # Her piksel için en koyu değerleri tercih et
         # Bu watermark'ın etkisini minimize eder
-
-        # Yöntem 1: Her piksel için percentile (watermark'ı atla)
-        # Watermark açık renkli olduğundan düşük percentile kullan
+        # Percentile, median ve std tek bir partition geçişinden
         percentile_value = 15  # En koyu %15'lik dilim
+        low_values, median_values, std_values = _temporal_statistics(wm_stack, percentile_value)
 
-        clean_wm_region = np.percentile(wm_stack, percentile_value, axis=0).astype(np.uint8)
+        clean_wm_region = low_values.astype(np.uint8)
 
-        # Yöntem 2: Daha akıllı - hareket eden bölgelerde median, sabit bölgelerde percentile
-        # Standart sapma hesapla - hareket var mı?
-        std_map = np.std(wm_stack, axis=0).mean(axis=2)
+        # Daha akıllı - hareket eden bölgelerde median, sabit bölgelerde percentile
+        # Standart sapma - hareket var mı?
+        std_map = std_values.mean(axis=2)
 
         # Hareket olan yerlerde (std yüksek) median kullan
         # Sabit yerlerde (std düşük, muhtemelen watermark) percentile kullan
         motion_threshold = 20
         motion_mask = std_map > motion_threshold
 
-        median_wm_region = np.median(wm_stack, axis=0).astype(np.uint8)
+        median_wm_region = median_values.astype(np.uint8)
 
         # İkisini birleştir
-        motion_mask_3ch = np.stack([motion_mask, motion_mask, motion_mask], axis=2)
-        clean_wm_region = np.where(motion_mask_3ch, median_wm_region, clean_wm_region)
+        clean_wm_region = np.where(motion_mask[..., None], median_wm_region, clean_wm_region)
 
-        # Kenar yumuşatma için blend mask
-        blend_mask = np.ones((wm_height, wm_width), dtype=np.float32)
+        # Kenar yumuşatma için blend mask - temiz bölgenin katkısı sabit, bir kez hesaplanır
+        blend_3ch = _edge_blend_mask(wm_height, wm_width, 15, 11)
+        clean_part = clean_wm_region.astype(np.float32) * blend_3ch
+        keep_part = 1 - blend_3ch
 
-        # Kenarları yumuşat
-        fade = 15
-        for i in range(fade):
-            factor = i / fade
-            blend_mask[i, :] *= factor  # Üst
-            blend_mask[:, i] *= factor  # Sol
-
-        blend_mask = cv2.GaussianBlur(blend_mask, (11, 11), 0)
-        blend_3ch = np.stack([blend_mask, blend_mask, blend_mask], axis=2)
-
-        # İkinci geçiş: Temizlenmiş frame'leri yaz
+        # İkinci geçiş: videoyu tekrar decode et, temizlenmiş frame'leri yaz
         logger.info("Temizlenmiş video yazılıyor...")
 
-        temp_video = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False).name
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(temp_video, fourcc, fps, (width, height))
-
-        for idx, frame in enumerate(frames):
-            # Orijinal watermark bölgesi
-            original_wm = frame[y1:y2, x1:x2].astype(np.float32)
-
-            # Temizlenmiş bölge ile blend
-            blended = (clean_wm_region.astype(np.float32) * blend_3ch +
-                      original_wm * (1 - blend_3ch))
-
-            frame[y1:y2, x1:x2] = blended.astype(np.uint8)
-            out.write(frame)
+        if patch_only:
+            writer = FFmpegPatchOverlayWriter(output_path, input_path, x1, y1, wm_width, wm_height, fps)
+            frame_source = open_frame_source(input_path, crop=(x1, y1, wm_width, wm_height))
+            roi_x1, roi_y1 = 0, 0
+        else:
+            writer = FFmpegFrameWriter(output_path, width, height, fps, audio_source=input_path)
+            frame_source = open_frame_source(input_path)
+            roi_x1, roi_y1 = x1, y1
+        roi_x2, roi_y2 = roi_x1 + wm_width, roi_y1 + wm_height
 
-            if idx % 50 == 0:
-                logger.info(f"Yazılıyor: {idx}/{len(frames)}")
+        with writer:
+            for idx, frame in enumerate(frame_source):
+                # Orijinal watermark bölgesi ile blend
+                original_wm = frame[roi_y1:roi_y2, roi_x1:roi_x2].astype(np.float32)
+                blended = clean_part + original_wm * keep_part
 
-        out.release()
+                frame[roi_y1:roi_y2, roi_x1:roi_x2] = blended.astype(np.uint8)
+                writer.write(frame)
 
-        # FFmpeg finalize
-        _finalize_video(input_path, temp_video, output_path)
+                if idx % 50 == 0:
+                    logger.info(f"Yazılıyor: {idx}/{frame_count}")
 
         logger.info(f"Temporal inpainting tamamlandı: {output_path}")
         return True
@@ -150,15 +258,25 @@ def remove_video_watermark_temporal(
         traceback.print_exc()
         return False
 
+    finally:
+        if roi_file is not None:
+            roi_file.close()
+            if os.path.exists(roi_file.name):
+                os.unlink(roi_file.name)
+
 
 def remove_video_watermark_frequency(
     input_path: str,
     output_path: str,
-    watermark_region: Tuple[float, float, float, float] = (0.85, 0.88, 1.0, 1.0)
+    watermark_region: Optional[Tuple[float, float, float, float]] = None,
+    patch_only: bool = False
 ) -> bool:
     """
     Frekans domain yöntemi - watermark'ı frekans uzayında filtrele
     Watermark genellikle yüksek frekanslı detay olarak görünür
+
+    patch_only=True ise sadece watermark bölgesi decode edilip işlenir (ffmpeg overlay).
+    watermark_region verilmezse bölge çözünürlüğe göre geometri kaydından alınır.
     """
     try:
         cap = cv2.VideoCapture(input_path)
@@ -169,73 +287,43 @@ def remove_video_watermark_frequency(
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         fps = cap.get(cv2.CAP_PROP_FPS)
 
-        x1 = int(width * watermark_region[0])
-        y1 = int(height * watermark_region[1])
-        x2 = int(width * watermark_region[2])
-        y2 = int(height * watermark_region[3])
-
-        temp_video = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False).name
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(temp_video, fourcc, fps, (width, height))
-
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            # Watermark bölgesini al
-            roi = frame[y1:y2, x1:x2].copy()
-
-            # Her kanal için frekans filtresi
-            filtered_roi = np.zeros_like(roi)
-            for c in range(3):
-                channel = roi[:, :, c].astype(np.float32)
-
-                # DFT
-                dft = cv2.dft(channel, flags=cv2.DFT_COMPLEX_OUTPUT)
-                dft_shift = np.fft.fftshift(dft)
-
-                # Düşük geçiren filtre (watermark yüksek frekans)
-                rows, cols = channel.shape
-                crow, ccol = rows // 2, cols // 2
+        x1, y1, x2, y2 = _watermark_roi(input_path, width, height, watermark_region)
 
-                # Gaussian low-pass filter
-                mask = np.zeros((rows, cols, 2), np.float32)
-                sigma = min(rows, cols) // 4
-                for i in range(rows):
-                    for j in range(cols):
-                        dist = np.sqrt((i - crow) ** 2 + (j - ccol) ** 2)
-                        mask[i, j] = np.exp(-(dist ** 2) / (2 * sigma ** 2))
-
-                # Filtre uygula
-                fshift = dft_shift * mask
-
-                # Inverse DFT
-                f_ishift = np.fft.ifftshift(fshift)
-                img_back = cv2.idft(f_ishift)
-                img_back = cv2.magnitude(img_back[:, :, 0], img_back[:, :, 1])
-
-                filtered_roi[:, :, c] = np.clip(img_back, 0, 255).astype(np.uint8)
+        if patch_only:
+            cap.release()
+            x1, y1, w, h = align_crop(x1, y1, x2, y2, width, height)
+            x2, y2 = x1 + w, y1 + h
+            frame_source = open_frame_source(input_path, crop=(x1, y1, w, h))
+            writer = FFmpegPatchOverlayWriter(output_path, input_path, x1, y1, w, h, fps)
+            roi_x1, roi_y1, roi_x2, roi_y2 = 0, 0, w, h
+        else:
+            cap.release()
+            frame_source = open_frame_source(input_path)
+            writer = FFmpegFrameWriter(output_path, width, height, fps, audio_source=input_path)
+            roi_x1, roi_y1, roi_x2, roi_y2 = x1, y1, x2, y2
 
-            # Yumuşak blend
-            blend_mask = np.ones(roi.shape[:2], dtype=np.float32)
-            fade = 10
-            for i in range(fade):
-                blend_mask[i, :] *= i / fade
-                blend_mask[:, i] *= i / fade
+        # Filtre ve blend mask ROI geometrisi başına bir kez hesaplanır
+        rows, cols = roi_y2 - roi_y1, roi_x2 - roi_x1
+        lowpass = _lowpass_filter(rows, cols)
+        blend_3ch = _edge_blend_mask(rows, cols, 10, 7)
 
-            blend_mask = cv2.GaussianBlur(blend_mask, (7, 7), 0)
-            blend_3ch = np.stack([blend_mask] * 3, axis=2)
+        with writer:
+            for frame in frame_source:
+                # Watermark bölgesini al
+                roi = frame[roi_y1:roi_y2, roi_x1:roi_x2].astype(np.float32)
 
-            result = (filtered_roi * blend_3ch + roi * (1 - blend_3ch)).astype(np.uint8)
-            frame[y1:y2, x1:x2] = result
+                # Üç kanal tek bir real FFT ile (watermark yüksek frekans - low-pass)
+                spectrum = np.fft.rfft2(roi, axes=(0, 1))
+                spectrum *= lowpass
+                filtered_roi = np.fft.irfft2(spectrum, s=(rows, cols), axes=(0, 1))
+                np.clip(filtered_roi, 0, 255, out=filtered_roi)
 
-            out.write(frame)
+                # Yumuşak blend
+                result = filtered_roi * blend_3ch + roi * (1 - blend_3ch)
+                frame[roi_y1:roi_y2, roi_x1:roi_x2] = result.astype(np.uint8)
 
-        cap.release()
-        out.release()
+                writer.write(frame)
 
-        _finalize_video(input_path, temp_video, output_path)
         return True
 
     except Exception as e:
@@ -243,53 +331,55 @@ def remove_video_watermark_frequency(
         return False
 
 
-def _finalize_video(original_path: str, temp_video: str, output_path: str):
-    """FFmpeg ile finalize"""
-    try:
-        import subprocess
-
-        temp_audio = tempfile.NamedTemporaryFile(suffix='.aac', delete=False).name
-        subprocess.run([
-            'ffmpeg', '-y', '-i', original_path,
-            '-vn', '-acodec', 'aac', '-b:a', '128k', temp_audio
-        ], capture_output=True, timeout=60)
-
-        has_audio = os.path.exists(temp_audio) and os.path.getsize(temp_audio) > 1000
-
-        if has_audio:
-            subprocess.run([
-                'ffmpeg', '-y',
-                '-i', temp_video, '-i', temp_audio,
-                '-c:v', 'libx264', '-preset', 'medium', '-crf', '18',
-                '-c:a', 'aac', '-b:a', '128k',
-                '-shortest', '-movflags', '+faststart',
-                output_path
-            ], capture_output=True, timeout=180)
-            os.unlink(temp_audio)
-        else:
-            subprocess.run([
-                'ffmpeg', '-y', '-i', temp_video,
-                '-c:v', 'libx264', '-preset', 'medium', '-crf', '18',
-                '-movflags', '+faststart',
-                output_path
-            ], capture_output=True, timeout=180)
+def remove_video_watermark(input_path: str, output_path: str, method: str = "temporal",
+                           patch_only: bool = False) -> bool:
+    """Ana fonksiyon"""
+    if method == "frequency":
+        return remove_video_watermark_frequency(input_path, output_path, patch_only=patch_only)
+    else:
+        return remove_video_watermark_temporal(input_path, output_path, patch_only=patch_only)
 
-        os.unlink(temp_video)
 
-    except Exception as e:
-        logger.warning(f"FFmpeg başarısız: {e}")
-        shutil.move(temp_video, output_path)
+VIDEO_METHODS = ("lama", "lama-keyframes", "temporal", "frequency")
 
 
-def remove_video_watermark(input_path: str, output_path: str, method: str = "temporal") -> bool:
-    """Ana fonksiyon"""
-    if method == "frequency":
-        return remove_video_watermark_frequency(input_path, output_path)
-    else:
-        return remove_video_watermark_temporal(input_path, output_path)
+def select_video_method() -> str:
+    """
+    remove_veo_watermark'ın varsayılan yöntemi
 
+    config.VIDEO_METHOD_POLICY["method"] "auto" ise watermark_bench.py sonuçlarından
+    frame başına süresi bütçe içinde kalan ve mask içi SSIM'i en yüksek yöntem seçilir.
+    Seçilen yöntem temizlenmemiş "input" satırını geçmeli. Varsayılan yöntemin satırı
+    başarısızsa (ör. benchmark ortamında LaMa yüklenemediyse) sonuç güvenilmez sayılır
+    ve varsayılan yöntem kullanılır.
+    """
+    policy = VIDEO_METHOD_POLICY
+    if policy["method"] != "auto":
+        return policy["method"]
 
-def remove_veo_watermark(input_path: str, output_path: str, use_lama: bool = True) -> bool:
+    try:
+        with open(WATERMARK_BENCH_FILE, "r") as f:
+            results = json.load(f)["video"]
+    except (OSError, ValueError, KeyError):
+        return policy["default"]
+
+    baseline = results.get("input", {})
+    if not baseline.get("ok") or not results.get(policy["default"], {}).get("ok"):
+        return policy["default"]
+
+    candidates = [
+        (row["ssim"], row["psnr"], name)
+        for name, row in results.items()
+        if name in VIDEO_METHODS and row.get("ok") and row["ms_per_frame"] <= policy["max_ms_per_frame"]
+        and row["ssim"] > baseline["ssim"]
+    ]
+    return max(candidates)[2] if candidates else policy["default"]
+
+
+def remove_veo_watermark(input_path: str, output_path: str, use_lama: bool = True,
+                         patch_only: bool = False,
+                         progress_callback: Optional[Callable[[int, int], None]] = None,
+                         method: Optional[str] = None) -> bool:
     """
     Veo/Gemini watermark - LaMa deep learning ile profesyonel temizleme
 
@@ -297,22 +387,31 @@ def remove_veo_watermark(input_path: str, output_path: str, use_lama: bool = Tru
         input_path: Girdi video yolu
         output_path: Çıktı video yolu
         use_lama: True = LaMa deep learning (önerilen), False = temporal inpainting
+        patch_only: Sadece watermark patch'ini decode et/işle, ffmpeg overlay ile birleştir
+        progress_callback: LaMa yolunda (işlenen_frame, toplam_frame) ile çağrılır
+        method: "lama", "lama-keyframes", "temporal" veya "frequency"
+            (None = select_video_method, use_lama=False ise "temporal")
     """
-    if use_lama:
+    if not use_lama:
+        method = "temporal"
+    method = method or select_video_method()
+
+    if method in ("lama", "lama-keyframes"):
         try:
             from lama_video_inpaint import remove_video_watermark_lama
             logger.info("LaMa deep learning ile watermark temizleniyor...")
-            return remove_video_watermark_lama(input_path, output_path)
+            return remove_video_watermark_lama(input_path, output_path, patch_only=patch_only,
+                                               keyframes=method == "lama-keyframes",
+                                               progress_callback=progress_callback)
         except ImportError as e:
             logger.warning(f"LaMa modülü yüklenemedi: {e}, temporal yönteme geçiliyor...")
         except Exception as e:
             logger.warning(f"LaMa hatası: {e}, temporal yönteme geçiliyor...")
+    elif method == "frequency":
+        return remove_video_watermark_frequency(input_path, output_path, patch_only=patch_only)
 
     # Fallback: temporal inpainting
-    return remove_video_watermark_temporal(
-        input_path, output_path,
-        watermark_region=(0.84, 0.87, 1.0, 1.0)
-    )
+    return remove_video_watermark_temporal(input_path, output_path, patch_only=patch_only)
 
 
 def remove_veo_watermark_lama(input_path: str, output_path: str) -> bool:
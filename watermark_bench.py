@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Watermark temizleme kalite/hız benchmark'ı
+Temiz (sentetik veya gerçek) frame'lere bilinen yıldız / "Veo" glyph'ini ekleyip
+her yöntemi çalıştırır ve temiz orijinalle karşılaştırır:
+frame başına süre, tepe bellek (RSS) ve watermark kutusu içinde PSNR / SSIM /
+algısal fark (lpips kuruluysa LPIPS, yoksa GMSD - düşük = iyi)
+
+Video sonuçları config.WATERMARK_BENCH_FILE'a yazılır; remove_veo_watermark
+varsayılan yöntemi buradan seçer (VIDEO_METHOD_POLICY["method"] = "auto").
+
+Kullanım:
+    python watermark_bench.py
+    python watermark_bench.py --video temiz_klip.mp4 --images temiz_gorseller/ --backend onnx
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import multiprocessing
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+import config
+from lama_quant_report import masked_psnr, masked_ssim
+from watermark_geometry import default_bbox
+
+IMAGE_METHODS = ("opencv", "lama")
+VIDEO_METHODS = ("temporal", "frequency", "lama", "lama-keyframes")
+
+
+# ---------------------------------------------------------------------------
+# Ground truth üretimi
+# ---------------------------------------------------------------------------
+
+def synthetic_texture(height: int, width: int, seed: int = 0) -> np.ndarray:
+    """Yumuşak renkli doku + ince detay (BGR uint8)"""
+    rng = np.random.default_rng(seed)
+    coarse = rng.random((height // 32 + 2, width // 32 + 2, 3)).astype(np.float32)
+    fine = rng.random((height // 4, width // 4, 3)).astype(np.float32)
+    image = (0.8 * cv2.resize(coarse, (width, height), interpolation=cv2.INTER_CUBIC) +
+             0.2 * cv2.resize(fine, (width, height), interpolation=cv2.INTER_LINEAR))
+    return (image.clip(0, 1) * 255).astype(np.uint8)
+
+
+def synthetic_clip(height: int, width: int, frames: int, speed: float, seed: int = 0) -> list:
+    """Yatay kayan (speed px/frame) doku klibi"""
+    pan = int(abs(speed) * frames) + 1
+    texture = synthetic_texture(height, width + pan, seed)
+    return [np.ascontiguousarray(texture[:, int(i * speed) % pan:int(i * speed) % pan + width])
+            for i in range(frames)]
+
+
+def read_clip(path: str, max_frames: int) -> list:
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def star_overlay(height: int, width: int) -> tuple:
+    """Gemini yıldızı: (alpha [0, 1] (H, W), bbox)"""
+    from watermark_remover import star_polygon
+
+    bbox = default_bbox("gemini", width, height)
+    x, y, w, h = bbox
+    alpha = np.zeros((height, width), dtype=np.uint8)
+    cv2.fillPoly(alpha, [star_polygon(x + w // 2, y + h // 2, w // 2)], 255)
+    return cv2.GaussianBlur(alpha, (5, 5), 0).astype(np.float32) / 255 * 0.6, bbox
+
+
+def veo_overlay(height: int, width: int) -> tuple:
+    """Veo yazısı: (alpha [0, 1] (H, W), bbox)"""
+    bbox = default_bbox("veo", width, height)
+    x, y, w, h = bbox
+    scale = 1.0
+    (text_w, text_h), baseline = cv2.getTextSize("Veo", cv2.FONT_HERSHEY_SIMPLEX, scale, 2)
+    scale = min((w - 8) / text_w, (h - 8) / (text_h + baseline))
+    (text_w, text_h), baseline = cv2.getTextSize("Veo", cv2.FONT_HERSHEY_SIMPLEX, scale, 2)
+
+    alpha = np.zeros((height, width), dtype=np.uint8)
+    origin = (x + (w - text_w) // 2, y + (h + text_h - baseline) // 2)
+    cv2.putText(alpha, "Veo", origin, cv2.FONT_HERSHEY_SIMPLEX, scale, 255, 2, cv2.LINE_AA)
+    return alpha.astype(np.float32) / 255 * 0.7, bbox
+
+
+def apply_overlay(frame: np.ndarray, alpha: np.ndarray) -> np.ndarray:
+    """Beyaz glyph'i alpha ile karıştır"""
+    alpha = alpha[..., None]
+    return (frame * (1 - alpha) + 255 * alpha).round().astype(np.uint8)
+
+
+def write_clip(path: str, frames: list, fps: float = 24):
+    from video_io import FFmpegFrameWriter
+
+    height, width = frames[0].shape[:2]
+    with FFmpegFrameWriter(path, width, height, fps, crf=17) as writer:
+        for frame in frames:
+            writer.write(frame)
+
+
+# ---------------------------------------------------------------------------
+# Metrikler
+# ---------------------------------------------------------------------------
+
+def _lpips_model():
+    try:
+        import lpips
+        import torch
+    except ImportError:
+        return None
+    return lpips.LPIPS(net="alex", verbose=False), torch
+
+
+def gmsd(reference: np.ndarray, test: np.ndarray) -> float:
+    """Gradient Magnitude Similarity Deviation - (H, W, 3) [0, 1], düşük = benzer"""
+    def gradient(image):
+        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        gx = cv2.Scharr(gray, cv2.CV_32F, 1, 0) / 16
+        gy = cv2.Scharr(gray, cv2.CV_32F, 0, 1) / 16
+        return np.sqrt(gx * gx + gy * gy)
+
+    g_ref, g_test = gradient(reference), gradient(test)
+    c = 0.0026
+    similarity = (2 * g_ref * g_test + c) / (g_ref ** 2 + g_test ** 2 + c)
+    return float(similarity.std())
+
+
+class Scorer:
+    """Kutu içi PSNR / SSIM / algısal fark"""
+
+    def __init__(self):
+        self._lpips = _lpips_model()
+        self.perceptual = "lpips" if self._lpips else "gmsd"
+
+    def _perceptual(self, reference: np.ndarray, test: np.ndarray) -> float:
+        if not self._lpips:
+            return gmsd(reference, test)
+        model, torch = self._lpips
+
+        def tensor(image):
+            return torch.from_numpy(image.transpose(2, 0, 1)[None] * 2 - 1).float()
+
+        with torch.no_grad():
+            return float(model(tensor(reference), tensor(test)))
+
+    def score(self, references: list, tests: list, bbox: tuple, context: int = 16) -> dict:
+        """references/tests: BGR uint8 frame listeleri - bbox + context bölgesi karşılaştırılır"""
+        x, y, w, h = bbox
+        rows = []
+        for reference, test in zip(references, tests):
+            height, width = reference.shape[:2]
+            x1, y1 = max(0, x - context), max(0, y - context)
+            x2, y2 = min(width, x + w + context), min(height, y + h + context)
+            ref = cv2.cvtColor(reference[y1:y2, x1:x2], cv2.COLOR_BGR2RGB).astype(np.float32) / 255
+            out = cv2.cvtColor(test[y1:y2, x1:x2], cv2.COLOR_BGR2RGB).astype(np.float32) / 255
+            region = np.ones(ref.shape[:2], dtype=bool)
+            rows.append((masked_psnr(ref, out, region), masked_ssim(ref, out, region),
+                         self._perceptual(ref, out)))
+
+        psnr, ssim, perceptual = np.array(rows, dtype=np.float64).T
+        return {"psnr": float(np.mean(np.minimum(psnr, 100))), "ssim": float(ssim.mean()),
+                "perceptual": float(perceptual.mean())}
+
+
+# ---------------------------------------------------------------------------
+# Yöntemleri ayrı süreçte çalıştır (tepe bellek yöntem başına ölçülür)
+# ---------------------------------------------------------------------------
+
+def _peak_rss_mb() -> float:
+    # Linux: ru_maxrss fork/exec'te ana süreçten miras kalır, VmHWM exec ile sıfırlanır
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS byte, diğerleri KB döndürür
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def _run_method(kind: str, method: str, input_path: str, output_path: str, work_dir: str,
+                backend: str, results):
+    # Benchmark önbelleği ve kullanıcının geometri kaydını kullanmasın
+    config.INPAINT_CACHE["enabled"] = False
+    import watermark_geometry
+    watermark_geometry.WATERMARK_GEOMETRY_FILE = os.path.join(work_dir, "geometry.json")
+
+    t0 = time.perf_counter()
+    try:
+        if kind == "image":
+            from watermark_remover import remove_watermark, remove_watermark_opencv
+            if method == "opencv":
+                ok = remove_watermark_opencv(input_path, output_path)
+            else:
+                # OpenCV'ye sessizce düşerse satır "lama" olarak ölçülmesin
+                ok = remove_watermark(input_path, output_path, backend=backend, detect=False,
+                                      fallback=False)
+        elif method in ("lama", "lama-keyframes"):
+            from lama_video_inpaint import remove_video_watermark_lama
+            ok = remove_video_watermark_lama(input_path, output_path, backend=backend,
+                                             keyframes=method == "lama-keyframes")
+        else:
+            from video_watermark_remover import remove_video_watermark
+            ok = remove_video_watermark(input_path, output_path, method=method)
+        error = None if ok else "yöntem False döndürdü (ayrıntı süreç çıktısında)"
+    except Exception as e:
+        ok, error = False, str(e)
+    results.put({"ok": bool(ok), "error": error, "seconds": time.perf_counter() - t0,
+                 "peak_mb": _peak_rss_mb()})
+
+
+def run_isolated(kind: str, method: str, input_path: str, output_path: str, work_dir: str,
+                 backend: str = None) -> dict:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_run_method,
+                              args=(kind, method, input_path, output_path, work_dir, backend, results))
+    process.start()
+    process.join()
+    if results.empty():
+        return {"ok": False, "error": f"süreç çıkış kodu {process.exitcode}", "seconds": 0.0, "peak_mb": 0.0}
+    return results.get()
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def _aggregate(rows: list) -> dict:
+    ok_rows = [r for r in rows if r["ok"]]
+    if not ok_rows:
+        return {"ok": False, "error": rows[0].get("error")}
+    return {
+        "ok": True,
+        "ms_per_frame": float(np.mean([r["ms_per_frame"] for r in ok_rows])),
+        "peak_mb": float(max(r["peak_mb"] for r in ok_rows)),
+        "psnr": float(np.mean([r["psnr"] for r in ok_rows])),
+        "ssim": float(np.mean([r["ssim"] for r in ok_rows])),
+        "perceptual": float(np.mean([r["perceptual"] for r in ok_rows])),
+    }
+
+
+def bench_videos(scenes: dict, methods: tuple, work_dir: str, scorer: Scorer, backend: str = None) -> dict:
+    """scenes: {ad: temiz frame listesi}"""
+    per_method = {method: [] for method in ("input",) + methods}
+    for name, clean in scenes.items():
+        height, width = clean[0].shape[:2]
+        alpha, bbox = veo_overlay(height, width)
+        marked_path = os.path.join(work_dir, f"{name}.mp4")
+        write_clip(marked_path, [apply_overlay(frame, alpha) for frame in clean])
+
+        # Referans satırı: hiç temizlenmemiş video
+        baseline = scorer.score(clean, read_clip(marked_path, len(clean)), bbox)
+        per_method["input"].append({"ok": True, "ms_per_frame": 0.0, "peak_mb": 0.0, **baseline})
+
+        for method in methods:
+            output_path = os.path.join(work_dir, f"{name}_{method}.mp4")
+            run = run_isolated("video", method, marked_path, output_path, work_dir, backend)
+            row = {"ok": run["ok"], "error": run["error"], "peak_mb": run["peak_mb"],
+                   "ms_per_frame": 1000 * run["seconds"] / len(clean)}
+            if run["ok"]:
+                output = read_clip(output_path, len(clean))
+                row["ok"] = len(output) == len(clean)
+                if row["ok"]:
+                    row.update(scorer.score(clean, output, bbox))
+            per_method[method].append(row)
+
+    return {method: _aggregate(rows) for method, rows in per_method.items()}
+
+
+def bench_images(images: list, methods: tuple, work_dir: str, scorer: Scorer, backend: str = None) -> dict:
+    per_method = {method: [] for method in ("input",) + methods}
+    for index, clean in enumerate(images):
+        height, width = clean.shape[:2]
+        alpha, bbox = star_overlay(height, width)
+        marked = apply_overlay(clean, alpha)
+        marked_path = os.path.join(work_dir, f"image_{index}.png")
+        cv2.imwrite(marked_path, marked)
+
+        per_method["input"].append({"ok": True, "ms_per_frame": 0.0, "peak_mb": 0.0,
+                                    **scorer.score([clean], [marked], bbox)})
+
+        for method in methods:
+            output_path = os.path.join(work_dir, f"image_{index}_{method}.png")
+            run = run_isolated("image", method, marked_path, output_path, work_dir, backend)
+            row = {"ok": run["ok"], "error": run["error"], "peak_mb": run["peak_mb"],
+                   "ms_per_frame": 1000 * run["seconds"]}
+            output = cv2.imread(output_path) if run["ok"] else None
+            row["ok"] = output is not None
+            if output is not None:
+                row.update(scorer.score([clean], [output], bbox))
+            per_method[method].append(row)
+
+    return {method: _aggregate(rows) for method, rows in per_method.items()}
+
+
+def print_table(title: str, rows: dict, perceptual: str):
+    print(f"\n{title}")
+    print(f"{'Yöntem':>15} | {'ms/frame':>9} | {'Tepe MB':>8} | {'PSNR dB':>8} | {'SSIM':>6} | {perceptual.upper():>6}")
+    for method, row in rows.items():
+        if not row["ok"]:
+            print(f"{method:>15} | başarısız: {row.get('error')}")
+            continue
+        print(f"{method:>15} | {row['ms_per_frame']:>9.1f} | {row['peak_mb']:>8.0f} | "
+              f"{row['psnr']:>8.2f} | {row['ssim']:>6.4f} | {row['perceptual']:>6.4f}")
+
+
+def main(video_path: str = None, images_dir: str = None, frames: int = 48, backend: str = None,
+         output_file: str = None) -> dict:
+    scorer = Scorer()
+
+    if video_path:
+        scenes = {"source": read_clip(video_path, frames)}
+    else:
+        # Dikey 9:16 klip - durağan ve kayan kamera
+        scenes = {"static": synthetic_clip(1280, 720, frames, 0, seed=1),
+                  "pan": synthetic_clip(1280, 720, frames, 4.0, seed=2)}
+
+    if images_dir:
+        names = sorted(f for f in os.listdir(images_dir) if f.lower().endswith((".png", ".jpg", ".jpeg")))
+        images = [img for img in (cv2.imread(os.path.join(images_dir, n)) for n in names[:8]) if img is not None]
+    else:
+        images = [synthetic_texture(1024, 1024, seed) for seed in range(3)]
+
+    with tempfile.TemporaryDirectory(prefix="watermark_bench_") as work_dir:
+        video_rows = bench_videos(scenes, VIDEO_METHODS, work_dir, scorer, backend)
+        image_rows = bench_images(images, IMAGE_METHODS, work_dir, scorer, backend)
+
+    print_table("Video (Veo yazısı)", video_rows, scorer.perceptual)
+    print_table("Görsel (Gemini yıldızı)", image_rows, scorer.perceptual)
+
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "backend": backend or config.LAMA_SETTINGS["backend"],
+        "perceptual_metric": scorer.perceptual,
+        "video": video_rows,
+        "image": image_rows,
+    }
+    if output_file:
+        with open(output_file, "w") as f:
+            json.dump(report, f, indent=2)
+
+        print(f"\nSonuçlar: {output_file}")
+        if os.path.abspath(output_file) == os.path.abspath(config.WATERMARK_BENCH_FILE):
+            from video_watermark_remover import select_video_method
+            print(f"remove_veo_watermark varsayılan yöntemi: {select_video_method()}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watermark temizleme kalite/hız benchmark'ı")
+    parser.add_argument("--video", help="Watermark'sız kaynak video (yoksa sentetik klipler)")
+    parser.add_argument("--images", help="Watermark'sız görsel klasörü (yoksa sentetik)")
+    parser.add_argument("--frames", type=int, default=48, help="Klip başına frame sayısı")
+    parser.add_argument("--backend", help="LaMa backend'i (varsayılan config)")
+    parser.add_argument("--output", default=config.WATERMARK_BENCH_FILE, help="Sonuç JSON dosyası")
+    args = parser.parse_args()
+    main(args.video, args.images, args.frames, args.backend, args.output)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Watermark tespiti regresyon kontrolü
+Sentetik arka planlara desteklenen her boyutta Gemini yıldızı / "Veo" yazısı eklenir;
+detect_watermark glyph'i bulmalı ve dönen kutu glyph'i tamamen kapsamalı, temiz
+köşelerde ise bulmamalı. Eski sabit geometrideki 130 px yıldız da kontrol edilir.
+
+Kullanım:
+    python watermark_detect_check.py          # hata varsa çıkış kodu 1
+"""
+import sys
+
+import cv2
+import numpy as np
+
+from config import WATERMARK_DETECTION
+from watermark_bench import apply_overlay, synthetic_texture, veo_overlay
+from watermark_geometry import default_bbox
+from watermark_remover import detect_watermark, star_polygon
+
+IMAGE_SIZES = ((1024, 1024), (1376, 768), (768, 1376))  # (yükseklik, genişlik)
+VIDEO_SIZES = ((1280, 720), (720, 1280), (1920, 1080), (1080, 1920))
+STAR_SIZES = (16, 24, 32, 48, 64, 100)  # Yarı boyut (px), kenardan 16 px içeride
+STAR_OPACITY = 0.5
+
+
+def backgrounds(height: int, width: int) -> dict:
+    """Dokulu, düz renk geçişli ve şekilli arka planlar"""
+    gradient = np.zeros((height, width, 3), dtype=np.uint8)
+    gradient[..., 0] = np.linspace(40, 160, width, dtype=np.uint8)[None, :]
+    gradient[..., 1] = np.linspace(90, 30, height, dtype=np.uint8)[:, None]
+    gradient[..., 2] = 120
+
+    rng = np.random.default_rng(7)
+    shapes = np.full((height, width, 3), 70, dtype=np.uint8)
+    for _ in range(60):
+        color = tuple(int(v) for v in rng.integers(0, 200, 3))
+        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+        cv2.circle(shapes, (x, y), int(rng.integers(5, 120)), color, -1)
+    shapes = cv2.GaussianBlur(shapes, (0, 0), 3)
+
+    return {"texture": synthetic_texture(height, width, seed=3), "gradient": gradient, "shapes": shapes}
+
+
+def star_case(height: int, width: int, size: int = None) -> tuple:
+    """(alpha, yıldız kutusu) - size None = eski sabit geometri"""
+    if size is None:
+        x, y, w, h = default_bbox("gemini", width, height)
+        size, cx, cy = w // 2, x + w // 2, y + h // 2
+    else:
+        cx, cy = width - 16 - size - 1, height - 16 - size - 1
+    alpha = np.zeros((height, width), dtype=np.uint8)
+    cv2.fillPoly(alpha, [star_polygon(cx, cy, size)], 255)
+    alpha = cv2.GaussianBlur(alpha, (5, 5), 0).astype(np.float32) / 255 * STAR_OPACITY
+    return alpha, (cx - size, cy - size, 2 * size + 1, 2 * size + 1)
+
+
+def glyph_box(alpha: np.ndarray) -> tuple:
+    """Alpha'nın belirgin kısmının kutusu (x, y, w, h)"""
+    ys, xs = np.nonzero(alpha > 0.1)
+    return int(xs.min()), int(ys.min()), int(xs.max() - xs.min() + 1), int(ys.max() - ys.min() + 1)
+
+
+def covers(found: tuple, expected: tuple, slack: float = 1.35) -> bool:
+    """Bulunan kutu beklenen kutuyu kapsıyor ve ondan çok büyük değil"""
+    fx, fy, fw, fh = found
+    x, y, w, h = expected
+    return (fx <= x and fy <= y and fx + fw >= x + w and fy + fh >= y + h
+            and fw <= slack * w + 8 and fh <= slack * h + 8)
+
+
+def check(label: str, detection: dict, expected: tuple = None) -> bool:
+    if expected is None:
+        ok = not detection["found"]
+    else:
+        ok = detection["found"] and covers(detection["bbox"], expected)
+    print(f"{'OK ' if ok else 'HATA'} {label:<42} güven {detection['confidence']:.3f}  "
+          f"bulunan {detection['bbox']}  beklenen {expected}")
+    return ok
+
+
+def main() -> int:
+    failures = 0
+    print(f"Yıldız eşiği {WATERMARK_DETECTION['star_threshold']}, Veo eşiği {WATERMARK_DETECTION['veo_threshold']}")
+
+    for height, width in IMAGE_SIZES:
+        for name, background in backgrounds(height, width).items():
+            failures += not check(f"temiz {width}x{height} {name}", detect_watermark(background, "star"))
+            for size in STAR_SIZES + (None,):
+                alpha, _ = star_case(height, width, size)
+                marked = apply_overlay(background, alpha)
+                label = f"yıldız {size or 'eski 130'} {width}x{height} {name}"
+                failures += not check(label, detect_watermark(marked, "star"), glyph_box(alpha))
+
+    for height, width in VIDEO_SIZES:
+        for name, background in backgrounds(height, width).items():
+            failures += not check(f"temiz {width}x{height} {name}", detect_watermark(background, "veo"))
+            alpha, _ = veo_overlay(height, width)
+            marked = apply_overlay(background, alpha)
+            failures += not check(f"Veo {width}x{height} {name}", detect_watermark(marked, "veo"), glyph_box(alpha))
+
+    print(f"\n{failures} hata")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
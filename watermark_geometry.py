@@ -0,0 +1,257 @@
+"""
+Watermark Geometri Kaydı - (provider, genişlik, yükseklik) -> watermark kutusu
+
+Yeni bir çözünürlükte watermark görsel/framelerde şablon eşleştirme ile bulunur.
+Tek bir tespit kutuyu kalıcı yapmaz: WATERMARK_GEOMETRY["min_confidence"] üstündeki
+ve birbiriyle örtüşen en az "min_samples" gözlem (görsel başına bir, video başına
+uyuşan örnek frame sayısı) biriktiğinde kutu onaylanır. Sonraki dosyalar onaylı
+kutuyu kullanır; "max_age_days"ten eski kayıt yeniden tespit edilir, onaylı kayıtla
+uyuşmayan gözlemler aday olarak birikir ve onaylanırsa eskisinin yerini alır.
+Onaylı kayıt yoksa eski sabit geometri kullanılır.
+
+Dosya, temizleme havuzunun ayrı süreçleri tarafından da yazılır: her güncelleme
+dosya kilidi altında diskteki son hali okuyup üzerine yazar.
+
+Providers:
+    "gemini": Gemini görsellerindeki 4 köşeli yıldız
+    "veo":    Veo videolarındaki "Veo" yazısı
+"""
+import os
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+import numpy as np
+
+from config import WATERMARK_GEOMETRY, WATERMARK_GEOMETRY_FILE
+
+logger = logging.getLogger(__name__)
+
+# Provider -> detect_watermark glyph türü
+PROVIDER_GLYPHS = {
+    "gemini": "star",
+    "veo": "veo",
+}
+
+_registry = None
+_registry_mtime = None
+_registry_lock = threading.Lock()
+
+
+def default_bbox(provider: str, width: int, height: int) -> Tuple[int, int, int, int]:
+    """Tespit yapılamazsa kullanılan sabit geometri (x, y, w, h)"""
+    if provider == "gemini":
+        # Yıldız merkezi (width-145, height-145), yarı boyut 130
+        return width - 275, height - 275, 261, 261
+    if provider == "veo":
+        # 85x40 kutu, sağ ve alttan 5px boşluk
+        return width - 90, height - 45, 85, 40
+    raise ValueError(f"Bilinmeyen provider: {provider}")
+
+
+def boxes_agree(a, b, min_iou: Optional[float] = None) -> bool:
+    """İki kutu (x, y, w, h) aynı glyph'i mi gösteriyor (IoU >= min_iou)"""
+    min_iou = WATERMARK_GEOMETRY["min_iou"] if min_iou is None else min_iou
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    ih = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = iw * ih
+    union = aw * ah + bw * bh - inter
+    return union > 0 and inter / union >= min_iou
+
+
+def _key(provider: str, width: int, height: int) -> str:
+    return f"{provider}:{width}x{height}"
+
+
+def _read_file() -> dict:
+    if not os.path.exists(WATERMARK_GEOMETRY_FILE):
+        return {}
+    try:
+        with open(WATERMARK_GEOMETRY_FILE, "r") as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"Watermark geometri dosyası okunamadı: {e}")
+        return {}
+
+
+def _load() -> dict:
+    """Kayıt (başka süreç dosyayı değiştirdiyse yeniden okunur)"""
+    global _registry, _registry_mtime
+    try:
+        mtime = os.path.getmtime(WATERMARK_GEOMETRY_FILE)
+    except OSError:
+        mtime = None
+    if _registry is None or mtime != _registry_mtime:
+        _registry = _read_file()
+        _registry_mtime = mtime
+    return _registry
+
+
+@contextmanager
+def _file_lock():
+    """Süreçler arası kilit (fcntl yoksa sadece süreç içi kilit)"""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(WATERMARK_GEOMETRY_FILE)), exist_ok=True)
+    with open(WATERMARK_GEOMETRY_FILE + ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _save(registry: dict):
+    global _registry, _registry_mtime
+    tmp_path = f"{WATERMARK_GEOMETRY_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(registry, f, indent=2)
+    os.replace(tmp_path, WATERMARK_GEOMETRY_FILE)
+    _registry = registry
+    _registry_mtime = os.path.getmtime(WATERMARK_GEOMETRY_FILE)
+
+
+def _expired(entry: dict) -> bool:
+    max_age = WATERMARK_GEOMETRY["max_age_days"]
+    if not max_age:
+        return False
+    try:
+        updated_at = datetime.fromisoformat(entry["updated_at"])
+    except (KeyError, TypeError, ValueError):
+        return True
+    return datetime.now() - updated_at > timedelta(days=max_age)
+
+
+def lookup(provider: str, width: int, height: int) -> Optional[dict]:
+    """Onaylı ve süresi dolmamış geometri ({"bbox", "confidence", "samples", "updated_at"}) veya None"""
+    with _registry_lock:
+        entry = _load().get(_key(provider, width, height))
+    if not entry or not entry.get("confirmed") or _expired(entry):
+        return None
+    return entry
+
+
+def _merge(observation: Optional[dict], bbox, confidence: float, samples: int) -> dict:
+    """Gözlemi (uyuşuyorsa) birikmiş adaya ekle - kutu örnek sayısı ağırlıklı ortalama"""
+    if observation and boxes_agree(observation["bbox"], bbox):
+        total = observation["samples"] + samples
+        merged = (np.array(observation["bbox"], dtype=np.float64) * observation["samples"]
+                  + np.array(bbox, dtype=np.float64) * samples) / total
+        return {
+            "bbox": [int(round(v)) for v in merged],
+            "confidence": round(min(observation["confidence"], float(confidence)), 3),
+            "samples": total,
+        }
+    return {"bbox": [int(v) for v in bbox], "confidence": round(float(confidence), 3), "samples": samples}
+
+
+def register(provider: str, width: int, height: int, bbox: Tuple[int, int, int, int],
+             confidence: float, samples: int = 1) -> bool:
+    """
+    Tespit edilen kutuyu gözlem olarak kaydet
+
+    Args:
+        confidence: Tespit güveni (provider'ın min_confidence altındaysa yok sayılır)
+        samples: Bu gözlemde uyuşan örnek sayısı (görsel: 1, video: uyuşan frame sayısı)
+
+    Returns:
+        Bu çözünürlük için onaylı kutu değiştiyse True
+    """
+    if confidence < WATERMARK_GEOMETRY["min_confidence"][provider] or samples < 1:
+        return False
+
+    key = _key(provider, width, height)
+    now = datetime.now().isoformat()
+    with _registry_lock, _file_lock():
+        registry = _read_file()  # Diğer süreçlerin yazdıklarını ezme
+        entry = registry.get(key)
+
+        if entry and entry.get("confirmed") and not _expired(entry):
+            if boxes_agree(entry["bbox"], bbox):
+                # Onaylı kutu doğrulandı: yaşı sıfırla, bekleyen aday gereksiz
+                entry["updated_at"] = now
+                entry.pop("candidate", None)
+                _save(registry)
+                return False
+            candidate = _merge(entry.get("candidate"), bbox, confidence, samples)
+            if candidate["samples"] < WATERMARK_GEOMETRY["min_samples"]:
+                entry["candidate"] = candidate
+                _save(registry)
+                return False
+            logger.info(f"Watermark geometrisi yeniden bulundu: {provider} {width}x{height} "
+                        f"{tuple(entry['bbox'])} -> {tuple(candidate['bbox'])}")
+            entry = candidate
+        else:
+            pending = entry if entry and not entry.get("confirmed") else None
+            entry = _merge(pending, bbox, confidence, samples)
+
+        entry["confirmed"] = entry["samples"] >= WATERMARK_GEOMETRY["min_samples"]
+        entry["updated_at"] = now
+        registry[key] = entry
+        _save(registry)
+
+    if entry["confirmed"]:
+        logger.info(f"Watermark geometrisi kaydedildi: {provider} {width}x{height} -> {tuple(entry['bbox'])} "
+                    f"({entry['samples']} örnek)")
+    return entry["confirmed"]
+
+
+def get_watermark_bbox(
+    provider: str,
+    width: int,
+    height: int,
+    image: Optional[np.ndarray] = None,
+    video_path: Optional[str] = None
+) -> Tuple[int, int, int, int]:
+    """
+    (provider, çözünürlük) için watermark kutusu (x, y, w, h)
+
+    Onaylı kayıt yoksa verilen görselde veya videonun framelerinde konum tespiti
+    yapılır ve gözlem olarak kaydedilir; bu dosya için tespit edilen kutu kullanılır.
+    Hiçbiri olmazsa default_bbox döner.
+
+    Args:
+        provider: "gemini" veya "veo"
+        image: Tespit için BGR görsel / frame
+        video_path: Tespit için video (image verilmemişse)
+    """
+    entry = lookup(provider, width, height)
+    if entry:
+        return tuple(entry["bbox"])
+
+    if image is not None or video_path:
+        from watermark_remover import detect_watermark, detect_video_watermark
+
+        glyph = PROVIDER_GLYPHS[provider]
+        if image is not None:
+            detection = detect_watermark(image, glyph)
+        else:
+            detection = detect_video_watermark(video_path, glyph)
+
+        if detection["found"]:
+            register(provider, width, height, detection["bbox"], detection["confidence"],
+                     detection.get("samples", 1))
+            return tuple(detection["bbox"])
+        logger.info(f"Watermark konumu bulunamadı ({provider} {width}x{height}), varsayılan geometri kullanılıyor")
+
+    return default_bbox(provider, width, height)
+
+
+def bbox_to_region(bbox: Tuple[int, int, int, int], width: int, height: int,
+                   padding: int = 0) -> Tuple[int, int, int, int]:
+    """Kutuyu padding ile genişletip (x1, y1, x2, y2) olarak frame sınırlarına kırp"""
+    x, y, w, h = bbox
+    return (
+        max(0, x - padding),
+        max(0, y - padding),
+        min(width, x + w + padding),
+        min(height, y + h + padding),
+    )
@@ -6,112 +6,378 @@ import cv2
 import numpy as np
 import os
 import shutil
+from functools import lru_cache
+from typing import Optional
+
+from config import WATERMARK_DETECTION
+from inpaint_cache import cache_key, fetch, store
+from watermark_geometry import boxes_agree, get_watermark_bbox, register
+
+
+def star_polygon(cx: int, cy: int, size: int) -> np.ndarray:
+    """Gemini'nin 4 köşeli yıldızı - merkez ve yarı boyut ile"""
+    return np.array([
+        [cx, cy - size],
+        [cx + size//3, cy - size//3],
+        [cx + size, cy],
+        [cx + size//3, cy + size//3],
+        [cx, cy + size],
+        [cx - size//3, cy + size//3],
+        [cx - size, cy],
+        [cx - size//3, cy - size//3],
+    ], dtype=np.int32)
+
+
+@lru_cache(maxsize=32)
+def _star_template(size: int) -> tuple:
+    """Yıldız şablonu (etrafında boşluk ile) ve şablon içindeki yıldız kutusu"""
+    pad = max(4, size // 2)
+    side = 2 * (size + pad) + 1
+    template = np.zeros((side, side), dtype=np.uint8)
+    center = size + pad
+    cv2.fillPoly(template, [star_polygon(center, center, size)], 255)
+    return cv2.GaussianBlur(template, (3, 3), 0), (pad, pad, 2 * size + 1, 2 * size + 1)
+
+
+@lru_cache(maxsize=32)
+def _disc_template(size: int) -> tuple:
+    """Yıldızla aynı alan ve boyutta daire - parlak lekeleri yıldızdan ayırmak için"""
+    star, box = _star_template(size)
+    template = np.zeros_like(star)
+    center = star.shape[0] // 2
+    radius = int(np.sqrt((star > 127).sum() / np.pi))
+    cv2.circle(template, (center, center), radius, 255, -1)
+    return cv2.GaussianBlur(template, (3, 3), 0), box
+
+
+@lru_cache(maxsize=32)
+def _veo_template(scale: float) -> tuple:
+    """"Veo" yazısı şablonu ve şablon içindeki yazı kutusu"""
+    thickness = max(1, int(round(scale * 2)))
+    (text_w, text_h), baseline = cv2.getTextSize("Veo", cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+    pad = max(4, text_h // 2)
+    template = np.zeros((text_h + baseline + 2 * pad, text_w + 2 * pad), dtype=np.uint8)
+    cv2.putText(template, "Veo", (pad, pad + text_h), cv2.FONT_HERSHEY_SIMPLEX, scale, 255, thickness, cv2.LINE_AA)
+    return template, (pad, pad, text_w, text_h + baseline)
+
+
+_SECTORS = 16
+
+
+@lru_cache(maxsize=64)
+def _star_bands(size: int) -> tuple:
+    """
+    Yıldız kenarının hemen içi ve hemen dışındaki bantlar (yerel koordinatlar)
+
+    Returns:
+        (pad, iç bant (ys, xs, dilim), dış bant (ys, xs, dilim)) - yerel kutu yıldız
+        kutusunun pad kadar genişletilmişi, dilim merkeze göre açı dilimi
+    """
+    band = max(1, size // 16)
+    pad = 4 * band
+    side = 2 * (size + pad) + 1
+    center = size + pad
+    mask = np.zeros((side, side), dtype=np.uint8)
+    cv2.fillPoly(mask, [star_polygon(center, center, size)], 1)
+
+    kernel = np.ones((3, 3), np.uint8)
+    inner = cv2.erode(mask, kernel, iterations=band) & ~cv2.erode(mask, kernel, iterations=3 * band)
+    outer = cv2.dilate(mask, kernel, iterations=3 * band) & ~cv2.dilate(mask, kernel, iterations=band)
+
+    def indexed(region):
+        ys, xs = np.nonzero(region & 1)
+        angle = np.arctan2(ys - center, xs - center)
+        sectors = ((angle + np.pi) / (2 * np.pi) * _SECTORS).astype(np.int64) % _SECTORS
+        return ys, xs, sectors
+
+    return pad, indexed(inner), indexed(outer)
 
 
-def remove_watermark(input_path: str, output_path: str, debug: bool = False) -> bool:
+def _star_strength(signal: np.ndarray, x: int, y: int, size: int) -> float:
     """
-    Gemini watermark'ını LaMa deep learning modeli ile temizle
+    (x, y) köşeli yıldız kutusunda beyaz bindirmenin tahmini opaklığı
+
+    Alpha a ile beyaza karışım, yıldızın içini dışına göre a * (255 - dış) kadar
+    aydınlatır. Kenar boyunca açı dilimlerinde iç/dış bant ortalamaları karşılaştırılır
+    ve dilimlerin alt çeyreği alınır: watermark her dilimde görünür, yıldızı kesen
+    arka plan kenarları ise birkaç dilimi yükseltir. Temiz görüntüde ~0, watermark'ta ~a.
+
+    Args:
+        signal: _glyph_signal ile hazırlanmış (H, W) bölge
     """
-    try:
-        import torch
-        import torch.nn.functional as F
-
-        # Model yükle
-        model_path = os.path.expanduser("~/.cache/torch/hub/checkpoints/big-lama.pt")
-
-        # Model yoksa indir
-        if not os.path.exists(model_path):
-            print("LaMa modeli indiriliyor...")
-            os.makedirs(os.path.dirname(model_path), exist_ok=True)
-            import urllib.request
-            url = "https://github.com/enesmsahin/simple-lama-inpainting/releases/download/v0.1.0/big-lama.pt"
-            urllib.request.urlretrieve(url, model_path)
-
-        # Device seç
-        if torch.backends.mps.is_available():
-            device = 'mps'
-        elif torch.cuda.is_available():
-            device = 'cuda'
-        else:
-            device = 'cpu'
+    pad, inner, outer = _star_bands(size)
+    height, width = signal.shape[:2]
+
+    def sector_means(band):
+        ys, xs, sectors = band
+        ys, xs = ys + y - pad, xs + x - pad
+        inside = (ys >= 0) & (ys < height) & (xs >= 0) & (xs < width)
+        sums = np.bincount(sectors[inside], weights=signal[ys[inside], xs[inside]], minlength=_SECTORS)
+        counts = np.bincount(sectors[inside], minlength=_SECTORS)
+        return sums / np.maximum(counts, 1), counts > 0
+
+    inner_mean, inner_ok = sector_means(inner)
+    outer_mean, outer_ok = sector_means(outer)
+    headroom = 255.0 - outer_mean
+    # Neredeyse beyaz arka planda bindirme görünmez, o dilimler oy kullanmaz
+    valid = inner_ok & outer_ok & (headroom >= 24)
+    if valid.sum() < _SECTORS // 2:
+        return 0.0
+    return float(np.clip(np.percentile((inner_mean - outer_mean)[valid] / headroom[valid], 25), 0, 1))
+
+
+# Glyph türü -> (köşe bölgesi boyutu (w, h), arama ölçekleri, şablon üretici, yanıltıcı şablon,
+# eşleştirme boyutu: büyük ölçekler glyph bu kadar px kalacak şekilde küçültülür (None = tam çözünürlük),
+# doğrulayıcı: aday konumda güveni ölçer (None = şablon skoru güvendir))
+_GLYPHS = {
+    # Eski sabit geometrideki 130 px yıldız (kenardan 15 px) dahil
+    "star": ((400, 400), (16, 18, 20, 22, 24, 27, 30, 33, 36, 40, 44, 48, 53, 58, 64, 70,
+                          77, 85, 93, 100, 110, 120, 130, 140),
+             _star_template, _disc_template, 32, _star_strength),
+    "veo": ((240, 120), (0.6, 0.7, 0.8, 0.9, 1.0, 1.1, 1.2, 1.3, 1.4, 1.6),
+            _veo_template, None, None, None),
+}
+
+# Doğrulanan en iyi şablon adayı sayısı
+_VERIFY_CANDIDATES = 6
+
+
+def _glyph_signal(region: np.ndarray) -> np.ndarray:
+    """Beyaz yarı saydam glyph üç kanalı birden aydınlatır: renkli dokuda en düşük kanal griden iyi ayırır"""
+    return region.min(axis=2) if region.ndim == 3 else region
+
+
+def detect_watermark(image: np.ndarray, kind: str = "star", threshold: Optional[float] = None) -> dict:
+    """
+    Sağ alt köşede bilinen watermark glyph'ini şablon eşleştirme ile ara
 
-        print(f"LaMa modeli yükleniyor ({device})...")
-        model = torch.jit.load(model_path, map_location='cpu')
-        model = model.to(device)
-        model.eval()
+    Köşe bölgesi birkaç ölçekte TM_CCOEFF_NORMED ile eşleştirilir (büyük ölçekler
+    küçültülerek). Yıldız için aynı alandaki daireden ne kadar iyi ayrıldığı da skora
+    katılır (parlak yuvarlak lekeler yıldız şablonuyla da yüksek skor verir). Yıldızda
+    en iyi adaylar _star_strength ile doğrulanır; güven tahmini bindirme opaklığıdır.
+    Dönen kutu glyph kenarının yumuşaması için birkaç px genişletilir.
 
+    Args:
+        image: BGR görüntü / frame
+        kind: "star" (Gemini görsel) veya "veo" (Veo video)
+        threshold: Güven eşiği (None = config.WATERMARK_DETECTION)
+
+    Returns:
+        {"found": bool, "confidence": float, "bbox": (x, y, w, h) veya None} - bbox tam görüntü koordinatlarında
+    """
+    if threshold is None:
+        threshold = WATERMARK_DETECTION[f"{kind}_threshold"]
+
+    (corner_w, corner_h), scales, make_template, make_decoy, match_size, verify = _GLYPHS[kind]
+    height, width = image.shape[:2]
+    x0, y0 = max(0, width - corner_w), max(0, height - corner_h)
+
+    signal = _glyph_signal(image[y0:height, x0:width])
+
+    # Glyph kenara yakın olabilir (eski 130 px yıldız kenardan 15 px içeride): şablonun
+    # boş çerçevesi görüntüden taşabilsin diye köşe sağdan ve alttan uzatılır
+    limit_h, limit_w = signal.shape[:2]
+    border = max(max(make_template(scale)[0].shape) for scale in scales)
+    corner = cv2.copyMakeBorder(signal, 0, border, 0, border, cv2.BORDER_REPLICATE)
+
+    def resize(array, factor):
+        if factor == 1.0:
+            return array
+        return cv2.resize(array, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+
+    # Ölçek başına en iyi şablon konumu: (skor, ölçek, glyph kutusu köşe koordinatlarında, küçültme)
+    candidates = []
+    for scale in scales:
+        downscale = min(1.0, match_size / scale) if match_size else 1.0
+        template, (gx, gy, gw, gh) = make_template(scale)
+        # Sadece bu şablonun taşabileceği kadar kenar payı
+        search = corner[:limit_h + template.shape[0] - gy - gh, :limit_w + template.shape[1] - gx - gw]
+        search = resize(search, downscale)
+        template = resize(template, downscale)
+        # Glyph kutusunun kendisi gerçek köşe içinde kalmalı
+        max_x = int((limit_w - gx - gw) * downscale)
+        max_y = int((limit_h - gy - gh) * downscale)
+        # Glyph köşeye yaslıdır: kenara uzaklığı glyph boyutunun yarısı + 32 px'i geçmez
+        min_x = max(0, max_x - int((gw // 2 + 32) * downscale))
+        min_y = max(0, max_y - int((gh // 2 + 32) * downscale))
+        if template.shape[0] > search.shape[0] or template.shape[1] > search.shape[1] or max_x < 0 or max_y < 0:
+            continue
+
+        result = cv2.matchTemplate(search, template, cv2.TM_CCOEFF_NORMED)
+        if make_decoy is not None:
+            decoy = cv2.matchTemplate(search, resize(make_decoy(scale)[0], downscale), cv2.TM_CCOEFF_NORMED)
+            result = np.sqrt(np.clip(result, 0, 1) * np.clip(5 * (result - decoy), 0, 1))
+        result = result[min_y:max_y + 1, min_x:max_x + 1]
+
+        _, score, _, (mx, my) = cv2.minMaxLoc(result)
+        box = (int(round((mx + min_x) / downscale)) + gx, int(round((my + min_y) / downscale)) + gy, gw, gh)
+        candidates.append((float(score), scale, box, downscale))
+
+    best = {"found": False, "confidence": 0.0, "bbox": None}
+    if verify is None:
+        for score, _, box, _ in candidates:
+            if score > best["confidence"]:
+                best["confidence"], best["bbox"] = score, box
+    else:
+        # Şablon konumu küçültme nedeniyle birkaç px kayabilir: çevresinde ince arama
+        signal = signal.astype(np.float32)
+        for _, scale, (bx, by, gw, gh), downscale in sorted(candidates, reverse=True)[:_VERIFY_CANDIDATES]:
+            radius = int(np.ceil(1 / downscale))
+            for dy in range(-radius, radius + 1):
+                for dx in range(-radius, radius + 1):
+                    if bx + dx + gw > limit_w or by + dy + gh > limit_h:
+                        continue
+                    strength = verify(signal, bx + dx, by + dy, scale)
+                    if strength > best["confidence"]:
+                        best["confidence"], best["bbox"] = strength, (bx + dx, by + dy, gw, gh)
+
+    best["found"] = best["bbox"] is not None and best["confidence"] >= threshold
+    if not best["found"]:
+        best["bbox"] = None
+    else:
+        # Kenar yumuşaması / yarım px kaymalar maskeden kaçmasın
+        x, y, w, h = best["bbox"]
+        margin = max(2, w // 16)
+        x1, y1 = max(0, x0 + x - margin), max(0, y0 + y - margin)
+        x2, y2 = min(width, x0 + x + w + margin), min(height, y0 + y + h + margin)
+        best["bbox"] = (x1, y1, x2 - x1, y2 - y1)
+    return best
+
+
+def detect_video_watermark(video_path: str, kind: str = "veo", samples: Optional[int] = None) -> dict:
+    """
+    Klip başına bir kez karar ver - videoya yayılmış birkaç frame'de detect_watermark
+
+    Returns:
+        detect_watermark ile aynı yapı; güven örneklerin medyanı, bbox eşiği geçen
+        örneklerin medyanı, "samples" bu kutuyla uyuşan örnek sayısı
+    """
+    samples = samples or WATERMARK_DETECTION["video_samples"]
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return {"found": False, "confidence": 0.0, "bbox": None, "samples": 0}
+
+    try:
+        count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        detections = []
+        for idx in np.linspace(0, max(0, count - 1), samples).astype(int):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(idx))
+            ret, frame = cap.read()
+            if ret:
+                detections.append(detect_watermark(frame, kind))
+    finally:
+        cap.release()
+
+    if not detections:
+        return {"found": False, "confidence": 0.0, "bbox": None, "samples": 0}
+
+    confidence = float(np.median([d["confidence"] for d in detections]))
+    boxes = [d["bbox"] for d in detections if d["found"]]
+    found = confidence >= WATERMARK_DETECTION[f"{kind}_threshold"] and bool(boxes)
+    bbox = tuple(int(v) for v in np.median(boxes, axis=0)) if found else None
+    samples = sum(boxes_agree(box, bbox) for box in boxes) if found else 0
+    return {"found": found, "confidence": confidence, "bbox": bbox, "samples": samples}
+
+
+def remove_watermark(input_path: str, output_path: str, debug: bool = False,
+                     backend: Optional[str] = None, detect: Optional[bool] = None,
+                     fallback: bool = True) -> bool:
+    """
+    Gemini watermark'ını LaMa deep learning modeli ile temizle
+
+    Args:
+        backend: Inference backend'i ("torch" / "onnx", None = config.LAMA_SETTINGS)
+        detect: Önce yıldızı ara; yoksa inpainting'i atla, varsa sadece bulunan
+            bölgeyi işle (None = config.WATERMARK_DETECTION["enabled"])
+        fallback: LaMa kullanılamazsa OpenCV'ye geç (False: False döndür - benchmark için)
+    """
+    try:
         # Görsel yükle
         img = cv2.imread(input_path)
         if img is None:
             print(f"Görsel okunamadı: {input_path}")
             return False
 
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
         height, width = img.shape[:2]
         print(f"Görsel boyutu: {width}x{height}")
 
+        # Watermark tespiti - yoksa model hiç yüklenmez
+        detection = None
+        if WATERMARK_DETECTION["enabled"] if detect is None else detect:
+            detection = detect_watermark(img, "star")
+            if not detection["found"]:
+                print(f"Watermark bulunamadı (güven {detection['confidence']:.2f}), inpainting atlandı")
+                if os.path.abspath(input_path) != os.path.abspath(output_path):
+                    shutil.copy(input_path, output_path)
+                return True
+            print(f"Watermark bulundu (güven {detection['confidence']:.2f}): {detection['bbox']}")
+
+        # Watermark kutusu - tespit edilen veya çözünürlük için kayıtlı geometri
+        if detection:
+            bbox = detection["bbox"]
+            register("gemini", width, height, bbox, detection["confidence"])
+        else:
+            bbox = get_watermark_bbox("gemini", width, height, image=img)
+
+        from lama_backend import get_lama_backend, model_version
+
+        # Aynı görsel aynı geometri/model ile daha önce temizlendiyse model yüklenmez
+        cache = cache_key(input_path, "gemini-lama-roi" if detection else "gemini-lama",
+                          list(bbox), model_version(backend))
+        if not debug and fetch(cache, output_path):
+            print(f"Watermark temizlendi (önbellek): {output_path}")
+            return True
+
+        # Model yükle (süreç içinde paylaşılır)
+        lama = get_lama_backend(backend)
+
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
         # Watermark mask oluştur
         mask = np.zeros((height, width), dtype=np.uint8)
 
         # Watermark merkezi ve boyutu (sağ alt köşe)
-        wm_cx = width - 145
-        wm_cy = height - 145
-        wm_size = 130
+        x, y, w, h = bbox
+        wm_cx = x + w // 2
+        wm_cy = y + h // 2
+        wm_size = w // 2
 
         # 4 köşeli yıldız şekli
-        pts = np.array([
-            [wm_cx, wm_cy - wm_size],
-            [wm_cx + wm_size//3, wm_cy - wm_size//3],
-            [wm_cx + wm_size, wm_cy],
-            [wm_cx + wm_size//3, wm_cy + wm_size//3],
-            [wm_cx, wm_cy + wm_size],
-            [wm_cx - wm_size//3, wm_cy + wm_size//3],
-            [wm_cx - wm_size, wm_cy],
-            [wm_cx - wm_size//3, wm_cy - wm_size//3],
-        ], dtype=np.int32)
-
-        cv2.fillPoly(mask, [pts], 255)
+        cv2.fillPoly(mask, [star_polygon(wm_cx, wm_cy, wm_size)], 255)
         kernel = np.ones((15, 15), np.uint8)
         mask = cv2.dilate(mask, kernel, iterations=2)
 
         if debug:
             cv2.imwrite(output_path.replace('.png', '_mask.png'), mask)
 
-        # Tensörlere çevir
-        img_tensor = torch.from_numpy(img).permute(2, 0, 1).unsqueeze(0).float() / 255.0
-        mask_tensor = torch.from_numpy(mask).unsqueeze(0).unsqueeze(0).float() / 255.0
-
-        # 8'in katına yuvarla
-        pad_h = (8 - height % 8) % 8
-        pad_w = (8 - width % 8) % 8
-        if pad_h > 0 or pad_w > 0:
-            img_tensor = F.pad(img_tensor, (0, pad_w, 0, pad_h), mode='reflect')
-            mask_tensor = F.pad(mask_tensor, (0, pad_w, 0, pad_h), mode='reflect')
-
-        img_tensor = img_tensor.to(device)
-        mask_tensor = mask_tensor.to(device)
-
-        print("Inpainting yapılıyor (LaMa)...")
-        with torch.no_grad():
-            result_tensor = model(img_tensor, mask_tensor)
-
-        # Padding'i kaldır
-        if pad_h > 0 or pad_w > 0:
-            result_tensor = result_tensor[:, :, :height, :width]
-
-        # Numpy'a çevir ve kaydet
-        result = result_tensor.squeeze(0).permute(1, 2, 0).cpu().numpy()
-        result = (result * 255).clip(0, 255).astype(np.uint8)
+        print(f"Inpainting yapılıyor (LaMa, {lama.name})...")
+        if detection:
+            # Sadece bulunan bölge + bağlam modele verilir
+            context = 64
+            ys, xs = np.nonzero(mask)
+            y1, y2 = max(0, ys.min() - context), min(height, ys.max() + 1 + context)
+            x1, x2 = max(0, xs.min() - context), min(width, xs.max() + 1 + context)
+            result = img.copy()
+            result[y1:y2, x1:x2] = lama.inpaint(img[y1:y2, x1:x2], mask[y1:y2, x1:x2])
+        else:
+            result = lama.inpaint(img, mask)
         result = cv2.cvtColor(result, cv2.COLOR_RGB2BGR)
 
         cv2.imwrite(output_path, result)
+        store(cache, output_path)
         print(f"Watermark temizlendi (LaMa): {output_path}")
         return True
 
-    except ImportError:
-        print("PyTorch bulunamadı, OpenCV fallback kullanılıyor...")
+    except ImportError as e:
+        if not fallback:
+            print(f"LaMa backend bağımlılığı bulunamadı: {e}")
+            return False
+        print("LaMa backend bağımlılığı bulunamadı (torch/onnxruntime), OpenCV fallback kullanılıyor...")
         return remove_watermark_opencv(input_path, output_path, debug)
     except Exception as e:
+        if not fallback:
+            print(f"LaMa hatası: {e}")
+            return False
         print(f"LaMa hatası: {e}, OpenCV fallback kullanılıyor...")
         return remove_watermark_opencv(input_path, output_path, debug)
 